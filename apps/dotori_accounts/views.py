@@ -6,6 +6,8 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.dotori_common.idempotency import idempotent
+
 from .serializers import RegisterSerializer, UserSerializer
 from .models import PhoneVerification, normalize_phone
 
@@ -29,11 +31,13 @@ class RegisterView(generics.CreateAPIView):
         "phone": "01012345678",
         "phone_verified_token": "<signed>"
       }
+    Idempotency-Key 헤더를 보내면 재시도 시 첫 응답을 그대로 돌려줌
     """
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
 
+    @idempotent
     def create(self, request, *args, **kwargs):
         try:
             print("[RegisterView] request.data =>", dict(request.data))
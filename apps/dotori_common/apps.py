@@ -0,0 +1,5 @@
+from django.apps import AppConfig
+class DotoriCommonConfig(AppConfig):
+    name = "apps.dotori_common"
+    def ready(self):
+        from . import checks  # noqa: F401  시스템 점검 등록
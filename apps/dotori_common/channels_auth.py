@@ -0,0 +1,23 @@
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+@database_sync_to_async
+def _user_from_token(raw: str):
+    try:
+        user_id = AccessToken(raw)["user_id"]
+    except (TokenError, KeyError):
+        return AnonymousUser()
+    return get_user_model().objects.filter(id=user_id).first() or AnonymousUser()
+class JWTQueryAuthMiddleware(BaseMiddleware):
+    """웹소켓은 헤더를 못 붙이는 클라이언트가 많아 ?token=<access JWT>로 인증 (세션 인증이 우선)"""
+    async def __call__(self, scope, receive, send):
+        user = scope.get("user")
+        if user is None or not user.is_authenticated:
+            token = parse_qs(scope.get("query_string", b"").decode()).get("token")
+            if token:
+                scope["user"] = await _user_from_token(token[0])
+        return await super().__call__(scope, receive, send)
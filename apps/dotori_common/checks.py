@@ -0,0 +1,18 @@
+"""시스템 점검 (manage.py check)."""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+# 프로세스마다 따로인 캐시: Idempotency-Key 잠금/저장이 다른 웹 프로세스에 보이지 않음
+LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES["default"]["BACKEND"]
+    if backend not in LOCAL_CACHE_BACKENDS:
+        return []
+    return [Error(
+        f"default 캐시({backend.rsplit('.', 1)[-1]})를 프로세스끼리 공유하지 않습니다.",
+        hint="Idempotency-Key 요청을 한 번만 처리하려면 USE_INMEMORY_CACHE=False와 REDIS_CACHE_URL로 Redis를 쓰세요.",
+        id="dotori_common.E001",
+    )]
@@ -0,0 +1,29 @@
+"""오래된 큰 텍스트(요약 원문, 문서 텍스트)를 압축 blob으로 미디어 저장소에 보관.
+
+DB 행에는 앞부분(목록 미리보기용)만 남기고 보관 정보 {"name", "chars", "bytes"}를 기록한다.
+blob 이름은 압축 데이터의 해시라 같은 내용은 파일 하나를 공유한다. 읽기는 fields.ColdTextField가 필요할 때만.
+"""
+import hashlib
+import zlib
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+PREFIX = "cold/"
+def archive_text(text: str) -> dict:
+    data = zlib.compress(text.encode("utf-8", "surrogatepass"), settings.COLD_STORAGE_LEVEL)
+    name = f"{PREFIX}{hashlib.sha256(data).hexdigest()}.z"
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return {"name": name, "chars": len(text), "bytes": len(data)}
+def load_text(archive: dict) -> str:
+    with default_storage.open(archive["name"], "rb") as f:
+        return zlib.decompress(f.read()).decode("utf-8", "surrogatepass")
+def head(text: str) -> str:
+    # DB에 남기는 앞부분 (목록 미리보기는 그대로 동작)
+    return text[:settings.LIST_PREVIEW_CHARS]
+def blob_names() -> set[str]:
+    try:
+        _, files = default_storage.listdir(PREFIX.rstrip("/"))
+    except FileNotFoundError:
+        return set()
+    return {PREFIX + name for name in files}
@@ -0,0 +1,42 @@
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+def make_etag(*parts) -> str:
+    return quote_etag(hashlib.md5("|".join(map(str, parts)).encode("utf-8")).hexdigest())
+def not_modified(request, etag=None, last_modified=None):
+    """If-None-Match / If-Modified-Since가 일치하면 304 응답, 아니면 None"""
+    if request.method not in ("GET", "HEAD"):
+        return None
+    ts = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=ts)
+    return set_validators(response, etag, last_modified) if response is not None else None
+def set_validators(response, etag=None, last_modified=None):
+    if etag:
+        response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+class ConditionalRetrieveMixin:
+    """retrieve 전에 작은 컬럼(validator_fields)만 읽어 검증자를 만들고, 바뀌지 않았으면 직렬화 없이 304.
+
+    조회 범위는 get_queryset()을 그대로 따르므로 소유자 필터 등은 유지된다.
+    """
+    validator_fields = ("updated_at",)
+    last_modified_field = "updated_at"
+    def get_validators(self):
+        lookup = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        qs = self.filter_queryset(self.get_queryset()).filter(**{self.lookup_field: lookup})
+        row = qs.values(*self.validator_fields).first()
+        if row is None:
+            return None, None
+        # 쿼리 파라미터에 따라 표현이 달라질 수 있으므로 ETag에 포함
+        etag = make_etag(lookup, self.request.query_params.urlencode(), *row.values())
+        return etag, row.get(self.last_modified_field)
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        if etag:
+            response = not_modified(request, etag, last_modified)
+            if response is not None:
+                return response
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
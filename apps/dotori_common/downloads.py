@@ -0,0 +1,97 @@
+"""권한 확인을 마친 FieldFile을 내려주는 응답 (Range / 조건부 요청 / X-Accel-Redirect).
+
+- 기본: FileResponse로 조각 스트리밍 (WSGI면 wsgi.file_wrapper → sendfile), 단일 구간 Range면 206
+- DOCUMENT_DOWNLOAD_ACCEL_PREFIX가 있으면 본문 없이 X-Accel-Redirect만 → 앞단 nginx가 바이트를 직접 전송
+"""
+import mimetypes
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import parse_http_date_safe
+from rest_framework.renderers import JSONRenderer
+from .conditional import not_modified, set_validators
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+class AnyMediaRenderer(JSONRenderer):
+    """파일 응답 액션용: Accept가 application/pdf 등이어도 406 대신 통과 (오류 본문은 JSON)"""
+    media_type = "*/*"
+    format = "file"
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # 협상은 무엇이든 받되, 이 렌더러가 쓰는 본문(오류 등)은 JSON이라고 표시
+        response = (renderer_context or {}).get("response")
+        if response is not None and response.content_type is None:
+            response["Content-Type"] = "application/json"
+        return super().render(data, "application/json", renderer_context)
+class _RangeReader:
+    # 파일을 [start, start+length)만큼만 읽도록 감쌈 (tell/seek가 없어야 FileResponse가 길이를 다시 재지 않음)
+    def __init__(self, f, start: int, length: int):
+        f.seek(start)
+        self.f, self.remaining = f, length
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b""
+        size = self.remaining if size < 0 else min(size, self.remaining)
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+    def close(self):
+        self.f.close()
+def parse_range(header: str | None, size: int):
+    """단일 구간만 지원: (start, end) 포함 구간, 만족 불가(시작이 크기 이상 등)면 False.
+
+    헤더가 없거나 여러 구간이거나 문법이 틀리면(bytes=5-2 등) None → Range를 무시하고 전체 200
+    """
+    m = RANGE_RE.match((header or "").strip())
+    if not m or (not m[1] and not m[2]):
+        return None
+    if not m[1]:  # bytes=-N (마지막 N바이트)
+        length = int(m[2])
+        return (max(size - length, 0), size - 1) if length and size else False
+    start = int(m[1])
+    if m[2] and int(m[2]) < start:
+        return None
+    if start >= size:
+        return False
+    return start, min(int(m[2]), size - 1) if m[2] else size - 1
+def _if_range_ok(request, etag: str, last_modified) -> bool:
+    # If-Range가 현재 검증자와 다르면 Range를 무시하고 전체를 보냄
+    value = request.headers.get("If-Range")
+    if not value:
+        return True
+    if value.startswith(('"', "W/")):
+        return value == etag
+    ts = parse_http_date_safe(value)
+    return ts is not None and last_modified is not None and int(last_modified.timestamp()) <= ts
+def serve_file(request, field_file, filename: str, etag: str, last_modified=None, as_attachment: bool = True):
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    content_type = mimetypes.guess_type(filename or field_file.name)[0] or "application/octet-stream"
+    prefix = settings.DOCUMENT_DOWNLOAD_ACCEL_PREFIX
+    if prefix:
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(field_file.name)
+        response["Content-Disposition"] = _disposition(filename, as_attachment)
+        return set_validators(response, etag, last_modified)
+    size = field_file.size
+    rng = parse_range(request.headers.get("Range"), size) if _if_range_ok(request, etag, last_modified) else None
+    if rng is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    f = field_file.storage.open(field_file.name, "rb")
+    if rng is None:
+        response = FileResponse(f, as_attachment=as_attachment, filename=filename, content_type=content_type)
+    else:
+        start, end = rng
+        response = FileResponse(
+            _RangeReader(f, start, end - start + 1), as_attachment=as_attachment, filename=filename,
+            content_type=content_type, status=206,
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return set_validators(response, etag, last_modified)
+def _disposition(filename: str, as_attachment: bool) -> str:
+    kind = "attachment" if as_attachment else "inline"
+    return f"{kind}; filename*=utf-8''{quote(filename)}" if filename else kind
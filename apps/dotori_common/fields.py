@@ -0,0 +1,30 @@
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+from . import coldstore
+class ColdTextDescriptor(DeferredAttribute):
+    # 보관(archive)된 행이면 DB 값(앞부분) 대신 저장소의 전체 텍스트를 처음 접근할 때 읽어 돌려줌
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        archive = getattr(instance, self.field.archive_field)
+        if not archive:
+            return value
+        key = f"_cold_{self.field.attname}"
+        cached = instance.__dict__.get(key)
+        if cached is None or cached[0] != archive["name"]:
+            cached = instance.__dict__[key] = (archive["name"], coldstore.load_text(archive))
+        return cached[1]
+    def __set__(self, instance, value):
+        # __set__이 있어야 데이터 디스크립터가 되어 인스턴스 __dict__보다 먼저 __get__이 불림
+        instance.__dict__[self.field.attname] = value
+class ColdTextField(models.TextField):
+    """오래되면 coldstore로 옮겨질 수 있는 TextField. archive_field(JSONField)가 차 있으면 지연 로딩"""
+    descriptor_class = ColdTextDescriptor
+    def __init__(self, *args, archive_field: str, **kwargs):
+        self.archive_field = archive_field
+        super().__init__(*args, **kwargs)
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs["archive_field"] = self.archive_field
+        return name, path, args, kwargs
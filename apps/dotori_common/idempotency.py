@@ -0,0 +1,79 @@
+"""Idempotency-Key 헤더로 생성 요청 재시도를 한 번만 처리.
+
+첫 성공 응답(2xx)을 TTL 캐시에 저장해 같은 키의 재시도에는 그대로 돌려준다 (Idempotent-Replayed: true).
+- 같은 키로 아직 처리 중이면 409, 같은 키에 다른 본문이면 422
+- 키 범위는 뷰 + 사용자(비로그인은 키만)
+- 모든 웹 프로세스가 같은 캐시(Redis)를 봐야 한 번만 처리된다 (LocMem이면 check --deploy 오류, checks.py)
+"""
+import functools
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import UploadedFile
+from rest_framework import status
+from rest_framework.response import Response
+HEADER = "Idempotency-Key"
+def _fingerprint(request) -> str:
+    # 파일은 내용 대신 이름/크기만 (업로드 스트림을 다시 읽지 않음)
+    def plain(value):
+        if isinstance(value, UploadedFile):
+            return {"file": value.name, "size": value.size}
+        return value
+    data = request.data
+    items = {k: [plain(v) for v in data.getlist(k)] for k in data} if hasattr(data, "getlist") else data
+    raw = json.dumps([request.path, items], sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+def idempotent(method):
+    """뷰의 create(self, request, ...)를 감싸는 데코레이터"""
+    @functools.wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({"detail": f"{HEADER}는 255자 이하여야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        user_id = request.user.id if request.user.is_authenticated else "anon"
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        cache_key = f"dotori:idem:{type(self).__name__}:{user_id}:{digest}"
+        fingerprint = _fingerprint(request)
+        lock_key = f"{cache_key}:lock"
+        stored = cache.get(cache_key)
+        if stored is None:
+            locked = cache.add(lock_key, 1, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+            # 처음 확인한 뒤 잠금을 잡기 전에 앞선 요청이 끝나 저장했을 수 있으므로 다시 읽는다
+            stored = cache.get(cache_key)
+            if stored is None and not locked:
+                return Response(
+                    {"detail": "같은 Idempotency-Key 요청을 처리 중입니다. 잠시 후 다시 시도해주세요."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            if stored is not None and locked:
+                cache.delete(lock_key)
+        if stored is not None:
+            if stored["fingerprint"] != fingerprint:
+                return Response(
+                    {"detail": "이미 다른 요청에 사용된 Idempotency-Key입니다."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            response = Response(stored["data"], status=stored["status"], headers=stored["headers"])
+            response["Idempotent-Replayed"] = "true"
+            return response
+        try:
+            response = method(self, request, *args, **kwargs)
+            if status.is_success(response.status_code):  # 검증 오류 등은 고쳐서 같은 키로 다시 보낼 수 있게
+                cache.set(cache_key, {
+                    "fingerprint": fingerprint,
+                    "status": response.status_code,
+                    "data": json.loads(json.dumps(response.data, default=str)),
+                    "headers": {k: v for k, v in response.items() if k.lower() == "location"},
+                }, timeout=settings.IDEMPOTENCY_TTL)
+            return response
+        finally:
+            cache.delete(lock_key)
+    return wrapper
+class IdempotentCreateMixin:
+    """CreateModelMixin/ModelViewSet의 create에 Idempotency-Key 처리를 붙임"""
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
@@ -0,0 +1,35 @@
+"""미디어 파일을 이름 해시 앞자리로 하위 디렉터리에 나눠 담는 배치: prefix/ab/이름 (단계마다 hex 2자리 = 256갈래).
+
+한 디렉터리에 수십만 개가 쌓이면 파일 생성과 디렉터리 목록 읽기(ls, 백업 도구)가 느려지므로 디렉터리당 파일 수를 작게 유지한다.
+경로는 파일 이름만으로 정해지고(MEDIA_SHARD_DEPTH 단계), 예전 평평한 경로는 shard_media로 옮긴다.
+"""
+import hashlib
+import os
+import string
+from django.conf import settings
+from django.utils.deconstruct import deconstructible
+from django.utils.text import get_valid_filename
+HEX = set(string.hexdigits.lower())
+def shard_dirs(basename: str, depth: int | None = None) -> list[str]:
+    depth = settings.MEDIA_SHARD_DEPTH if depth is None else depth
+    key = hashlib.md5(basename.encode("utf-8"), usedforsecurity=False).hexdigest()
+    return [key[i * 2:i * 2 + 2] for i in range(depth)]
+def shard(prefix: str, basename: str, depth: int | None = None) -> str:
+    return "/".join([prefix.rstrip("/"), *shard_dirs(basename, depth), basename])
+def is_sharded(name: str, prefix: str) -> bool:
+    """prefix 아래 현재 깊이의 해시 디렉터리에 있는지 (이름 충돌로 바뀐 파일 이름도 인정)"""
+    head = prefix.rstrip("/") + "/"
+    if not name.startswith(head):
+        return False
+    parts = name[len(head):].split("/")
+    dirs = parts[:-1]
+    return len(dirs) == settings.MEDIA_SHARD_DEPTH and all(len(d) == 2 and set(d) <= HEX for d in dirs)
+@deconstructible
+class ShardedUploadTo:
+    """FileField(upload_to=ShardedUploadTo("docs"))"""
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+    def __call__(self, instance, filename: str) -> str:
+        return shard(self.prefix, get_valid_filename(os.path.basename(filename)))
+    def __eq__(self, other):
+        return isinstance(other, ShardedUploadTo) and other.prefix == self.prefix
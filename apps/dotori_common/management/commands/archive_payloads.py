@@ -0,0 +1,75 @@
+import zlib
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.dotori_common import coldstore
+# kind → (모델, ColdTextField, 기준 시각 필드, 추가 조건)
+TARGETS = {
+    "summary": ("dotori_summaries.Summary", "source_text", "created_at", {"status__in": ["DONE", "ERROR"]}),
+    "document": ("dotori_documents.Document", "text_cache", "uploaded_at", {}),
+}
+def _size(text: str) -> int:
+    return len(text.encode("utf-8", "surrogatepass"))
+class Command(BaseCommand):
+    help = "오래된 요약 원문/문서 텍스트를 압축해 미디어 저장소로 옮기고, 줄어든 용량을 보고합니다."
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None, help="이보다 오래된 행 (기본: COLD_STORAGE_DAYS)")
+        parser.add_argument("--kind", choices=sorted(TARGETS), action="append", help="대상 (기본: 전부)")
+        parser.add_argument("--limit", type=int, default=0, help="종류별 최대 행 수 (0=제한 없음)")
+        parser.add_argument("--dry-run", action="store_true", help="옮기지 않고 예상치만 계산")
+        parser.add_argument("--prune", action="store_true", help="어느 행도 가리키지 않는 blob 삭제")
+    def handle(self, *args, **opts):
+        days = settings.COLD_STORAGE_DAYS if opts["days"] is None else opts["days"]
+        cutoff = timezone.now() - timedelta(days=days)
+        for kind in opts["kind"] or sorted(TARGETS):
+            self.archive(kind, cutoff, opts["limit"], opts["dry_run"])
+        if opts["prune"]:
+            self.prune(opts["dry_run"])
+    def archive(self, kind, cutoff, limit, dry_run):
+        model_path, field, date_field, extra = TARGETS[kind]
+        model = apps.get_model(model_path)
+        archive_field = model._meta.get_field(field).archive_field
+        qs = model.objects.filter(**{f"{date_field}__lt": cutoff, f"{archive_field}__isnull": True}, **extra)
+        qs = qs.exclude(**{field: ""}).order_by("id")
+        if limit:
+            qs = qs[:limit]
+        rows = raw = kept = stored = 0
+        for object_id, text in qs.values_list("id", field).iterator(chunk_size=100):
+            head = coldstore.head(text)
+            if len(head) == len(text):
+                continue  # 미리보기보다 짧으면 옮길 이득이 없음
+            if dry_run:
+                meta = {"bytes": len(zlib.compress(text.encode("utf-8", "surrogatepass"), settings.COLD_STORAGE_LEVEL))}
+            else:
+                meta = coldstore.archive_text(text)
+                # 조건부 UPDATE: 그 사이 다른 프로세스가 옮겼으면 건너뜀
+                if not model.objects.filter(**{"id": object_id, f"{archive_field}__isnull": True}).update(
+                    **{field: head, archive_field: meta}
+                ):
+                    continue
+            rows += 1
+            raw += _size(text)
+            kept += _size(head)
+            stored += meta["bytes"]
+        self.stdout.write(
+            f"{kind}: {rows} rows{' (dry-run)' if dry_run else ''}, "
+            f"db {raw:,} → {kept:,} bytes (reclaimed {raw - kept:,}), blobs +{stored:,} bytes, "
+            f"net saved {raw - kept - stored:,} bytes"
+        )
+    def prune(self, dry_run):
+        used = set()
+        for model_path, field, _, _ in TARGETS.values():
+            model = apps.get_model(model_path)
+            archive_field = model._meta.get_field(field).archive_field
+            used.update(
+                a["name"] for a in model.objects.filter(**{f"{archive_field}__isnull": False})
+                .values_list(archive_field, flat=True).iterator()
+            )
+        orphans = coldstore.blob_names() - used
+        if not dry_run:
+            for name in orphans:
+                default_storage.delete(name)
+        self.stdout.write(f"pruned {len(orphans)} blobs{' (dry-run)' if dry_run else ''}")
@@ -0,0 +1,61 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.dotori_common.layout import shard_dirs
+def _per_op(fn, items) -> float:
+    t0 = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - t0) / max(len(items), 1)
+class Command(BaseCommand):
+    help = (
+        "평평한 디렉터리와 해시 하위 디렉터리(prefix/ab/이름) 배치의 생성·조회·목록·전체 순회 시간을 비교합니다. "
+        "(기본: 빈 파일 10만 개, 미디어 저장소와 같은 파일 시스템의 임시 디렉터리)"
+    )
+    def add_arguments(self, parser):
+        parser.add_argument("--files", type=int, default=100_000)
+        parser.add_argument("--lookups", type=int, default=5_000, help="stat 횟수 (있는 파일/없는 파일 각각)")
+        parser.add_argument("--listings", type=int, default=50, help="파일이 든 디렉터리 목록 읽기 횟수")
+        parser.add_argument("--depth", type=int, default=None, help="하위 디렉터리 단계 (기본: MEDIA_SHARD_DEPTH)")
+        parser.add_argument("--dir", default=None, help="측정 위치 (기본: MEDIA_ROOT 아래 임시 디렉터리)")
+    def handle(self, *args, **opts):
+        depth = settings.MEDIA_SHARD_DEPTH if opts["depth"] is None else opts["depth"]
+        rnd = random.Random(7)
+        names = [f"{rnd.getrandbits(128):032x}.pdf" for _ in range(opts["files"])]
+        absent = [f"{rnd.getrandbits(128):032x}.pdf" for _ in range(opts["lookups"])]
+        probes = rnd.sample(names, min(opts["lookups"], len(names)))
+        parent = opts["dir"] or settings.MEDIA_ROOT
+        os.makedirs(parent, exist_ok=True)
+        base = tempfile.mkdtemp(prefix="bench_media_", dir=parent)
+        try:
+            for label, d in (("flat", 0), (f"sharded(depth={depth})", depth)):
+                root = os.path.join(base, label)
+                self.bench(label, root, d, names, absent, probes, opts["listings"])
+        finally:
+            shutil.rmtree(base, ignore_errors=True)
+    def bench(self, label, root, depth, names, absent, probes, listings):
+        def path(name): return os.path.join(root, *shard_dirs(name, depth), name)
+        made = set()
+        def create(name):
+            p = path(name)
+            folder = os.path.dirname(p)
+            if folder not in made:
+                os.makedirs(folder, exist_ok=True)
+                made.add(folder)
+            open(p, "wb").close()
+        create_s = _per_op(create, names) * len(names)
+        hit_us = _per_op(lambda name: os.stat(path(name)), probes) * 1e6
+        miss_us = _per_op(lambda name: os.path.exists(path(name)), absent) * 1e6
+        list_ms = _per_op(lambda name: os.listdir(os.path.dirname(path(name))), probes[:listings]) * 1e3
+        t0 = time.perf_counter()
+        total = sum(len(files) for _, _, files in os.walk(root))
+        walk_s = time.perf_counter() - t0
+        self.stdout.write(
+            f"{label}: {total:,} files in {len(made):,} dirs, create {create_s:.2f}s, "
+            f"stat hit {hit_us:.1f}µs / miss {miss_us:.1f}µs, list containing dir {list_ms:.2f}ms, "
+            f"full walk {walk_s:.2f}s"
+        )
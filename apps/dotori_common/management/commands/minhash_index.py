@@ -0,0 +1,28 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from apps.dotori_common import minhash
+from apps.dotori_common.models import MinHashSignature
+# kind → (모델, 텍스트 필드)
+SOURCES = {
+    "summary": ("dotori_summaries.Summary", "source_text"),
+    "document": ("dotori_documents.Document", "text_cache"),
+}
+class Command(BaseCommand):
+    help = "기존 요약/문서의 MinHash 서명과 LSH 버킷을 채웁니다 (이미 색인된 행은 건너뜀)."
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=sorted(SOURCES), action="append", help="대상 (기본: 전부)")
+        parser.add_argument("--rebuild", action="store_true", help="이미 색인된 행도 다시 계산")
+    def handle(self, *args, **opts):
+        for kind in opts["kind"] or sorted(SOURCES):
+            model_path, field = SOURCES[kind]
+            qs = apps.get_model(model_path).objects.exclude(**{field: ""})
+            if not opts["rebuild"]:
+                qs = qs.exclude(id__in=MinHashSignature.objects.filter(kind=kind).values("object_id"))
+            done = 0
+            # values_list 대신 인스턴스로 읽음: 압축 보관된 행도 전체 텍스트로 (ColdTextField 지연 로딩)
+            for obj in qs.iterator(chunk_size=200):
+                sig = minhash.signature(getattr(obj, field))
+                if sig is not None:
+                    minhash.index(kind, obj.id, sig, owner_id=obj.owner_id)
+                    done += 1
+            self.stdout.write(f"{kind}: {done} indexed")
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MinHashSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('owner_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('signature', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('key', models.CharField(max_length=24)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('owner_id', models.PositiveBigIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'key'], name='dotori_comm_kind_9aa645_idx'), models.Index(fields=['kind', 'object_id'], name='dotori_comm_kind_ebf6e9_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='minhashsignature',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='uniq_minhash_kind_object'),
+        ),
+    ]
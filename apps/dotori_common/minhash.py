@@ -0,0 +1,80 @@
+"""MinHash 서명 + LSH 인덱스로 거의 같은 텍스트 찾기.
+
+정확한 해시는 공백·머리글·오타 하나만 달라도 놓친다. 문자 k-gram 집합의 Jaccard 유사도를
+MinHash 서명(정수 num_perm개)으로 추정하고, 서명을 밴드로 나눠 같은 버킷에 들어간 것만 후보로 비교한다.
+"""
+import hashlib
+import unicodedata
+from functools import lru_cache
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from .models import LSHBucket, MinHashSignature
+_PRIME = (1 << 31) - 1
+_BLOCK = 4096  # 한 번에 계산하는 shingle 수 (num_perm × BLOCK 행렬 메모리 상한)
+@lru_cache
+def _perm(num_perm: int):
+    rng = np.random.default_rng(20240601)  # 고정 시드: 저장된 서명과 항상 같은 해시 함수
+    a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+    return a[:, None], b[:, None]
+def shingles(text: str, k: int | None = None) -> np.ndarray:
+    """공백 제거 + NFC + casefold 후 문자 k-gram 해시의 집합 (중복 제거)"""
+    k = k or settings.MINHASH_SHINGLE
+    flat = "".join(unicodedata.normalize("NFC", text or "").casefold().split())
+    codes = np.frombuffer(flat.encode("utf-32-le", "surrogatepass"), dtype=np.uint32).astype(np.uint64)
+    n = len(codes) - k + 1
+    if n <= 0:
+        return np.empty(0, dtype=np.uint64)
+    h = np.zeros(n, dtype=np.uint64)
+    for j in range(k):  # 다항식 롤링 해시 (uint64 오버플로는 그대로 mod 2^64)
+        h = h * np.uint64(1_000_003) + codes[j:j + n]
+    return np.unique((h ^ (h >> np.uint64(31))) % np.uint64(_PRIME))
+def signature(text: str, num_perm: int | None = None) -> np.ndarray | None:
+    """MinHash 서명 (uint32 num_perm개). k-gram이 하나도 없으면 None"""
+    num_perm = num_perm or settings.MINHASH_PERMUTATIONS
+    x = shingles(text)
+    if not len(x):
+        return None
+    a, b = _perm(num_perm)
+    mins = np.full(num_perm, _PRIME, dtype=np.uint64)
+    for i in range(0, len(x), _BLOCK):
+        block = (a * x[None, i:i + _BLOCK] + b) % np.uint64(_PRIME)
+        np.minimum(mins, block.min(axis=1), out=mins)
+    return mins.astype(np.uint32)
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """두 서명이 일치하는 비율 = Jaccard 유사도 추정치"""
+    return float(np.mean(a == b)) if len(a) == len(b) else 0.0
+def band_keys(sig: np.ndarray, bands: int | None = None) -> list[str]:
+    bands = bands or settings.MINHASH_BANDS
+    return [
+        f"{i}:{hashlib.blake2b(band.tobytes(), digest_size=8).hexdigest()}"
+        for i, band in enumerate(np.array_split(sig, bands))
+    ]
+def _load(raw) -> np.ndarray:
+    return np.frombuffer(bytes(raw), dtype=np.uint32)
+def index(kind: str, object_id: int, sig: np.ndarray, owner_id: int | None = None):
+    """서명과 밴드 버킷 저장 (같은 객체를 다시 넣으면 교체)"""
+    with transaction.atomic():
+        forget(kind, [object_id])
+        MinHashSignature.objects.create(kind=kind, object_id=object_id, owner_id=owner_id, signature=sig.tobytes())
+        LSHBucket.objects.bulk_create(
+            LSHBucket(kind=kind, key=key, object_id=object_id, owner_id=owner_id) for key in band_keys(sig)
+        )
+def forget(kind: str, object_ids):
+    MinHashSignature.objects.filter(kind=kind, object_id__in=object_ids).delete()
+    LSHBucket.objects.filter(kind=kind, object_id__in=object_ids).delete()
+def query(kind: str, sig: np.ndarray, owner_id: int, threshold: float | None = None,
+          exclude=(), limit: int = 10) -> list[tuple[int, float]]:
+    """버킷이 하나라도 겹치는 후보 중 유사도 threshold 이상을 [(object_id, 유사도), ...] 높은 순으로.
+
+    항상 owner_id 사용자의 것만 찾는다 (다른 사용자 글은 후보에 들지 않음).
+    """
+    threshold = settings.MINHASH_THRESHOLD if threshold is None else threshold
+    buckets = LSHBucket.objects.filter(kind=kind, owner_id=owner_id, key__in=band_keys(sig))
+    ids = set(buckets.exclude(object_id__in=exclude).values_list("object_id", flat=True)[:settings.MINHASH_MAX_CANDIDATES])
+    rows = MinHashSignature.objects.filter(kind=kind, owner_id=owner_id, object_id__in=ids).values_list("object_id", "signature")
+    found = [(object_id, similarity(sig, _load(raw))) for object_id, raw in rows]
+    found = [(object_id, score) for object_id, score in found if score >= threshold]
+    found.sort(key=lambda r: (-r[1], -r[0]))
+    return found[:limit]
@@ -0,0 +1,20 @@
+from django.db import models
+# 거의 같은 텍스트 찾기(minhash.py): 객체별 MinHash 서명 + LSH 밴드 버킷
+# kind로 대상(요약 원문, 문서 텍스트 등)을 구분하고 owner_id로 범위를 좁힌다
+class MinHashSignature(models.Model):
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    owner_id = models.PositiveBigIntegerField(null=True, blank=True)
+    signature = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["kind", "object_id"], name="uniq_minhash_kind_object")]
+    def __str__(self): return f"MinHashSignature {self.kind}:{self.object_id}"
+class LSHBucket(models.Model):
+    kind = models.CharField(max_length=20)
+    key = models.CharField(max_length=24)  # "밴드번호:밴드해시"
+    object_id = models.PositiveBigIntegerField()
+    owner_id = models.PositiveBigIntegerField(null=True, blank=True)
+    class Meta:
+        indexes = [models.Index(fields=["kind", "key"]), models.Index(fields=["kind", "object_id"])]
+    def __str__(self): return f"LSHBucket {self.kind}:{self.key}"
@@ -0,0 +1,53 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    (created_at, id) 키셋 페이지네이션 - OFFSET 없이 인덱스만 타고 내려감
+    DRF 기본 커서는 첫 정렬 필드만 위치로 쓰고 동률 구간은 offset으로 건너뛰어, 스크롤 중 새 행이 생기면 중복/누락이 남.
+    위치에 정렬 필드 전체를 담아 튜플 비교로 다음 페이지를 찾는다.
+    """
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor = super().decode_cursor(request)
+        position = cursor.position if cursor else None
+        if position is not None:
+            ordering = self.get_ordering(request, queryset, view)
+            try:
+                queryset = queryset.filter(self.after(ordering, position, cursor.reverse))
+            except (ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        page = super().paginate_queryset(queryset, request, view)
+        if position is not None and page is not None:
+            # DRF에는 위치 없는 커서를 넘겼으므로(decode_cursor) 되돌아가는 쪽 링크만 복원
+            if self.cursor.reverse:
+                self.has_next, self.next_position = True, position
+            else:
+                self.has_previous, self.previous_position = True, position
+            self.display_page_controls = self.template is not None
+        return page
+    def decode_cursor(self, request):
+        # 위치 필터는 paginate_queryset에서 튜플 비교로 이미 걸었음
+        cursor = super().decode_cursor(request)
+        return cursor._replace(position=None) if cursor else None
+    def after(self, ordering, position: str, reverse: bool) -> Q:
+        # (a, b) 뒤 ⇔ a가 뒤 또는 (a 같고 b가 뒤); 필드별 정렬 방향과 커서 방향으로 lt/gt 결정
+        values = position.split("|")
+        if len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        condition, equal = Q(), {}
+        for field, value in zip(ordering, values):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") != reverse else "gt"
+            condition |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return condition
+    def _get_position_from_instance(self, instance, ordering):
+        base = super()._get_position_from_instance
+        return "|".join(base(instance, (field,)) for field in ordering)
+class UploadedAtCursorPagination(CreatedAtCursorPagination):
+    ordering = ("-uploaded_at", "-id")
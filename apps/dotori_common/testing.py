@@ -0,0 +1,30 @@
+"""테스트 공통: 임시 MEDIA_ROOT, Celery 즉시 실행(eager), 로그인한 APIClient."""
+import shutil
+import tempfile
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+class DotoriTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp(prefix="dotori-test-")
+        # Celery 설정은 CELERY_ 접두어로 Django settings에서 읽으므로 settings 쪽을 바꿈
+        cls._settings = override_settings(
+            MEDIA_ROOT=cls.media_root, DOCUMENT_UPLOAD_TEMP_DIR="",
+            CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True,
+        )
+        cls._settings.enable()
+        super().setUpClass()
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._settings.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+    def setUp(self):
+        cache.clear()
+    def login(self, username: str = "u1"):
+        user = get_user_model().objects.create_user(username=username, password="pw-1234")
+        client = APIClient()
+        client.force_authenticate(user)
+        return client, user
@@ -0,0 +1,116 @@
+import hashlib
+import io
+import os
+import shutil
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import SystemCheckError
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from apps.dotori_summaries.models import Summary
+from . import coldstore, downloads, idempotency
+from .testing import DotoriTestCase
+class IdempotencyTests(DotoriTestCase):
+    def post(self, client, key, text="도토리는 참나무 열매입니다. 다람쥐가 좋아합니다."):
+        with self.captureOnCommitCallbacks(execute=True):
+            return client.post("/api/summaries/create/", {"source_text": text}, format="json", HTTP_IDEMPOTENCY_KEY=key)
+    def test_retry_is_replayed_once(self):
+        client, _ = self.login()
+        first = self.post(client, "k1")
+        again = self.post(client, "k1")
+        self.assertEqual((first.status_code, again.status_code), (201, 201))
+        self.assertEqual(again["Idempotent-Replayed"], "true")
+        self.assertEqual(again.data["id"], first.data["id"])
+        self.assertEqual(Summary.objects.count(), 1)
+    def test_same_key_with_other_body_is_422(self):
+        client, _ = self.login()
+        self.post(client, "k1")
+        self.assertEqual(self.post(client, "k1", text="다른 글입니다.").status_code, 422)
+        self.assertEqual(Summary.objects.count(), 1)
+    def test_key_is_scoped_per_user(self):
+        client, _ = self.login()
+        other, _ = self.login("u2")
+        self.assertNotEqual(self.post(client, "k1").data["id"], self.post(other, "k1").data["id"])
+    def test_in_flight_key_is_409(self):
+        client, user = self.login()
+        cache_key = "dotori:idem:SummaryCreateView:%s:%s" % (user.id, hashlib.sha256(b"k1").hexdigest())
+        cache.add(f"{cache_key}:lock", 1)
+        self.assertEqual(self.post(client, "k1").status_code, 409)
+        self.assertEqual(Summary.objects.count(), 0)
+    def test_result_stored_before_lock_is_replayed(self):
+        client, _ = self.login()
+        first = self.post(client, "k1")
+        real_get, calls = cache.get, []
+        def get(key, *args, **kwargs):
+            # 첫 조회 뒤, 잠금을 잡기 전에 앞선 요청이 끝난 것처럼
+            calls.append(key)
+            return None if len(calls) == 1 else real_get(key, *args, **kwargs)
+        with mock.patch.object(idempotency.cache, "get", side_effect=get):
+            again = self.post(client, "k1")
+        self.assertEqual(again["Idempotent-Replayed"], "true")
+        self.assertEqual(again.data["id"], first.data["id"])
+        self.assertEqual(Summary.objects.count(), 1)
+        self.assertIsNone(cache.get(f"{calls[0]}:lock"))
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        cases = {
+            "bytes=0-3": (0, 3), "bytes=5-": (5, 9), "bytes=-4": (6, 9), "bytes=8-100": (8, 9), "bytes=-100": (0, 9),
+            "bytes=5-2": None, "bytes=0-1,4-5": None, "items=0-1": None, "bytes=-": None, None: None,
+            "bytes=10-": False, "bytes=10-12": False, "bytes=-0": False,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(downloads.parse_range(header, 10), expected)
+class SharedCacheCheckTests(DotoriTestCase):
+    def test_local_cache_fails_deploy_check(self):
+        with self.assertRaisesMessage(SystemCheckError, "dotori_common.E001"):
+            call_command("check", deploy=True, fail_level="ERROR", tags=["caches"])
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}})
+    def test_redis_cache_passes(self):
+        call_command("check", deploy=True, fail_level="ERROR", tags=["caches"], stdout=io.StringIO())
+@override_settings(LIST_PREVIEW_CHARS=20)
+class ArchivePayloadsTests(DotoriTestCase):
+    text = "도토리는 참나무 열매입니다. " * 200
+    def setUp(self):
+        super().setUp()
+        shutil.rmtree(os.path.join(self.media_root, "cold"), ignore_errors=True)
+        self.api, user = self.login()
+        self.old_at = old = timezone.now() - timedelta(days=400)
+        self.old = Summary.objects.create(owner=user, source_text=self.text, status=Summary.Status.DONE, result="요약")
+        self.running = Summary.objects.create(owner=user, source_text=self.text, status=Summary.Status.RUNNING)
+        self.recent = Summary.objects.create(owner=user, source_text=self.text, status=Summary.Status.DONE, result="요약")
+        Summary.objects.filter(id__in=[self.old.id, self.running.id]).update(created_at=old)
+    def archive(self, *args):
+        out = io.StringIO()
+        call_command("archive_payloads", "--kind", "summary", *args, stdout=out)
+        return out.getvalue()
+    def stored(self, summary):
+        return Summary.objects.filter(id=summary.id).values_list("source_text", "source_archive").get()
+    def test_old_finished_rows_move_to_cold_storage_and_read_back(self):
+        self.assertIn("summary: 1 rows (dry-run)", self.archive("--dry-run"))
+        self.assertIsNone(self.stored(self.old)[1])
+        self.assertIn("summary: 1 rows,", self.archive())
+        head, archive = self.stored(self.old)
+        self.assertEqual(head, self.text[:20])
+        self.assertEqual(archive["chars"], len(self.text))
+        self.assertLess(archive["bytes"], len(self.text.encode()))
+        self.assertIsNone(self.stored(self.running)[1])
+        self.assertIsNone(self.stored(self.recent)[1])
+        self.assertEqual(Summary.objects.get(id=self.old.id).source_text, self.text)
+        self.assertEqual(self.api.get(f"/api/summaries/{self.old.id}/").data["source_text"], self.text)
+        listed = {row["id"]: row for row in self.api.get("/api/summaries/").data["results"]}
+        self.assertEqual(listed[self.old.id]["source_length"], len(self.text))
+        self.assertEqual(listed[self.old.id]["preview"], self.text[:20])
+        self.assertIn("summary: 0 rows,", self.archive())
+    def test_identical_text_shares_one_blob_and_prune_keeps_it_until_unused(self):
+        Summary.objects.filter(id=self.recent.id).update(created_at=self.old_at)
+        self.archive()
+        self.assertEqual(self.stored(self.old)[1]["name"], self.stored(self.recent)[1]["name"])
+        self.assertEqual(len(coldstore.blob_names()), 1)
+        self.assertIn("pruned 0 blobs", self.archive("--prune"))
+        Summary.objects.filter(id__in=[self.old.id, self.recent.id]).delete()
+        self.assertIn("pruned 1 blobs (dry-run)", self.archive("--prune", "--dry-run"))
+        self.assertIn("pruned 1 blobs", self.archive("--prune"))
+        self.assertEqual(coldstore.blob_names(), set())
@@ -0,0 +1,74 @@
+"""내용 주소(content-addressable) 저장: 업로드 파일은 sha256 이름으로 한 번만 저장하고 참조 수로 공유한다.
+
+Document.file은 Blob.file과 같은 저장소 이름을 가리키고(복사 없음), 마지막 문서가 지워지면 파일도 지운다.
+sha256은 업로드 핸들러가 조각을 받는 대로 계산하므로 파일을 다시 읽지 않는다.
+"""
+import hashlib
+import os
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from apps.dotori_common import layout
+from .models import Blob
+class _HashingMixin:
+    # 이 핸들러가 실제로 받은 조각(다음 핸들러로 넘기지 않은 것)만 해시 → 완성된 파일에 .sha256
+    def new_file(self, *args, **kwargs):
+        self.digest = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+    def receive_data_chunk(self, raw_data, start):
+        passed = super().receive_data_chunk(raw_data, start)
+        if passed is None:
+            self.digest.update(raw_data)
+        return passed
+    def file_complete(self, file_size):
+        f = super().file_complete(file_size)
+        if f is not None:
+            f.sha256 = self.digest.hexdigest()
+        return f
+class HashingMemoryFileUploadHandler(_HashingMixin, MemoryFileUploadHandler):
+    pass
+class HashingTemporaryFileUploadHandler(_HashingMixin, TemporaryFileUploadHandler):
+    pass
+def sha256_of(f) -> str:
+    """업로드 핸들러가 계산해 둔 값, 없으면 조각 단위로 읽어 계산"""
+    digest = getattr(f, "sha256", None)
+    if digest:
+        return digest
+    h = hashlib.sha256()
+    for chunk in f.chunks():
+        h.update(chunk)
+    f.seek(0)
+    return h.hexdigest()
+def blob_name(digest: str, filename: str) -> str:
+    # blobs/<해시 디렉터리>/<sha256>.<ext> - 확장자는 형식 판별(extractors.detect_format)과 다운로드 Content-Type에 쓰이므로 유지
+    return layout.shard("blobs", f"{digest}{os.path.splitext(filename)[1].lower()}")
+def _add_ref(digest: str) -> Blob | None:
+    if Blob.objects.filter(sha256=digest).update(refs=F("refs") + 1):
+        return Blob.objects.get(sha256=digest)
+    return None
+def acquire(f, digest: str, filename: str) -> Blob:
+    """같은 내용이 이미 있으면 참조 수만 +1, 없으면 저장 (임시 파일 업로드면 복사 대신 이동)"""
+    blob = _add_ref(digest)
+    if blob is not None:
+        return blob
+    name = default_storage.save(blob_name(digest, filename), f)
+    try:
+        with transaction.atomic():
+            return Blob.objects.create(sha256=digest, file=name, size=default_storage.size(name), refs=1)
+    except IntegrityError:
+        # 같은 파일이 동시에 올라온 경우: 먼저 만든 쪽을 쓰고 방금 쓴 사본은 지움
+        default_storage.delete(name)
+        return _add_ref(digest)
+def release(blob_id: int):
+    """참조 수 -1, 0이 되면 행을 지우고 커밋 후 파일 삭제"""
+    with transaction.atomic():
+        blob = Blob.objects.select_for_update().filter(id=blob_id).first()
+        if blob is None:
+            return
+        if blob.refs > 1:
+            Blob.objects.filter(id=blob_id).update(refs=F("refs") - 1)
+            return
+        name = blob.file.name
+        blob.delete()
+        transaction.on_commit(lambda: default_storage.delete(name))
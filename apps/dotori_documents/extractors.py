@@ -0,0 +1,142 @@
+"""형식별 텍스트 추출기 (PDF, DOCX, HWP, HWPX).
+
+tasks.extract_document가 프로세스 풀에서 실행하므로 모듈 수준 함수만 두고 인자/결과는 경로·문자열만 주고받는다.
+문서는 '단위'(PDF 페이지, HWP/HWPX 구역, DOCX는 전체 1개)로 나눠 앞에서부터 조금씩 추출한다.
+"""
+import re
+import struct
+import zipfile
+import zlib
+from xml.etree import ElementTree
+FORMATS = {".pdf": "pdf", ".docx": "docx", ".hwp": "hwp", ".hwpx": "hwpx"}
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+HWPX_SECTION_RE = re.compile(r"^Contents/section(\d+)\.xml$")
+HWP_SECTION_RE = re.compile(r"^Section(\d+)$")
+HWPTAG_PARA_TEXT = 67  # HWPTAG_BEGIN(16) + 51
+# HWP 제어 문자 중 한 글자(2바이트)짜리, 나머지 0~31은 8글자(16바이트) 크기의 인라인/확장 제어
+HWP_CHAR_CONTROLS = {0, 10, 13, 24, 25, 26, 27, 28, 29, 30, 31}
+class ExtractError(Exception):
+    pass
+def detect_format(name: str) -> str | None:
+    lower = name.lower()
+    for suffix, fmt in FORMATS.items():
+        if lower.endswith(suffix):
+            return fmt
+    return None
+def count_units(path: str, fmt: str) -> int:
+    if fmt == "pdf":
+        return len(_pdf_reader(path).pages)
+    if fmt == "docx":
+        return 1
+    if fmt == "hwpx":
+        return len(_hwpx_sections(path))
+    if fmt == "hwp":
+        return len(_hwp_sections(path))
+    raise ExtractError(f"지원하지 않는 형식: {fmt}")
+def extract_units(path: str, fmt: str, start: int, end: int) -> list[str]:
+    """[start, end) 단위의 텍스트 목록"""
+    if fmt == "pdf":
+        pages = _pdf_reader(path).pages
+        return [(pages[i].extract_text() or "").strip() for i in range(start, end)]
+    if fmt == "docx":
+        return [_docx_text(path)] if start == 0 else []
+    if fmt == "hwpx":
+        sections = _hwpx_sections(path)
+        with zipfile.ZipFile(path) as z:
+            return [_hwpx_text(z, sections[i]) for i in range(start, end)]
+    if fmt == "hwp":
+        import olefile
+        sections = _hwp_sections(path)
+        with olefile.OleFileIO(path) as ole:
+            compressed = _hwp_compressed(ole)
+            return [_hwp_text(ole.openstream(sections[i]).read(), compressed) for i in range(start, end)]
+    raise ExtractError(f"지원하지 않는 형식: {fmt}")
+def _pdf_reader(path: str):
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    if reader.is_encrypted and not reader.decrypt(""):
+        raise ExtractError("암호가 걸린 PDF입니다.")
+    return reader
+def _docx_text(path: str) -> str:
+    # word/document.xml을 iterparse로 문단(w:p)마다 흘려 읽음
+    paragraphs = []
+    with zipfile.ZipFile(path) as z, z.open("word/document.xml") as f:
+        parts = []
+        for _, el in ElementTree.iterparse(f, events=("end",)):
+            if el.tag == W_NS + "t":
+                parts.append(el.text or "")
+            elif el.tag == W_NS + "tab":
+                parts.append("\t")
+            elif el.tag in (W_NS + "br", W_NS + "cr"):
+                parts.append("\n")
+            elif el.tag == W_NS + "p":
+                paragraphs.append("".join(parts))
+                parts = []
+                el.clear()
+    return "\n".join(paragraphs).strip()
+def _hwpx_sections(path: str) -> list[str]:
+    with zipfile.ZipFile(path) as z:
+        found = [(int(m[1]), name) for name in z.namelist() if (m := HWPX_SECTION_RE.match(name))]
+    return [name for _, name in sorted(found)]
+def _hwpx_text(z: zipfile.ZipFile, name: str) -> str:
+    paragraphs = []
+    with z.open(name) as f:
+        parts = []
+        for _, el in ElementTree.iterparse(f, events=("end",)):
+            tag = el.tag.rsplit("}", 1)[-1]
+            if tag == "t":
+                parts.append("".join(el.itertext()))
+            elif tag == "p":
+                paragraphs.append("".join(parts))
+                parts = []
+                el.clear()
+    return "\n".join(p for p in paragraphs if p).strip()
+def _hwp_sections(path: str) -> list[str]:
+    import olefile
+    if not olefile.isOleFile(path):
+        raise ExtractError("HWP 5.0 형식이 아닙니다.")
+    with olefile.OleFileIO(path) as ole:
+        if ole.exists("ViewText"):
+            raise ExtractError("배포용(읽기 전용) HWP는 지원하지 않습니다.")
+        found = [
+            (int(m[1]), "/".join(entry))
+            for entry in ole.listdir()
+            if len(entry) == 2 and entry[0] == "BodyText" and (m := HWP_SECTION_RE.match(entry[1]))
+        ]
+    return [name for _, name in sorted(found)]
+def _hwp_compressed(ole) -> bool:
+    header = ole.openstream("FileHeader").read()
+    return bool(struct.unpack_from("<I", header, 36)[0] & 1)
+def _hwp_text(data: bytes, compressed: bool) -> str:
+    if compressed:
+        data = zlib.decompress(data, -15)
+    paragraphs = []
+    pos = 0
+    while pos + 4 <= len(data):
+        header = struct.unpack_from("<I", data, pos)[0]
+        pos += 4
+        tag, size = header & 0x3FF, (header >> 20) & 0xFFF
+        if size == 0xFFF:
+            size = struct.unpack_from("<I", data, pos)[0]
+            pos += 4
+        if tag == HWPTAG_PARA_TEXT:
+            paragraphs.append(_hwp_para_text(data[pos:pos + size]))
+        pos += size
+    return "\n".join(p for p in paragraphs if p).strip()
+def _hwp_para_text(raw: bytes) -> str:
+    chars = struct.unpack(f"<{len(raw) // 2}H", raw[:len(raw) // 2 * 2])
+    kept = []
+    i = 0
+    while i < len(chars):
+        code = chars[i]
+        if code >= 32:
+            kept.append(code)
+        elif code in (10, 13):
+            kept.append(10)
+        elif code in (30, 31):  # 묶음 빼기표, 고정폭 빈칸
+            kept.append(32)
+        elif code not in HWP_CHAR_CONTROLS:
+            i += 7  # 인라인/확장 제어는 8글자를 차지
+        i += 1
+    # 서로게이트 쌍(한자 확장 등)은 UTF-16으로 다시 묶어 디코딩
+    return struct.pack(f"<{len(kept)}H", *kept).decode("utf-16-le", "replace").strip()
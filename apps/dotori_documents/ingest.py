@@ -0,0 +1,161 @@
+import codecs
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.dotori_common import minhash
+from .models import Blob, Document
+from . import blobs, extractors, sidecar
+READ_SIZE = 64 * 1024
+TEXT_TYPES = ("text/plain", "application/json")
+BOMS = ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+def is_text(name: str, content_type: str | None = None) -> bool:
+    return content_type in TEXT_TYPES or name.endswith(".txt")
+def detect_encoding(sample: bytes) -> str:
+    """BOM → UTF-8 → CP949(EUC-KR 포함) 순으로 앞부분 표본을 엄격하게 디코딩해 보고 결정"""
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    for encoding in ("utf-8", "cp949"):
+        try:
+            codecs.getincrementaldecoder(encoding)("strict").decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return "utf-8"
+class StreamDecoder:
+    """앞부분 표본으로 고른 인코딩으로 엄격하게 디코딩하다가, 깨지는 바이트를 만나면 그 지점부터 다시 판단.
+
+    (앞 64KB가 ASCII뿐인 CP949 파일 등) 한 번 바꾼 뒤로는 잘못된 바이트를 U+FFFD로 바꿔 계속 읽는다.
+    """
+    def __init__(self, sample: bytes):
+        self.encoding = detect_encoding(sample)
+        self.errors = "strict"
+        self.decoder = codecs.getincrementaldecoder(self.encoding)(self.errors)
+    def decode(self, data: bytes, final: bool = False) -> str:
+        try:
+            return self.decoder.decode(data, final)
+        except UnicodeDecodeError as e:
+            # e.object = 디코더에 남아 있던 바이트 + data, 깨진 지점 앞까지는 올바르게 디코딩된 부분
+            head, rest = e.object[:e.start], e.object[e.start:]
+            encoding = detect_encoding(rest)
+            if encoding == self.encoding:
+                encoding = "cp949" if self.encoding != "cp949" else "utf-8"
+            self.encoding, self.errors = encoding, "replace"
+            self.decoder = codecs.getincrementaldecoder(encoding)(self.errors)
+            return head.decode(e.encoding) + self.decoder.decode(rest, final)
+def read_text(f, max_chars: int | None = None, sink=None) -> str:
+    """파일 객체를 조각 단위로 디코딩 (메모리는 max_chars만큼만).
+
+    sink(SidecarWriter 등)가 없으면 상한을 넘는 뒷부분은 읽지 않고, 있으면 끝까지 디코딩해 sink에 모두 씀.
+    """
+    max_chars = max_chars or settings.DOCUMENT_TEXT_MAX_CHARS
+    f.seek(0)
+    sample = f.read(READ_SIZE)
+    decoder = StreamDecoder(sample)
+    pieces, count, chunk = [], 0, sample
+    while chunk and (count < max_chars or sink is not None):
+        text = decoder.decode(chunk).replace("\x00", "")  # NUL은 PostgreSQL TEXT에 저장 불가
+        if sink is not None:
+            sink.write(text)
+        if count < max_chars:
+            pieces.append(text[:max_chars - count])
+            count += len(pieces[-1])
+        chunk = f.read(READ_SIZE)
+    if not chunk:
+        tail = decoder.decode(b"", final=True)
+        if sink is not None:
+            sink.write(tail)
+        if count < max_chars:
+            pieces.append(tail[:max_chars - count])
+    f.seek(0)
+    return "".join(pieces)
+def decode_upload(f) -> tuple[str, str]:
+    """텍스트 업로드 → (text_cache용 앞부분, 전체 텍스트 사이드카 이름) 한 번 읽어서 둘 다"""
+    with sidecar.building() as writer:
+        text = read_text(f, sink=writer)
+        return text, sidecar.store(writer)
+def processed_twin(blob_id: int, exclude: int | None = None) -> Document | None:
+    """같은 blob(같은 바이트)을 가리키면서 추출을 마친 문서 → 결과를 그대로 재사용"""
+    return (
+        Document.objects.filter(blob_id=blob_id, extraction_status=Document.Extraction.DONE)
+        .exclude(id=exclude).order_by("id").first()
+    )
+def _twin_fields(twin: Document) -> dict:
+    # 사이드카(text_file)는 복사하지 않고 같은 이름을 공유 (삭제는 release_text_file)
+    return dict(
+        text_cache=twin.text_cache, text_file=twin.text_file.name, extraction_status=Document.Extraction.DONE,
+        extraction_done=twin.extraction_done, extraction_total=twin.extraction_total,
+    )
+def store_upload(f, filename: str, digest: str | None = None) -> dict:
+    """업로드 파일 → Document 생성 필드 (blob, file, 텍스트 파일이면 text_cache/text_file).
+
+    내용이 같은 파일은 blob 하나만 저장하고, 이미 처리된 적 있으면 디코딩/추출 없이 그 결과를 가져온다.
+    """
+    digest = digest or blobs.sha256_of(f)
+    blob_id = Blob.objects.filter(sha256=digest).values_list("id", flat=True).first()
+    twin = processed_twin(blob_id) if blob_id else None
+    fields = {}
+    if twin is not None:
+        fields = _twin_fields(twin)
+    elif not extractors.detect_format(filename) and is_text(filename, getattr(f, "content_type", None)):
+        text, text_file = decode_upload(f)
+        fields = dict(text_cache=text, text_file=text_file, extraction_status=Document.Extraction.DONE)
+    # 디코딩이 끝난 뒤 저장 (임시 파일 업로드는 저장소로 이동되므로)
+    blob = blobs.acquire(f, digest, filename)
+    return dict(fields, blob=blob, file=blob.file.name)
+def discard_upload(fields: dict):
+    """store_upload 결과로 Document를 만들지 못했을 때: blob 참조와 (다른 문서가 쓰지 않는) 사이드카를 돌려줌"""
+    name = fields.get("text_file")
+    if name and not Document.objects.filter(text_file=name).exists():
+        sidecar.delete(name)
+    blobs.release(fields["blob"].id)
+def reuse_extraction(doc: Document) -> bool:
+    """같은 blob의 추출 결과가 이미 있으면 복사해 DONE으로"""
+    twin = processed_twin(doc.blob_id, exclude=doc.id) if doc.blob_id else None
+    if twin is None:
+        return False
+    fields = _twin_fields(twin)
+    Document.objects.filter(id=doc.id).update(updated_at=timezone.now(), **fields)
+    for name, value in fields.items():
+        setattr(doc, name, value)
+    return True
+def release_text_file(doc: Document):
+    # 사이드카는 같은 blob의 문서끼리 공유하므로 마지막 문서일 때만 삭제
+    name = doc.text_file.name
+    if name and not Document.objects.filter(text_file=name).exclude(id=doc.id).exists():
+        sidecar.delete(name)
+def index_text(doc: Document):
+    # 유사 문서 색인 (MinHash)
+    sig = minhash.signature(doc.text_cache) if doc.text_cache else None
+    if sig is not None:
+        minhash.index("document", doc.id, sig, owner_id=doc.owner_id)
+def _stale_before():
+    return timezone.now() - timedelta(seconds=settings.DOCUMENT_EXTRACT_RUNNING_TIMEOUT)
+def claim_extraction(document_id: int) -> bool:
+    """PENDING(또는 임대가 만료된 RUNNING) → RUNNING. 조건부 UPDATE 한 번이라 중복 전달된 작업은 여기서 걸러짐"""
+    Extraction = Document.Extraction
+    stale = Q(extraction_status=Extraction.RUNNING, updated_at__lt=_stale_before())
+    return bool(
+        Document.objects.filter(id=document_id)
+        .filter(Q(extraction_status=Extraction.PENDING) | stale)
+        .update(extraction_status=Extraction.RUNNING, updated_at=timezone.now())
+    )
+def extraction_stale(doc: Document) -> bool:
+    # RUNNING인데 임대 시간 동안 진행률 갱신이 없음 (워커가 죽었거나 OOM)
+    return doc.extraction_status == Document.Extraction.RUNNING and doc.updated_at < _stale_before()
+def start_extraction(doc: Document):
+    """PDF/DOCX/HWP 추출 작업을 PENDING으로 두고 커밋 후 발송 (결과/진행률은 Document에 기록)"""
+    from .tasks import extract_document
+    fields = dict(extraction_status=Document.Extraction.PENDING, extraction_done=0, extraction_total=0, extraction_error="")
+    Document.objects.filter(id=doc.id).update(updated_at=timezone.now(), **fields)
+    for name, value in fields.items():
+        setattr(doc, name, value)
+    transaction.on_commit(lambda: extract_document.delay(doc.id))
+def after_upload(doc: Document):
+    """업로드 직후 처리 (일반 업로드와 이어받기 업로드 finalize 공통)"""
+    if doc.extraction_status != Document.Extraction.DONE and extractors.detect_format(doc.file.name):
+        start_extraction(doc)
+    else:
+        index_text(doc)
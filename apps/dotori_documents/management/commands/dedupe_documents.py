@@ -0,0 +1,54 @@
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.dotori_documents import blobs
+from apps.dotori_documents.models import Blob, Document
+class Command(BaseCommand):
+    help = "blob 없이 docs/에 저장된 이전 문서 파일을 내용 주소 저장소(blobs/)로 옮기고 같은 내용의 사본을 지웁니다."
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=0, help="최대 문서 수 (0=제한 없음)")
+        parser.add_argument("--dry-run", action="store_true", help="옮기지 않고 합쳐질 사본과 용량만 계산")
+    def handle(self, *args, **opts):
+        qs = Document.objects.filter(blob__isnull=True).exclude(file="").order_by("id")
+        if opts["limit"]:
+            qs = qs[:opts["limit"]]
+        seen = set()
+        moved = merged = missing = reclaimed = 0
+        for doc in qs.iterator(chunk_size=100):
+            name = doc.file.name
+            if not default_storage.exists(name):
+                missing += 1
+                continue
+            size = default_storage.size(name)
+            with default_storage.open(name, "rb") as f:
+                digest = blobs.sha256_of(File(f))
+            if opts["dry_run"]:
+                duplicate = digest in seen or Blob.objects.filter(sha256=digest).exists()
+                seen.add(digest)
+            else:
+                with default_storage.open(name, "rb") as f:
+                    blob = blobs.acquire(File(f, name=name), digest, name)
+                # 조건부 UPDATE: 그 사이 다른 프로세스가 옮겼거나 실패하면 방금 얻은 참조를 돌려줌
+                # updated_at도 올려 문서 ETag를 바꿈 (file URL이 바뀌므로)
+                try:
+                    updated = Document.objects.filter(id=doc.id, blob__isnull=True).update(
+                        blob=blob, file=blob.file.name, updated_at=timezone.now()
+                    )
+                except Exception:
+                    blobs.release(blob.id)
+                    raise
+                if not updated:
+                    blobs.release(blob.id)
+                    continue
+                duplicate = blob.refs > 1
+                if not Document.objects.filter(file=name).exists():
+                    default_storage.delete(name)
+            moved += 1
+            if duplicate:
+                merged += 1
+                reclaimed += size
+        self.stdout.write(
+            f"documents: {moved} moved to blobs{' (dry-run)' if opts['dry_run'] else ''}, "
+            f"{merged} duplicates merged (reclaimed {reclaimed:,} bytes), {missing} missing files"
+        )
@@ -0,0 +1,110 @@
+import os
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from apps.dotori_common import layout
+from apps.dotori_documents import blobs, sidecar
+from apps.dotori_documents.models import Blob, Document
+KINDS = ("blob", "document", "text")
+def _move(old: str, new: str) -> str:
+    """저장소 안에서 파일 이동 → 실제 새 이름. 로컬 저장소면 rename(복사 없음)"""
+    try:
+        src = default_storage.path(old)
+    except NotImplementedError:
+        with default_storage.open(old, "rb") as f:
+            name = default_storage.save(new, File(f))
+        default_storage.delete(old)
+        return name
+    name = default_storage.get_available_name(new)
+    dst = default_storage.path(name)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    os.replace(src, dst)
+    return name
+class Command(BaseCommand):
+    help = (
+        "평평한 blobs/, docs/, texts/ 에 있는 문서 파일을 해시 하위 디렉터리(prefix/ab/이름)로 옮깁니다. "
+        "id 순서로 묶음 단위로 처리하고 이미 옮긴 행은 건너뛰므로 중단 후 다시 실행하면 이어서 진행합니다."
+    )
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=KINDS, action="append", help="대상 (기본: 전부)")
+        parser.add_argument("--batch", type=int, default=500, help="묶음 크기 (묶음마다 진행 상황 출력)")
+        parser.add_argument("--after-id", type=int, default=0, help="이 id 다음부터 (출력된 last id로 이어서)")
+        parser.add_argument("--limit", type=int, default=0, help="종류별 최대 이동 수 (0=제한 없음)")
+        parser.add_argument("--dry-run", action="store_true", help="옮기지 않고 대상 수만 계산")
+    def handle(self, *args, **opts):
+        for kind in opts["kind"] or KINDS:
+            self.migrate(kind, opts)
+    def migrate(self, kind, opts):
+        model, field, prefix, extra = {
+            "blob": (Blob, "file", "blobs", {}),
+            "document": (Document, "file", "docs", {"blob__isnull": True}),  # blob 문서는 blob 쪽에서 같이 바뀜
+            "text": (Document, "text_file", "texts", {}),
+        }[kind]
+        last, moved, missing = opts["after_id"], 0, 0
+        def full(): return opts["limit"] and moved >= opts["limit"]
+        while not full():
+            rows = list(
+                model.objects.filter(id__gt=last, **extra).exclude(**{field: ""})
+                .order_by("id").values_list("id", field)[:opts["batch"]]
+            )
+            if not rows:
+                break
+            for object_id, name in rows:
+                if full():
+                    break
+                last = object_id  # --after-id로 이어갈 위치 (여기까지는 처리됨)
+                if layout.is_sharded(name, prefix):
+                    continue
+                if opts["dry_run"]:
+                    result = "moved" if default_storage.exists(name) else "missing"
+                else:
+                    result = self.move_one(kind, model, field, prefix, object_id, name)
+                moved += result == "moved"
+                missing += result == "missing"
+            self.stdout.write(f"{kind}: last id {last}, moved {moved}{' (dry-run)' if opts['dry_run'] else ''}")
+        self.stdout.write(f"{kind}: done, moved {moved}, missing {missing}")
+    def move_one(self, kind, model, field, prefix, object_id, old) -> str:
+        target = layout.shard(prefix, os.path.basename(old))
+        # 행을 잠근 채 파일 이동 → 같은 이름을 가리키는 행을 함께 갱신 (실패하면 파일을 되돌림)
+        with transaction.atomic():
+            if not model.objects.select_for_update().filter(id=object_id, **{field: old}).exists():
+                return "skipped"  # 그 사이 바뀜 (공유 사이드카를 앞 행에서 이미 옮긴 경우 등)
+            if default_storage.exists(old):
+                new = _move(old, target)
+            elif default_storage.exists(target) and self.adoptable(kind, field, object_id, target):
+                new = target  # 파일 이동 직후 중단된 경우: 행만 갱신
+            else:
+                return "missing"
+            # 파일 이름이 바뀌면 응답(file URL)도 바뀌므로 updated_at을 올려 ETag를 새로 (304로 옛 URL을 쓰지 않게)
+            now = timezone.now()
+            try:
+                if kind == "text":
+                    for index in sidecar.KINDS:
+                        if default_storage.exists(sidecar.index_name(old, index)):
+                            _move(sidecar.index_name(old, index), sidecar.index_name(new, index))
+                    Document.objects.filter(text_file=old).update(text_file=new, updated_at=now)
+                elif kind == "document":
+                    Document.objects.filter(id=object_id).update(file=new, updated_at=now)
+                else:
+                    Blob.objects.filter(id=object_id).update(file=new)
+                    Document.objects.filter(blob_id=object_id).update(file=new, updated_at=now)
+            except Exception:
+                if new != old and default_storage.exists(new):
+                    _move(new, old)
+                raise
+        return "moved"
+    def adoptable(self, kind, field, object_id, target) -> bool:
+        """예전 파일은 없고 target에 파일이 있을 때, 이 행의 파일을 옮기다 중단된 것인지.
+
+        다른 폴더의 같은 이름 파일이 먼저 옮겨 온 것일 수 있으므로 blob은 해시가 같을 때만,
+        문서/사이드카는 target을 가리키는 다른 행이 없을 때만 가져온다.
+        """
+        if kind == "blob":
+            blob = Blob.objects.get(id=object_id)
+            if blob.size and default_storage.size(target) != blob.size:
+                return False
+            with default_storage.open(target, "rb") as f:
+                return blobs.sha256_of(File(f)) == blob.sha256
+        return not Document.objects.filter(**{field: target}).exists()
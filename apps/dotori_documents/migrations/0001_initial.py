@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Document',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='docs/')),
+                ('original_name', models.CharField(blank=True, max_length=255)),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('text_cache', models.TextField(blank=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'uploaded_at'], name='dotori_docu_owner_i_79662a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:56
+
+import apps.dotori_common.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_documents', '0002_document_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='text_archive',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='text_cache',
+            field=apps.dotori_common.fields.ColdTextField(archive_field='text_archive', blank=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_documents', '0004_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='extraction_done',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='extraction_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='extraction_status',
+            field=models.CharField(choices=[('NONE', 'None'), ('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('ERROR', 'Error')], default='NONE', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='extraction_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='text_file',
+            field=models.FileField(blank=True, upload_to='texts/'),
+        ),
+    ]
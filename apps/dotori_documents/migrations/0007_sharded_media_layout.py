@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:16
+
+import apps.dotori_common.layout
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_documents', '0006_blob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='blob',
+            name='file',
+            field=models.FileField(max_length=255, upload_to=apps.dotori_common.layout.ShardedUploadTo('blobs')),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='file',
+            field=models.FileField(max_length=255, upload_to=apps.dotori_common.layout.ShardedUploadTo('docs')),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='text_file',
+            field=models.FileField(blank=True, max_length=255, upload_to=apps.dotori_common.layout.ShardedUploadTo('texts')),
+        ),
+    ]
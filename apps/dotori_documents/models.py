@@ -1,11 +1,63 @@
+import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from apps.dotori_common.fields import ColdTextField
+from apps.dotori_common.layout import ShardedUploadTo
 User = get_user_model()
+# 내용 주소 저장소: 같은 바이트의 업로드는 blobs/<해시 디렉터리>/<sha256>.<ext> 하나를 참조 수(refs)로 공유 (blobs.py)
+class Blob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=ShardedUploadTo("blobs"), max_length=255)
+    size = models.PositiveBigIntegerField(default=0)
+    refs = models.PositiveIntegerField(default=0)  # 이 파일을 가리키는 Document 수
+    created_at = models.DateTimeField(auto_now_add=True)
+    def __str__(self): return f"Blob {self.sha256[:12]} ({self.refs})"
 class Document(models.Model):
+    # PDF/DOCX/HWP 텍스트 추출 단계 (tasks.extract_document). 텍스트 파일은 업로드 때 바로 DONE
+    class Extraction(models.TextChoices):
+        NONE = "NONE"
+        PENDING = "PENDING"
+        RUNNING = "RUNNING"
+        DONE = "DONE"
+        ERROR = "ERROR"
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="documents")
-    file = models.FileField(upload_to="docs/")
+    file = models.FileField(upload_to=ShardedUploadTo("docs"), max_length=255)  # blob이 있으면 blob.file과 같은 이름 (복사본 없음)
+    blob = models.ForeignKey(Blob, null=True, blank=True, on_delete=models.PROTECT, related_name="documents")
     original_name = models.CharField(max_length=255, blank=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
-    text_cache = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    text_cache = ColdTextField(blank=True, archive_field="text_archive")
+    text_archive = models.JSONField(null=True, blank=True)  # 압축 보관 정보 (archive_payloads)
+    text_file = models.FileField(upload_to=ShardedUploadTo("texts"), max_length=255, blank=True)  # 추출한 전체 텍스트 (text_cache는 앞부분 상한까지)
+    extraction_status = models.CharField(max_length=10, choices=Extraction.choices, default=Extraction.NONE)
+    extraction_done = models.PositiveIntegerField(default=0)  # 처리한 단위(PDF 페이지/HWP 구역) 수
+    extraction_total = models.PositiveIntegerField(default=0)
+    extraction_error = models.TextField(blank=True)
+    class Meta:
+        indexes = [models.Index(fields=["owner", "uploaded_at"])]
     def __str__(self):
         return self.original_name or self.file.name
+# 문서가 지워지면 (사용자 삭제에 따른 CASCADE 포함) blob 참조 수를 돌려줌
+@receiver(post_delete, sender=Document)
+def release_blob(sender, instance: Document, **kwargs):
+    if instance.blob_id:
+        from .blobs import release
+        release(instance.blob_id)
+# 이어받기 업로드: 세션 생성 → PUT 바이트 구간(Content-Range)을 임시 파일에 이어 붙임 → finalize(sha256 검증) → Document
+class UploadSession(models.Model):
+    class Status(models.TextChoices):
+        OPEN = "OPEN"
+        DONE = "DONE"
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="upload_sessions")
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True)
+    received = models.PositiveBigIntegerField(default=0)  # 임시 파일에 확정된 바이트 수 (다음 PUT 시작 위치)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.OPEN)
+    document = models.ForeignKey(Document, null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    def __str__(self): return f"UploadSession {self.id} ({self.received}/{self.size})"
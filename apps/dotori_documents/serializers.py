@@ -1,7 +1,47 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Document
+from .models import Document, UploadSession
 class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Document
-        fields = ["id", "original_name", "file", "uploaded_at", "text_cache"]
-        read_only_fields = ["id", "uploaded_at", "text_cache"]
+        fields = [
+            "id", "original_name", "file", "uploaded_at", "text_cache",
+            "extraction_status", "extraction_done", "extraction_total", "extraction_error",
+        ]
+        read_only_fields = [
+            "id", "uploaded_at", "text_cache",
+            "extraction_status", "extraction_done", "extraction_total", "extraction_error",
+        ]
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            # 파일은 생성 때만 (blob 참조 수/사이드카/추출은 store_upload가 관리) - 바꾸려면 새 문서로 업로드
+            fields["file"].read_only = True
+        return fields
+class DocumentListSerializer(serializers.ModelSerializer):
+    # 목록에서는 text_cache 대신 미리보기와 길이만 (queryset에서 annotate)
+    text_preview = serializers.CharField(read_only=True)
+    text_length = serializers.IntegerField(read_only=True)
+    class Meta:
+        model = Document
+        fields = ["id", "original_name", "file", "uploaded_at", "text_preview", "text_length", "extraction_status"]
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.text_archive:
+            data["text_length"] = instance.text_archive["chars"]  # DB에는 앞부분만 남아 있음
+        return data
+class UploadSessionSerializer(serializers.ModelSerializer):
+    chunk_max = serializers.SerializerMethodField()
+    class Meta:
+        model = UploadSession
+        fields = ["id", "filename", "size", "sha256", "received", "status", "document", "chunk_max", "created_at"]
+        read_only_fields = ["received", "status", "document", "created_at"]
+    def get_chunk_max(self, obj): return settings.DOCUMENT_UPLOAD_CHUNK_MAX
+    def validate_size(self, value):
+        if not 0 < value <= settings.DOCUMENT_UPLOAD_MAX_BYTES:
+            raise serializers.ValidationError(f"1 ~ {settings.DOCUMENT_UPLOAD_MAX_BYTES} 바이트만 업로드할 수 있습니다.")
+        return value
+    def validate_sha256(self, value):
+        if value and (len(value) != 64 or any(c not in "0123456789abcdefABCDEF" for c in value)):
+            raise serializers.ValidationError("sha256 hex 64자를 입력해주세요.")
+        return value.lower()
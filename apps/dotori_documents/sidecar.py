@@ -0,0 +1,193 @@
+"""추출한 전체 텍스트 사이드카 파일(UTF-8) + 오프셋 색인.
+
+색인은 numpy 배열 두 개(.npy, 각 행 = [바이트 위치, 글자 위치])로 사이드카 옆에 저장한다.
+쓰는 동안에는 int64 쌍을 임시 파일에 이어 쓰므로 문서가 길어도 메모리는 일정하다.
+- para: 빈 줄이 아닌 각 줄(문단)의 시작
+- marks: STRIDE 글자마다의 위치 + 마지막 행은 (전체 바이트, 전체 글자)
+읽기는 색인을 mmap으로 열어 이진 탐색 후 사이드카의 해당 바이트 구간만 mmap에서 디코딩하므로
+몇 번째 페이지를 열든 비용이 같다.
+"""
+import codecs
+import io
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from array import array
+from contextlib import contextmanager
+from itertools import islice
+import numpy as np
+from django.core.files.storage import default_storage
+from apps.dotori_common import layout
+STRIDE = 4096
+KINDS = ("para", "marks")
+PARA_RE = re.compile(r"^.*\S.*$", re.M)  # 빈 줄이 아닌 줄 = 문단 (SidecarWriter와 같은 기준)
+FLUSH_PAIRS = 8192  # 이만큼 모이면 임시 파일로
+class OffsetFile:
+    """(바이트, 글자) 쌍을 int64로 임시 파일에 이어 쓰고, 끝나면 .npy(행 = 쌍)로 내보낸다"""
+    def __init__(self, dir=None):
+        self.file = tempfile.TemporaryFile(dir=dir)
+        self.buf = array("q")
+        self.count = 0
+    def append(self, byte: int, char: int):
+        self.buf.extend((byte, char))
+        self.count += 1
+        if len(self.buf) >= 2 * FLUSH_PAIRS:
+            self.flush()
+    def flush(self):
+        self.buf.tofile(self.file)
+        del self.buf[:]
+    def save_npy(self, out):
+        self.flush()
+        header = {"descr": np.dtype(np.int64).str, "fortran_order": False, "shape": (self.count, 2)}
+        np.lib.format.write_array_header_1_0(out, header)
+        self.file.seek(0)
+        shutil.copyfileobj(self.file, out)
+    def close(self):
+        self.file.close()
+class SidecarWriter:
+    """텍스트를 조각 단위로 받아 파일에 쓰면서 색인을 만든다 (색인도 임시 파일로, 메모리 일정)"""
+    def __init__(self, out, index_dir=None):
+        self.out = out
+        self.byte = self.char = 0
+        self.next_mark = 0
+        self.line_start = True
+        self.para, self.marks = OffsetFile(index_dir), OffsetFile(index_dir)
+    def write(self, text: str):
+        start = 0
+        while start < len(text):
+            nl = text.find("\n", start)
+            end = len(text) if nl < 0 else nl + 1
+            self._segment(text[start:end])
+            start = end
+    def _segment(self, seg: str):
+        # seg는 한 줄의 일부 (줄바꿈은 있으면 맨 끝에만)
+        if self.line_start and seg.strip():
+            self.para.append(self.byte, self.char)
+            self.line_start = False
+        while self.next_mark < self.char + len(seg):
+            k = self.next_mark - self.char
+            self.marks.append(self.byte + len(seg[:k].encode("utf-8", "surrogatepass")), self.next_mark)
+            self.next_mark += STRIDE
+        data = seg.encode("utf-8", "surrogatepass")
+        self.out.write(data)
+        self.byte += len(data)
+        self.char += len(seg)
+        if seg.endswith("\n"):
+            self.line_start = True
+    def save_indexes(self, index_dir=None) -> dict:
+        """색인 .npy 임시 파일들 {kind: 파일} - marks 마지막 행은 (전체 바이트, 전체 글자)"""
+        self.marks.append(self.byte, self.char)
+        files = {}
+        for kind in KINDS:
+            files[kind] = tempfile.NamedTemporaryFile(dir=index_dir, suffix=".npy", delete=False)
+            getattr(self, kind).save_npy(files[kind])
+            files[kind].flush()
+        return files
+    def close(self):
+        self.para.close()
+        self.marks.close()
+def index_name(name: str, kind: str) -> str:
+    return f"{name}.{kind}.npy"
+def delete(name: str):
+    for path in (name, *(index_name(name, kind) for kind in KINDS)):
+        if path and default_storage.exists(path):
+            default_storage.delete(path)
+@contextmanager
+def building():
+    """임시 파일에 쓰는 SidecarWriter. 끝나면 store()로 옮기고, 실패하면 임시 파일은 지워진다"""
+    from .uploads import temp_dir
+    os.makedirs(temp_dir(), exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=temp_dir(), suffix=".txt", delete=False) as out:
+        writer = SidecarWriter(out, temp_dir())
+        try:
+            yield writer
+        finally:
+            writer.close()
+            if os.path.exists(out.name):
+                os.remove(out.name)
+def store(writer: SidecarWriter, old_name: str = "") -> str:
+    """임시 파일을 texts/<해시 디렉터리>/<uuid>.txt로 옮기고 색인을 저장, 저장소 이름을 돌려줌"""
+    from .uploads import PartFile, temp_dir
+    if old_name:
+        delete(old_name)
+    writer.out.flush()
+    writer.out.seek(0)
+    name = default_storage.save(layout.shard("texts", f"{uuid.uuid4().hex}.txt"), PartFile(writer.out))
+    for kind, f in writer.save_indexes(temp_dir()).items():
+        with f:
+            try:
+                f.seek(0)
+                default_storage.save(index_name(name, kind), PartFile(f))
+            finally:
+                if os.path.exists(f.name):
+                    os.remove(f.name)
+    return name
+@contextmanager
+def _opened(name: str):
+    """(바이트 읽기 함수, 전체 크기). 로컬 파일이면 mmap, 아니면 seek/read"""
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        path = None
+    if path is not None:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                yield (lambda a, b: b""), 0
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield (lambda a, b: mm[a:b]), size
+        return
+    with default_storage.open(name, "rb") as f:
+        def read(a, b):
+            f.seek(a)
+            return f.read(b - a)
+        yield read, default_storage.size(name)
+def _load_index(name: str, kind: str) -> np.ndarray:
+    try:
+        return np.load(default_storage.path(index_name(name, kind)), mmap_mode="r")
+    except NotImplementedError:
+        with default_storage.open(index_name(name, kind), "rb") as f:
+            return np.load(io.BytesIO(f.read()))
+def totals(name: str) -> dict:
+    marks, para = _load_index(name, "marks"), _load_index(name, "para")
+    return {"chars": int(marks[-1][1]), "paragraphs": len(para)}
+def read_chars(name: str, start: int, end: int) -> str:
+    """글자 [start, end) - 가장 가까운 앞 표식(STRIDE 간격)부터만 디코딩"""
+    marks = _load_index(name, "marks")
+    end = min(end, int(marks[-1][1]))
+    if start >= end:
+        return ""
+    i = int(np.searchsorted(marks[:, 1], start, side="right")) - 1
+    byte, char = int(marks[i][0]), int(marks[i][1])
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    parts, have, need = [], 0, end - char
+    with _opened(name) as (read, size):
+        step = max(need * 4, 4096)  # UTF-8 한 글자는 최대 4바이트
+        while have < need and byte < size:
+            text = decoder.decode(read(byte, min(byte + step, size)), final=byte + step >= size)
+            parts.append(text)
+            have += len(text)
+            byte += step
+    return "".join(parts)[start - char:end - char]
+def read_paragraphs(name: str, first: int, count: int) -> tuple[int, str]:
+    """문단 [first, first+count)의 (시작 글자 위치, 텍스트)"""
+    para = _load_index(name, "para")
+    if first >= len(para):
+        return totals(name)["chars"], ""
+    last = first + count
+    with _opened(name) as (read, size):
+        b0 = int(para[first][0])
+        b1 = int(para[last][0]) if last < len(para) else size
+        return int(para[first][1]), read(b0, b1).decode("utf-8", "replace").rstrip("\n")
+def paragraphs_in(text: str, first: int, count: int) -> tuple[int, str]:
+    """색인 없는 텍스트(사이드카 도입 전 text_cache)에서 read_paragraphs와 같은 (시작 글자 위치, 텍스트)"""
+    starts = (m.start() for m in PARA_RE.finditer(text))
+    begin = next(islice(starts, first, None), None)
+    if begin is None:
+        return len(text), ""
+    end = next(islice(starts, count - 1, None), len(text)) if count > 0 else begin
+    return begin, text[begin:end].rstrip("\n")
@@ -0,0 +1,110 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from .models import Document, UploadSession
+from . import extractors, ingest, sidecar, uploads
+Extraction = Document.Extraction
+_pool = None
+def _submit(fn, *args) -> Future:
+    # 파싱(CPU)은 프로세스 풀에서. prefork 자식(daemon)은 자식 프로세스를 못 만들므로 그 자리에서 실행
+    global _pool
+    if multiprocessing.current_process().daemon:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=settings.DOCUMENT_EXTRACT_PROCESSES)
+    return _pool.submit(fn, *args)
+@contextmanager
+def _local_path(field_file):
+    # 로컬 파일 저장소면 경로 그대로, 아니면 임시 파일로 내려받아 사용
+    try:
+        yield field_file.path
+        return
+    except NotImplementedError:
+        pass
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(field_file.name)[1]) as tmp:
+        with field_file.open("rb") as src:
+            shutil.copyfileobj(src, tmp)
+        tmp.flush()
+        yield tmp.name
+def _update(document_id: int, **fields) -> int:
+    return Document.objects.filter(id=document_id).update(updated_at=timezone.now(), **fields)
+@shared_task
+def extract_document(document_id: int):
+    # PENDING(또는 임대 만료 RUNNING) → RUNNING 선점 (중복 전달이면 조용히 무시)
+    if not ingest.claim_extraction(document_id):
+        return
+    doc = Document.objects.get(id=document_id)
+    if ingest.reuse_extraction(doc):
+        ingest.index_text(doc)  # 같은 파일이 그 사이 먼저 처리됨
+        return
+    fmt = extractors.detect_format(doc.file.name)
+    global _pool
+    try:
+        with _local_path(doc.file) as path:
+            total = _submit(extractors.count_units, path, fmt).result()
+            _update(document_id, extraction_total=total)
+            text_cache = _extract_to_sidecar(doc, path, fmt, total)
+    except Exception as e:
+        if isinstance(e, BrokenProcessPool):
+            _pool = None
+        _update(document_id, extraction_status=Extraction.ERROR, extraction_error=str(e)[:1000] or type(e).__name__)
+        return
+    doc.text_cache = text_cache
+    _update(document_id, extraction_status=Extraction.DONE, text_cache=text_cache, text_file=doc.text_file.name)
+    ingest.index_text(doc)
+def _extract_to_sidecar(doc: Document, path: str, fmt: str, total: int) -> str:
+    """단위 묶음을 풀에 조금씩(창 크기만큼만) 맡기고, 순서대로 받아 사이드카 파일에 바로 씀.
+
+    전체 텍스트는 text_file(+ 오프셋 색인)에, text_cache에는 DOCUMENT_TEXT_MAX_CHARS까지만. 진행률은 묶음마다 기록.
+    """
+    step = settings.DOCUMENT_EXTRACT_UNITS_PER_JOB
+    jobs = iter(range(0, total, step))
+    pending = deque()
+    def fill():
+        while len(pending) < settings.DOCUMENT_EXTRACT_PROCESSES * 2:
+            start = next(jobs, None)
+            if start is None:
+                return
+            pending.append((start, _submit(extractors.extract_units, path, fmt, start, min(start + step, total))))
+    head, head_chars, limit = [], 0, settings.DOCUMENT_TEXT_MAX_CHARS
+    with sidecar.building() as writer:
+        fill()
+        first = True
+        while pending:
+            start, future = pending.popleft()
+            units = future.result()
+            fill()
+            for text in units:
+                piece = text.replace("\x00", "") if first else "\n\n" + text.replace("\x00", "")
+                first = False
+                writer.write(piece)
+                if head_chars < limit:
+                    head.append(piece[:limit - head_chars])
+                    head_chars += len(head[-1])
+            _update(doc.id, extraction_done=start + len(units))
+        doc.text_file.name = sidecar.store(writer, old_name=doc.text_file.name)  # 재시도면 이전 사이드카 교체
+    return "".join(head)
+@shared_task
+def expire_upload_sessions() -> int:
+    # 주기 작업(beat): 오래 멈춘 이어받기 업로드의 세션과 임시 파일 정리
+    cutoff = timezone.now() - timedelta(seconds=settings.DOCUMENT_UPLOAD_SESSION_TTL)
+    stale = UploadSession.objects.filter(status=UploadSession.Status.OPEN, updated_at__lt=cutoff)
+    count = 0
+    for session in stale.iterator():
+        uploads.discard(session)
+        count += 1
+    return count
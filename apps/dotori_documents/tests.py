@@ -0,0 +1,334 @@
+import hashlib
+import io
+import os
+import shutil
+import uuid
+import zipfile
+from unittest import mock
+from datetime import timedelta
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from apps.dotori_common import layout
+from django.utils import timezone
+from apps.dotori_common.testing import DotoriTestCase
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from .models import Blob, Document, UploadSession
+from . import ingest, sidecar, tasks, uploads
+class ResumableUploadTests(DotoriTestCase):
+    body = "도토리 이어받기 업로드 테스트입니다.\n".encode("utf-8") * 50
+    def start(self, client, **extra):
+        data = {"filename": "a.txt", "size": len(self.body), "sha256": hashlib.sha256(self.body).hexdigest(), **extra}
+        response = client.post("/api/documents/uploads/", data, format="json")
+        self.assertEqual(response.status_code, 201)
+        return f"/api/documents/uploads/{response.data['id']}/", response.data["id"]
+    def put(self, client, url, start, end):
+        return client.put(url, self.body[start:end], content_type="application/octet-stream",
+                          HTTP_CONTENT_RANGE=f"bytes {start}-{end - 1}/{len(self.body)}")
+    def finalize(self, client, url, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return client.post(url + "finalize/", data, format="json")
+    def test_upload_in_two_ranges_and_finalize_once(self):
+        client, _ = self.login()
+        url, _ = self.start(client)
+        half = len(self.body) // 2
+        self.assertEqual(self.put(client, url, 0, half).data["received"], half)
+        self.assertEqual(self.put(client, url, 0, half).data["received"], half)  # 재전송은 무시
+        self.assertEqual(self.put(client, url, half + 1, len(self.body)).status_code, 409)
+        self.assertEqual(self.put(client, url, half, len(self.body)).data["received"], len(self.body))
+        first = self.finalize(client, url)
+        self.assertEqual(first.status_code, 201)
+        again = self.finalize(client, url)
+        self.assertEqual((again.status_code, again.data["id"]), (200, first.data["id"]))
+        self.assertEqual(Document.objects.count(), 1)
+    def test_body_streams_outside_the_transaction(self):
+        client, _ = self.login()
+        _, session_id = self.start(client)
+        depth = len(connection.atomic_blocks)
+        seen = []
+        class Stream(io.BytesIO):
+            def read(inner, size=-1):
+                seen.append(len(connection.atomic_blocks))
+                return super().read(size)
+        self.assertEqual(uploads.write_range(session_id, 0, 10, Stream(self.body[:10])), 10)
+        self.assertEqual(set(seen), {depth})
+    def test_same_range_confirmed_meanwhile_is_idempotent(self):
+        client, _ = self.login()
+        _, session_id = self.start(client)
+        class Stream(io.BytesIO):
+            # 본문을 받는 사이 같은 구간 재시도가 먼저 확정
+            def read(inner, size=-1):
+                if not inner.tell():
+                    uploads.write_range(session_id, 0, 10, io.BytesIO(self.body[:10]))
+                return super().read(size)
+        self.assertEqual(uploads.write_range(session_id, 0, 10, Stream(self.body[:10])), 10)
+        self.assertEqual(UploadSession.objects.get(id=session_id).received, 10)
+    def test_finalize_errors_are_not_500(self):
+        client, _ = self.login()
+        with self.assertRaises(uploads.UploadError) as missing:
+            uploads.finalize(uuid.uuid4())
+        self.assertEqual(missing.exception.status, 404)
+        url, session_id = self.start(client)
+        self.assertEqual(self.finalize(client, url).status_code, 409)  # 덜 받음
+        self.put(client, url, 0, len(self.body))
+        os.remove(uploads.part_path(session_id))
+        self.assertEqual(self.finalize(client, url).status_code, 409)  # 임시 파일 없음 → 처음부터
+        self.assertEqual(UploadSession.objects.get(id=session_id).received, 0)
+        self.put(client, url, 0, len(self.body))
+        mismatch = self.finalize(client, url, sha256="0" * 64)
+        self.assertEqual(mismatch.status_code, 422)
+        self.assertEqual(UploadSession.objects.get(id=session_id).received, 0)
+        UploadSession.objects.filter(id=session_id).update(updated_at=timezone.now() - timedelta(days=30))
+        self.assertEqual(self.finalize(client, url).status_code, 404)  # 만료
+        self.assertEqual(self.put(client, url, 0, 10).status_code, 404)
+        self.assertEqual(Document.objects.count(), 0)
+class DecodeTests(DotoriTestCase):
+    def test_cp949_after_ascii_prefix_longer_than_sample(self):
+        head = "abc 123\n" * (ingest.READ_SIZE // 8 + 100)  # 표본(64KB)은 UTF-8로도 맞음
+        tail = "도토리 다람쥐 가을 숲\n" * 5000
+        text = ingest.read_text(io.BytesIO((head + tail).encode("cp949")), max_chars=10 ** 7)
+        self.assertEqual(text, head + tail)
+    def test_broken_bytes_do_not_stop_decoding(self):
+        data = "도토리".encode("utf-8") * 30000 + b"\xff\xff" + "끝".encode("utf-8")
+        text = ingest.read_text(io.BytesIO(data), max_chars=10 ** 7)
+        self.assertTrue(text.startswith("도토리" * 30000))
+        self.assertGreater(len(text), 90000)
+class SidecarTests(DotoriTestCase):
+    def test_offsets_are_flushed_to_disk_while_writing(self):
+        lines = [f"{i}번째 문단 도토리 다람쥐.\n" if i % 3 else "\n" for i in range(3000)]
+        text = "".join(lines)
+        with mock.patch.object(sidecar, "FLUSH_PAIRS", 16), sidecar.building() as writer:
+            for line in lines:
+                writer.write(line)
+                self.assertLess(len(writer.para.buf), 2 * 16)
+            name = sidecar.store(writer)
+        paragraphs = [line for line in lines if line.strip()]
+        self.assertEqual(sidecar.totals(name), {"chars": len(text), "paragraphs": len(paragraphs)})
+        self.assertEqual(sidecar.read_chars(name, 10000, 10100), text[10000:10100])
+        start, body = sidecar.read_paragraphs(name, 500, 2)
+        self.assertEqual(body, (paragraphs[500] + paragraphs[501]).rstrip("\n"))
+        self.assertEqual(text[start:start + len(paragraphs[500])], paragraphs[500])
+        self.assertEqual(sorted(os.listdir(uploads.temp_dir())), [])
+    def test_legacy_text_cache_paragraphs_match_sidecar(self):
+        client, _ = self.login()
+        text = "첫 문단.\n\n둘째 문단.\n  \n셋째.\n넷째 문단."
+        with self.captureOnCommitCallbacks(execute=True):
+            doc = client.post("/api/documents/", {"file": SimpleUploadedFile("a.txt", text.encode())}, format="multipart").data
+        url = f"/api/documents/{doc['id']}/text/"
+        queries = ["?para=0&count=2", "?para=1&count=2", "?para=3&count=5", "?para=9&count=1", "?para=0&count=0"]
+        with_sidecar = [client.get(url + q).data for q in queries]
+        Document.objects.filter(id=doc["id"]).update(text_file="", updated_at=timezone.now())  # 사이드카 도입 전 문서
+        for query, expected in zip(queries, with_sidecar):
+            with self.subTest(query=query):
+                body = client.get(url + query).data
+                self.assertEqual(body, expected)
+                self.assertEqual(text[body["start"]:body["end"]], body["text"])
+        self.assertEqual((with_sidecar[1]["start"], with_sidecar[3]["text"]), (text.index("둘째"), ""))
+class DownloadTests(DotoriTestCase):
+    body = bytes(range(256)) * 4
+    def setUp(self):
+        super().setUp()
+        self.client, _ = self.login()
+        with self.captureOnCommitCallbacks(execute=True):
+            doc = self.client.post("/api/documents/", {"file": SimpleUploadedFile("a.bin", self.body)}, format="multipart")
+        self.url = f"/api/documents/{doc.data['id']}/download/"
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        return response, b"".join(response.streaming_content) if response.streaming else response.content
+    def test_single_range_is_206(self):
+        response, content = self.get(HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(self.body)}")
+        self.assertEqual(content, self.body[10:20])
+        response, content = self.get(HTTP_RANGE="bytes=-5")
+        self.assertEqual((response.status_code, content), (206, self.body[-5:]))
+    def test_unsatisfiable_range_is_416(self):
+        response, _ = self.get(HTTP_RANGE=f"bytes={len(self.body)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.body)}")
+    def test_invalid_or_stale_range_serves_everything(self):
+        for headers in ({"HTTP_RANGE": "bytes=5-2"}, {"HTTP_RANGE": "bytes=0-1,4-5"},
+                        {"HTTP_RANGE": "bytes=0-1", "HTTP_IF_RANGE": '"old"'}):
+            with self.subTest(headers=headers):
+                response, content = self.get(**headers)
+                self.assertEqual((response.status_code, content), (200, self.body))
+    def test_error_with_file_accept_header_is_labelled_json(self):
+        response = self.client.get("/api/documents/9999/download/", HTTP_ACCEPT="application/pdf")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertIn("detail", response.json())
+class DedupeTests(DotoriTestCase):
+    def upload(self, client, name, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/documents/", {"file": SimpleUploadedFile(name, data)}, format="multipart")
+        self.assertEqual(response.status_code, 201)
+        return response
+    def delete(self, client, doc_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(client.delete(f"/api/documents/{doc_id}/").status_code, 204)
+    def test_same_bytes_share_blob_and_sidecar_until_last_delete(self):
+        client, _ = self.login()
+        other, _ = self.login("u2")
+        data = "같은 내용의 도토리 문서입니다.\n".encode("utf-8") * 100
+        first = self.upload(client, "a.txt", data)
+        second = self.upload(other, "b.txt", data)
+        docs = Document.objects.order_by("id")
+        self.assertEqual(len({d.blob_id for d in docs}), 1)
+        self.assertEqual(len({d.text_file.name for d in docs}), 1)
+        blob = Blob.objects.get()
+        self.assertEqual(blob.refs, 2)
+        self.assertTrue(first.data["file"].endswith(blob.file.name))
+        self.assertEqual(first.data["file"], second.data["file"])
+        sidecar_name = docs[0].text_file.name
+        self.delete(client, first.data["id"])
+        self.assertEqual(Blob.objects.get().refs, 1)
+        self.assertTrue(default_storage.exists(blob.file.name))
+        self.assertTrue(default_storage.exists(sidecar_name))
+        self.delete(other, second.data["id"])
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(default_storage.exists(blob.file.name))
+        self.assertFalse(default_storage.exists(sidecar_name))
+    def test_patch_cannot_replace_the_file(self):
+        client, _ = self.login()
+        doc = self.upload(client, "a.txt", "원래 내용".encode("utf-8")).data
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.patch(f"/api/documents/{doc['id']}/", {
+                "file": SimpleUploadedFile("b.txt", "바꾼 내용".encode("utf-8")), "original_name": "새 이름.txt",
+            }, format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["file"], response.data["original_name"]), (doc["file"], "새 이름.txt"))
+        self.assertEqual(response.data["text_cache"], "원래 내용")
+        self.assertEqual(Blob.objects.get().refs, 1)
+    def stored_files(self):
+        return sorted(os.path.join(d, n) for d, _, files in os.walk(self.media_root) for n in files)
+    def test_failed_insert_returns_the_blob_reference(self):
+        client, _ = self.login()
+        kept = "남는 문서\n".encode("utf-8")
+        self.upload(client, "a.txt", kept)
+        before = self.stored_files()
+        with mock.patch("apps.dotori_documents.serializers.DocumentSerializer.create", side_effect=RuntimeError("db down")):
+            for name, data in (("b.txt", kept), ("c.txt", "새 내용\n".encode("utf-8"))):
+                with self.assertRaises(RuntimeError), self.captureOnCommitCallbacks(execute=True):
+                    client.post("/api/documents/", {"file": SimpleUploadedFile(name, data)}, format="multipart")
+        blob = Blob.objects.get()
+        self.assertEqual((blob.refs, blob.sha256), (1, hashlib.sha256(kept).hexdigest()))
+        self.assertEqual(Document.objects.count(), 1)
+        self.assertEqual(self.stored_files(), before)
+    def test_dedupe_documents_bumps_updated_at(self):
+        client, user = self.login()
+        doc = Document.objects.create(owner=user, file=default_storage.save("docs/old.txt", ContentFile(b"legacy")))
+        etag = client.get(f"/api/documents/{doc.id}/")["ETag"]
+        call_command("dedupe_documents", stdout=io.StringIO())
+        doc.refresh_from_db()
+        self.assertEqual(doc.file.name, doc.blob.file.name)
+        self.assertEqual(client.get(f"/api/documents/{doc.id}/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+def docx_bytes(*paragraphs: str) -> bytes:
+    body = "".join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paragraphs)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as z:
+        z.writestr("word/document.xml", (
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f"<w:body>{body}</w:body></w:document>"
+        ))
+    return buf.getvalue()
+class ExtractionTests(DotoriTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client, _ = self.login()
+    def upload(self, data: bytes) -> Document:
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/documents/", {"file": SimpleUploadedFile("a.docx", data)}, format="multipart")
+        return Document.objects.get(id=response.data["id"])
+    def poll(self, doc, query: str = ""):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(f"/api/documents/{doc.id}/extract_text/{query}")
+    def test_upload_runs_pending_to_done_once(self):
+        doc = self.upload(docx_bytes("첫 문단", "둘째 문단"))
+        self.assertEqual((doc.extraction_status, doc.text_cache), (Document.Extraction.DONE, "첫 문단\n둘째 문단"))
+        response = self.poll(doc)
+        self.assertEqual((response.status_code, response.data["text"]), (200, doc.text_cache))
+        self.assertFalse(ingest.claim_extraction(doc.id))  # 끝난 문서는 중복 전달돼도 다시 돌지 않음
+    def test_broken_file_is_error_until_retry(self):
+        doc = self.upload(b"not a zip")
+        self.assertEqual(doc.extraction_status, Document.Extraction.ERROR)
+        self.assertEqual(self.poll(doc).data["status"], Document.Extraction.ERROR)
+        retried = self.poll(doc, "?retry=1")  # 다시 PENDING으로 두고 발송 → 같은 파일이라 다시 실패
+        self.assertEqual((retried.status_code, retried.data["status"]), (202, Document.Extraction.PENDING))
+        doc.refresh_from_db()
+        self.assertEqual(doc.extraction_status, Document.Extraction.ERROR)
+    def test_stale_running_is_reclaimed(self):
+        doc = self.upload(docx_bytes("도토리"))
+        Document.objects.filter(id=doc.id).update(extraction_status=Document.Extraction.RUNNING, text_cache="")
+        self.assertFalse(ingest.claim_extraction(doc.id))  # 임대 중인 RUNNING은 못 가져감
+        running = self.poll(doc)
+        self.assertEqual((running.status_code, running.data["status"]), (202, Document.Extraction.RUNNING))
+        Document.objects.filter(id=doc.id).update(updated_at=timezone.now() - timedelta(hours=1))
+        with mock.patch.object(tasks.extract_document, "delay", wraps=tasks.extract_document.delay) as delay:
+            reclaimed = self.poll(doc)
+        delay.assert_called_once_with(doc.id)
+        self.assertEqual((reclaimed.status_code, reclaimed.data["status"]), (202, Document.Extraction.PENDING))
+        doc.refresh_from_db()
+        self.assertEqual((doc.extraction_status, doc.text_cache), (Document.Extraction.DONE, "도토리"))
+class ShardMediaTests(DotoriTestCase):
+    def setUp(self):
+        super().setUp()
+        # 이전 테스트가 남긴 파일이 같은 경로에 있으면 결과가 달라지므로 비우고 시작
+        shutil.rmtree(self.media_root)
+        os.makedirs(self.media_root)
+        self.client, self.user = self.login()
+    def put(self, name: str, data: bytes) -> str:
+        return default_storage.save(name, ContentFile(data))
+    def doc(self, **fields) -> Document:
+        return Document.objects.create(owner=self.user, **fields)
+    def run_command(self) -> str:
+        out = io.StringIO()
+        call_command("shard_media", stdout=out)
+        return out.getvalue()
+    def test_moves_rows_and_files_and_rerun_is_a_no_op(self):
+        data = b"blob bytes"
+        digest = hashlib.sha256(data).hexdigest()
+        blob = Blob.objects.create(sha256=digest, file=self.put(f"blobs/{digest}.txt", data), size=len(data), refs=1)
+        with_blob = self.doc(file=blob.file.name, blob=blob)
+        plain = self.doc(file=self.put("docs/report.pdf", b"pdf"))
+        text = self.put("texts/t.txt", "도토리".encode("utf-8"))
+        self.put(sidecar.index_name(text, "marks"), b"index")
+        with_text = self.doc(file=self.put("docs/x.txt", b"x"), text_file=text)
+        etag = self.client.get(f"/api/documents/{with_blob.id}/")["ETag"]
+        self.assertIn("blob: done, moved 1", self.run_command())
+        blob.refresh_from_db()
+        with_blob.refresh_from_db()
+        plain.refresh_from_db()
+        with_text.refresh_from_db()
+        self.assertEqual(blob.file.name, layout.shard("blobs", f"{digest}.txt"))
+        self.assertEqual(with_blob.file.name, blob.file.name)
+        self.assertEqual(plain.file.name, layout.shard("docs", "report.pdf"))
+        self.assertEqual(with_text.text_file.name, layout.shard("texts", "t.txt"))
+        self.assertTrue(default_storage.exists(sidecar.index_name(with_text.text_file.name, "marks")))
+        self.assertFalse(default_storage.exists("docs/report.pdf"))
+        self.assertEqual(default_storage.open(plain.file.name).read(), b"pdf")
+        after = self.client.get(f"/api/documents/{with_blob.id}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(after.status_code, 200)  # 파일 이름이 바뀌었으므로 옛 ETag로 304가 아님
+        names = sorted(Document.objects.values_list("file", "text_file"))
+        out = self.run_command()
+        self.assertIn("blob: done, moved 0", out)
+        self.assertIn("document: done, moved 0", out)
+        self.assertEqual(sorted(Document.objects.values_list("file", "text_file")), names)
+    def test_same_basename_from_other_folders_is_not_merged(self):
+        first = self.doc(file=self.put("docs/a/report.pdf", b"first"))
+        second = self.doc(file=self.put("docs/b/report.pdf", b"second"))
+        lost = self.doc(file="docs/c/report.pdf")  # 파일이 없음 → 앞 문서의 파일을 가져가면 안 됨
+        self.assertIn("document: done, moved 2, missing 1", self.run_command())
+        first.refresh_from_db()
+        second.refresh_from_db()
+        lost.refresh_from_db()
+        self.assertEqual(first.file.name, layout.shard("docs", "report.pdf"))
+        self.assertNotEqual(second.file.name, first.file.name)
+        self.assertEqual(default_storage.open(second.file.name).read(), b"second")
+        self.assertEqual(lost.file.name, "docs/c/report.pdf")
+    def test_interrupted_move_is_adopted(self):
+        doc = self.doc(file="docs/report.pdf")
+        self.put(layout.shard("docs", "report.pdf"), b"moved before the row was updated")
+        self.assertIn("document: done, moved 1", self.run_command())
+        doc.refresh_from_db()
+        self.assertEqual(doc.file.name, layout.shard("docs", "report.pdf"))
@@ -0,0 +1,135 @@
+"""이어받기(resumable) 업로드: 구간별로 받은 바이트를 임시 파일에 이어 붙이고 마지막에 검증 후 Document로.
+
+요청 본문은 request.body로 한 번에 읽지 않고 작은 조각으로 스트림에서 바로 파일에 쓴다 (메모리 일정).
+"""
+import hashlib
+import os
+import re
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from .models import Document, UploadSession
+from . import ingest
+READ_SIZE = 64 * 1024
+RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+class UploadError(Exception):
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+def temp_dir() -> str:
+    return settings.DOCUMENT_UPLOAD_TEMP_DIR or os.path.join(settings.MEDIA_ROOT, "uploads_tmp")
+def part_path(session_id) -> str:
+    return os.path.join(temp_dir(), f"{session_id}.part")
+def parse_range(header: str | None, size: int) -> tuple[int, int]:
+    """Content-Range: bytes start-end/total → (start, end+1)"""
+    m = RANGE_RE.match(header or "")
+    if not m:
+        raise UploadError("Content-Range: bytes start-end/total 헤더가 필요합니다.")
+    start, end, total = int(m[1]), int(m[2]) + 1, m[3]
+    if end <= start or end > size or (total != "*" and int(total) != size):
+        raise UploadError("Content-Range가 업로드 크기와 맞지 않습니다.", 416)
+    if end - start > settings.DOCUMENT_UPLOAD_CHUNK_MAX:
+        raise UploadError(f"한 번에 최대 {settings.DOCUMENT_UPLOAD_CHUNK_MAX} 바이트까지 보낼 수 있습니다.", 413)
+    return start, end
+def write_range(session_id, start: int, end: int, stream) -> int:
+    """[start, end) 구간을 이어 붙이고 새 offset을 돌려줌.
+
+    이미 받은 구간의 재전송은 무시(멱등), 앞에 빈 구간이 생기면 409.
+    본문은 트랜잭션/행 잠금 밖에서 받고, 다 쓴 뒤 received가 그대로(start)일 때만 end로 올린다.
+    끊겨서 일부만 쓰인 바이트는 확정(received)되지 않았으므로 다음 PUT이 덮어쓴다.
+    """
+    session = _open_session(session_id)
+    if end <= session.received:
+        return session.received
+    if start != session.received:
+        raise UploadError(f"offset {session.received}부터 보내주세요.", 409)
+    os.makedirs(temp_dir(), exist_ok=True)
+    # 같은 구간을 동시에 보내도 서로 잘라내지 않도록 truncate 없이 제자리에 덮어씀
+    fd = os.open(part_path(session.id), os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(fd, "r+b") as out:
+        out.seek(start)
+        remaining = end - start
+        while remaining:
+            piece = stream.read(min(READ_SIZE, remaining))
+            if not piece:
+                break
+            out.write(piece)
+            remaining -= len(piece)
+    if remaining:
+        raise UploadError(f"본문이 Content-Range보다 {remaining} 바이트 짧습니다.")
+    advanced = UploadSession.objects.filter(
+        id=session.id, status=UploadSession.Status.OPEN, received=start,
+    ).update(received=end, updated_at=timezone.now())
+    if advanced:
+        return end
+    # 그 사이 같은 구간을 다른 요청이 먼저 확정했으면 멱등 처리, 아니면 (완료/초기화됨) 409
+    session = _open_session(session_id)
+    if end <= session.received:
+        return session.received
+    raise UploadError(f"offset {session.received}부터 보내주세요.", 409)
+def _open_session(session_id) -> UploadSession:
+    session = UploadSession.objects.filter(id=session_id).first()
+    if session is None or _expired(session):
+        raise UploadError("업로드 세션이 없거나 만료되었습니다.", 404)
+    if session.status != UploadSession.Status.OPEN:
+        raise UploadError("이미 완료된 업로드입니다.", 409)
+    return session
+def _expired(session: UploadSession) -> bool:
+    # expire_upload_sessions가 곧 지울 세션
+    cutoff = timezone.now() - timedelta(seconds=settings.DOCUMENT_UPLOAD_SESSION_TTL)
+    return session.status == UploadSession.Status.OPEN and session.updated_at < cutoff
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for piece in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(piece)
+    return h.hexdigest()
+class PartFile(File):
+    # temporary_file_path가 있으면 FileSystemStorage가 복사 대신 파일을 옮긴다
+    def temporary_file_path(self):
+        return self.file.name
+def finalize(session_id, sha256: str = "") -> tuple[Document, bool]:
+    """모든 바이트를 받았고 sha256이 맞으면 Document 생성. (문서, 새로 만들었는지) - 재호출은 같은 문서
+
+    세션이 없거나 만료 404, 덜 받았거나 임시 파일이 사라졌으면 409, sha256 불일치 422 (UploadError)
+    """
+    error = None
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().filter(id=session_id).first()
+        if session is None or _expired(session):
+            raise UploadError("업로드 세션이 없거나 만료되었습니다.", 404)
+        if session.status == UploadSession.Status.DONE:
+            if session.document_id:
+                return session.document, False
+            raise UploadError("이미 완료된 업로드의 문서가 삭제되었습니다. 새로 업로드해주세요.", 409)
+        if session.received != session.size:
+            raise UploadError(f"아직 {session.size - session.received} 바이트가 남았습니다.", 409)
+        expected = (sha256 or session.sha256).lower()
+        if not expected:
+            raise UploadError("sha256이 필요합니다.")
+        path = part_path(session.id)
+        if not os.path.exists(path):
+            error = UploadError("임시 파일이 없습니다. 처음부터 다시 업로드해주세요.", 409)
+        elif file_sha256(path) != expected:
+            # 손상된 임시 파일은 버리고 처음부터 다시 받게 함
+            os.remove(path)
+            error = UploadError("sha256이 일치하지 않습니다. 처음부터 다시 업로드해주세요.", 422)
+        if error is not None:
+            UploadSession.objects.filter(id=session.id).update(received=0, updated_at=timezone.now())
+        else:
+            with open(path, "rb") as f:
+                fields = ingest.store_upload(PartFile(f), session.filename, digest=expected)
+            doc = Document.objects.create(owner_id=session.owner_id, original_name=session.filename, **fields)
+            if os.path.exists(path):
+                os.remove(path)
+            session.status, session.document = UploadSession.Status.DONE, doc
+            session.save(update_fields=["status", "document", "updated_at"])
+    if error is not None:
+        raise error
+    return doc, True
+def discard(session: UploadSession):
+    if os.path.exists(part_path(session.id)):
+        os.remove(part_path(session.id))
+    session.delete()
@@ -1,5 +1,11 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import DocumentViewSet
+from .views import DocumentViewSet, UploadSessionCreateView, UploadSessionDetailView, UploadSessionFinalizeView
 router = DefaultRouter()
 router.register(r"", DocumentViewSet, basename="document")
-urlpatterns = router.urls
+# 라우터의 {pk} 패턴보다 먼저 매칭되도록 앞에 둠
+urlpatterns = [
+    path("uploads/", UploadSessionCreateView.as_view(), name="upload_session_create"),
+    path("uploads/<uuid:pk>/", UploadSessionDetailView.as_view(), name="upload_session_detail"),
+    path("uploads/<uuid:pk>/finalize/", UploadSessionFinalizeView.as_view(), name="upload_session_finalize"),
+] + router.urls
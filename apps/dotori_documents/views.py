@@ -1,25 +1,186 @@
-from rest_framework import viewsets, permissions
+import io
+import os
+from django.conf import settings
+from django.db.models.functions import Length, Substr
+from rest_framework import generics, viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
-from django.core.files.uploadedfile import UploadedFile
-from .models import Document
-from .serializers import DocumentSerializer
+from rest_framework.views import APIView
+from apps.dotori_common import minhash
+from apps.dotori_common.conditional import ConditionalRetrieveMixin, make_etag, not_modified, set_validators
+from apps.dotori_common.downloads import AnyMediaRenderer, serve_file
+from apps.dotori_common.idempotency import IdempotentCreateMixin
+from apps.dotori_common.pagination import UploadedAtCursorPagination
+from .models import Document, UploadSession
+from .serializers import DocumentSerializer, DocumentListSerializer, UploadSessionSerializer
+from . import extractors, ingest, sidecar, uploads
 
-class DocumentViewSet(viewsets.ModelViewSet):
+class DocumentViewSet(IdempotentCreateMixin, ConditionalRetrieveMixin, viewsets.ModelViewSet):
     serializer_class = DocumentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = UploadedAtCursorPagination
     def get_queryset(self):
-        return Document.objects.filter(owner=self.request.user).order_by("-uploaded_at")
+        qs = Document.objects.filter(owner=self.request.user).order_by("-uploaded_at", "-id")
+        if self.action == "list":
+            qs = qs.defer("text_cache").annotate(
+                text_preview=Substr("text_cache", 1, settings.LIST_PREVIEW_CHARS),
+                text_length=Length("text_cache"),
+            )
+        elif self.action == "text":
+            qs = qs.defer("text_cache")  # 구간 읽기는 사이드카에서 (사이드카가 없을 때만 지연 로딩)
+        return qs
+    def get_serializer_class(self):
+        if self.action == "list":
+            return DocumentListSerializer
+        return DocumentSerializer
     def perform_create(self, serializer):
-        obj = serializer.save(owner=self.request.user)
-        f: UploadedFile = obj.file
-        if getattr(f, "content_type", None) in ["text/plain","application/json"] or f.name.endswith(".txt"):
-            try:
-                obj.text_cache = f.read().decode("utf-8", errors="ignore")
-                obj.save()
-            except Exception:
-                pass
+        # 같은 파일은 blob 하나로 저장, 텍스트 파일은 저장 전에 스트리밍 디코딩 → INSERT 한 번에 text_cache까지
+        # 이미 처리된 blob이면 결과 재사용, 아니면 PDF/DOCX/HWP는 after_upload가 추출 작업을 발송
+        f = serializer.validated_data["file"]
+        fields = ingest.store_upload(f, f.name)
+        try:
+            obj = serializer.save(owner=self.request.user, **fields)
+        except Exception:
+            ingest.discard_upload(fields)  # 행을 못 만들었으면 올려 둔 참조 수를 돌려줌 (아니면 blob이 영영 남음)
+            raise
+        ingest.after_upload(obj)
+        # 응답(serializer.data)은 blob 이름과 추출 상태가 반영된 DB 행으로 직렬화
+        obj.refresh_from_db()
+    def perform_destroy(self, instance):
+        # blob 참조 수는 post_delete(release_blob)에서 돌려줌
+        minhash.forget("document", [instance.id])
+        ingest.release_text_file(instance)
+        instance.delete()
     @action(detail=True, methods=["post"])
     def extract_text(self, request, pk=None):
+        """
+        추출 진행률 (기다리지 않음). 끝났으면 text 포함 200, 진행 중이면 202
+        - 아직 시작 안 한 PDF/DOCX/HWP는 여기서 시작, 실패한 것은 ?retry=1 로 다시 시작
+        - RUNNING인데 임대 시간(DOCUMENT_EXTRACT_RUNNING_TIMEOUT) 동안 진행이 없으면 다시 시작
+        """
         doc = self.get_object()
-        return Response({"ok": True, "text": doc.text_cache})
+        Extraction = Document.Extraction
+        state = doc.extraction_status
+        if state == Extraction.NONE and doc.text_cache:
+            state = Extraction.DONE  # 추출 단계 도입 전에 올린 텍스트 문서
+        retry = state == Extraction.ERROR and request.query_params.get("retry") == "1"
+        if (state == Extraction.NONE or retry or ingest.extraction_stale(doc)) and extractors.detect_format(doc.file.name):
+            ingest.start_extraction(doc)
+            doc.refresh_from_db()
+            state = doc.extraction_status
+        body = {
+            "ok": state != Extraction.ERROR,
+            "status": state,
+            "progress": {"done": doc.extraction_done, "total": doc.extraction_total},
+        }
+        if state == Extraction.DONE:
+            body["text"] = doc.text_cache
+        elif state == Extraction.ERROR:
+            body["error"] = doc.extraction_error
+        in_progress = state in (Extraction.PENDING, Extraction.RUNNING)
+        return Response(body, status=status.HTTP_202_ACCEPTED if in_progress else status.HTTP_200_OK)
+    @action(detail=True, methods=["get"])
+    def text(self, request, pk=None):
+        """
+        추출 텍스트의 일부만 (사이드카 파일 + 오프셋 색인을 mmap으로 읽어 문서 길이와 무관한 비용)
+        - GET /api/documents/{id}/text/?start=0&end=5000   글자 구간
+        - GET /api/documents/{id}/text/?para=200&count=20  문단(빈 줄이 아닌 줄) 구간
+        """
+        params = {}
+        for name in ("start", "end", "para", "count"):
+            raw = request.query_params.get(name)
+            if raw is not None:
+                if not raw.isdigit():
+                    raise ValidationError({name: ["0 이상의 정수를 입력해주세요."]})
+                params[name] = int(raw)
+        doc = self.get_object()
+        etag = make_etag(doc.id, doc.text_file.name, doc.updated_at, request.query_params.urlencode())
+        response = not_modified(request, etag, doc.updated_at)
+        if response is not None:
+            return response
+        if "para" in params:
+            count = min(params.get("count", 20), settings.DOCUMENT_TEXT_RANGE_MAX_PARAS)
+            if doc.text_file:
+                start, text = sidecar.read_paragraphs(doc.text_file.name, params["para"], count)
+            else:
+                start, text = sidecar.paragraphs_in(doc.text_cache, params["para"], count)
+            body = {"para": params["para"], "count": count, "start": start, "end": start + len(text)}
+        else:
+            start = params.get("start", 0)
+            end = min(params.get("end", start + settings.DOCUMENT_TEXT_RANGE_MAX_CHARS),
+                      start + settings.DOCUMENT_TEXT_RANGE_MAX_CHARS)
+            text = sidecar.read_chars(doc.text_file.name, start, end) if doc.text_file else doc.text_cache[start:end]
+            body = {"start": start, "end": start + len(text)}
+        if doc.text_file:
+            total = sidecar.totals(doc.text_file.name)
+        else:
+            total = {"chars": len(doc.text_cache), "paragraphs": sum(1 for line in doc.text_cache.split("\n") if line.strip())}
+        body.update(total_chars=total["chars"], total_paragraphs=total["paragraphs"], text=text)
+        return set_validators(Response(body), etag, doc.updated_at)
+    @action(detail=True, methods=["get"], renderer_classes=[JSONRenderer, AnyMediaRenderer])
+    def download(self, request, pk=None):
+        """
+        원본 파일 (본인 문서만). Range(단일 구간) → 206, If-None-Match/If-Modified-Since → 304
+        - ?inline=1 이면 브라우저에서 바로 열기
+        - DOCUMENT_DOWNLOAD_ACCEL_PREFIX 설정 시 X-Accel-Redirect로 nginx가 전송
+        """
+        doc = self.get_object()
+        if not doc.file:
+            raise NotFound("파일이 없습니다.")
+        name = doc.original_name or os.path.basename(doc.file.name)
+        # 저장된 파일은 바뀌지 않으므로 파일 이름 + 업로드 시각으로 검증자를 만듦
+        etag = make_etag(doc.id, doc.file.name, doc.uploaded_at)
+        return serve_file(request, doc.file, name, etag, doc.uploaded_at, as_attachment=request.query_params.get("inline") != "1")
+    @action(detail=True, methods=["get"])
+    def similar(self, request, pk=None):
+        """내 문서 중 텍스트가 거의 같은 것 (MinHash 유사도 추정치 포함)"""
+        doc = self.get_object()
+        sig = minhash.signature(doc.text_cache) if doc.text_cache else None
+        found = minhash.query("document", sig, owner_id=request.user.id, exclude=[doc.id]) if sig is not None else []
+        names = dict(Document.objects.filter(owner=request.user, id__in=[i for i, _ in found]).values_list("id", "original_name"))
+        return Response({"similar": [
+            {"id": i, "original_name": names[i], "similarity": round(score, 3)} for i, score in found if i in names
+        ]})
+class UploadSessionCreateView(IdempotentCreateMixin, generics.CreateAPIView):
+    """
+    이어받기 업로드 시작
+    - POST /api/documents/uploads/   body: { "filename": "...", "size": 123, "sha256": "..." }
+    → PUT /api/documents/uploads/{id}/ (Content-Range: bytes 0-N/size, 본문은 원시 바이트)를 반복
+    → POST /api/documents/uploads/{id}/finalize/
+    끊기면 GET /api/documents/uploads/{id}/ 의 received부터 이어서 보내면 됨
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+class UploadSessionDetailView(generics.RetrieveDestroyAPIView):
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    def get_queryset(self):
+        return UploadSession.objects.filter(owner=self.request.user)
+    def put(self, request, *args, **kwargs):
+        # request.data를 건드리지 않고 스트림에서 바로 임시 파일로 (파서/메모리 버퍼 없음)
+        session = self.get_object()
+        try:
+            start, end = uploads.parse_range(request.headers.get("Content-Range"), session.size)
+            offset = uploads.write_range(session.id, start, end, request.stream or io.BytesIO())
+        except uploads.UploadError as e:
+            received = UploadSession.objects.filter(id=session.id).values_list("received", flat=True).first()
+            return Response({"detail": str(e), "received": received}, status=e.status)
+        return Response({"received": offset, "size": session.size})
+    def perform_destroy(self, instance):
+        uploads.discard(instance)
+class UploadSessionFinalizeView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    def post(self, request, pk):
+        session = generics.get_object_or_404(UploadSession, id=pk, owner=request.user)
+        try:
+            doc, created = uploads.finalize(session.id, request.data.get("sha256", ""))
+        except uploads.UploadError as e:
+            return Response({"detail": str(e)}, status=e.status)
+        if created:
+            ingest.after_upload(doc)
+        data = DocumentSerializer(doc, context={"request": request}).data
+        return Response(data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
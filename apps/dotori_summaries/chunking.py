@@ -0,0 +1,65 @@
+import zlib
+from django.conf import settings
+from django.db.models.functions import Length, Substr
+from .models import Summary
+from .summarizers import BOUNDARY_RE
+def text_length(summary_id: int) -> int:
+    return (
+        Summary.objects.filter(id=summary_id)
+        .annotate(n=Length("source_text"))
+        .values_list("n", flat=True)
+        .get()
+    )
+def read_slice(summary_id: int, start: int, end: int) -> str:
+    """source_text[start:end]만 DB에서 잘라 읽기 (전체 행을 메모리에 올리지 않음)"""
+    return (
+        Summary.objects.filter(id=summary_id)
+        .annotate(part=Substr("source_text", start + 1, end - start))
+        .values_list("part", flat=True)
+        .get()
+    )
+def iter_sentences(read, total: int, window: int):
+    """(start, end, 문장)을 앞에서부터 차례로 생성. 한 번에 한 창(window)씩만 읽음.
+
+    경계 없이 window를 넘는 구간은 그 길이에서 강제로 자름.
+    """
+    pos = base = 0
+    buf = ""
+    while pos < total:
+        end = min(pos + window, total)
+        buf += read(pos, end)
+        pos = end
+        last = 0
+        for m in BOUNDARY_RE.finditer(buf):
+            if m.end() == len(buf) and pos < total:
+                break  # 창 끝의 경계는 다음 창을 봐야 확정됨
+            yield base + last, base + m.end(), buf[last:m.end()]
+            last = m.end()
+        buf, base = buf[last:], base + last
+        if len(buf) >= window:
+            yield base, base + len(buf), buf
+            buf, base = "", base + len(buf)
+    if buf:
+        yield base, base + len(buf), buf
+def iter_chunks(read, total: int, size: int, min_size: int | None = None, divisor: int | None = None):
+    """size 이하 청크의 (start, end, 문장 목록)을 차례로 생성.
+
+    경계는 위치가 아니라 내용으로 정함(content-defined): min_size를 넘긴 뒤 해시 % divisor == 0인
+    문장에서 자름. 문서 일부를 고쳐도 그 주변 청크만 바뀌고 나머지 청크(와 청크 캐시 키)는 그대로 유지됨.
+    """
+    min_size = size // 4 if min_size is None else min_size
+    divisor = divisor or settings.SUMMARY_CHUNK_DIVISOR
+    start = end = 0
+    pieces = []
+    for s, e, sentence in iter_sentences(read, total, size):
+        if e - start > size and pieces:
+            yield start, end, pieces
+            start, pieces = end, []
+        pieces.append(sentence)
+        end = e
+        body = sentence.strip()
+        if body and end - start >= min_size and zlib.crc32(body.encode("utf-8", "surrogatepass")) % divisor == 0:
+            yield start, end, pieces
+            start, pieces = end, []
+    if pieces:
+        yield start, end, pieces
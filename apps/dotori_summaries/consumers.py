@@ -0,0 +1,17 @@
+import json
+from channels.generic.websocket import AsyncWebsocketConsumer
+from .notify import user_group
+class SummaryConsumer(AsyncWebsocketConsumer):
+    # 내 요약들의 상태 변화(PENDING → DONE/ERROR, 진행률)를 한 소켓으로 받는다
+    async def connect(self):
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401); return
+        self.group_name = user_group(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+    async def disconnect(self, close_code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+    async def summary_status(self, event):
+        await self.send(text_data=json.dumps(event["summary"], ensure_ascii=False))
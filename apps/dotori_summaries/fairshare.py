@@ -0,0 +1,91 @@
+import logging
+from datetime import timedelta
+from celery import group
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import Length
+from django.utils import timezone
+from .models import Summary
+logger = logging.getLogger(__name__)
+INFLIGHT_STATUSES = (Summary.Status.PENDING, Summary.Status.RUNNING)
+RR_CURSOR_KEY = "dotori:fairshare:rr_cursor"
+def release(owner_id: int, limit: int | None = None) -> list[int]:
+    """사용자의 대기 작업을 빈 슬롯(SUMMARY_MAX_INFLIGHT_PER_USER)만큼 오래된 순으로 발송"""
+    cap = settings.SUMMARY_MAX_INFLIGHT_PER_USER
+    with transaction.atomic():
+        # 같은 사용자의 release를 직렬화 (Postgres 행 잠금, SQLite는 DB 잠금으로 대체)
+        get_user_model().objects.select_for_update().filter(pk=owner_id).values_list("pk").first()
+        mine = Summary.objects.filter(owner_id=owner_id, status__in=INFLIGHT_STATUSES)
+        free = None
+        if cap > 0:
+            free = cap - mine.filter(dispatched_at__isnull=False).count()
+            if free <= 0:
+                return []
+        if limit is not None:
+            free = limit if free is None else min(free, limit)
+        held = (
+            mine.filter(dispatched_at__isnull=True).order_by("created_at", "id")
+            .values_list("id", "lane", Length("source_text"))
+        )
+        picked = list(held[:free] if free is not None else held)
+        if not picked:
+            return []
+        Summary.objects.filter(id__in=[row[0] for row in picked]).update(dispatched_at=timezone.now())
+        transaction.on_commit(lambda: _publish(owner_id, picked))
+    return [row[0] for row in picked]
+def _publish(owner_id: int, picked: list):
+    from .tasks import summary_signatures
+    try:
+        group(summary_signatures(picked)).apply_async()
+    except Exception:
+        # 브로커 발송 실패: 잡아 둔 슬롯을 되돌려 다음 release/rebalance가 다시 보냄
+        ids = [row[0] for row in picked]
+        Summary.objects.filter(id__in=ids, status=Summary.Status.PENDING).update(dispatched_at=None)
+        logger.warning("user %s: publishing summaries %s failed, returned to backlog", owner_id, ids, exc_info=True)
+def reclaim_stale() -> int:
+    """발송했지만 SUMMARY_DISPATCH_TIMEOUT이 지나도록 아무 워커도 시작하지 않은 PENDING을 대기열로 되돌림.
+
+    on_commit 발송 전에 프로세스가 죽은 경우 등. 늦게 도착한 중복 메시지는 states.claim이 걸러낸다.
+    """
+    stale = timezone.now() - timedelta(seconds=settings.SUMMARY_DISPATCH_TIMEOUT)
+    return Summary.objects.filter(status=Summary.Status.PENDING, dispatched_at__lt=stale).update(dispatched_at=None)
+def rebalance() -> int:
+    """대기열이 있는 사용자들을 한 건씩 번갈아(round-robin) 발송. 더 보낼 수 없을 때까지 반복."""
+    reclaim_stale()
+    owners = list(
+        Summary.objects.filter(status__in=INFLIGHT_STATUSES, dispatched_at__isnull=True)
+        .values_list("owner_id", flat=True).distinct().order_by("owner_id")
+    )
+    cursor = cache.get(RR_CURSOR_KEY, 0)
+    owners = [o for o in owners if o > cursor] + [o for o in owners if o <= cursor]
+    released = 0
+    while owners:
+        still_waiting = []
+        for owner_id in owners:
+            if release(owner_id, limit=1):
+                released += 1
+                cache.set(RR_CURSOR_KEY, owner_id, timeout=None)
+                still_waiting.append(owner_id)
+        owners = still_waiting
+    return released
+def queue_depths() -> dict:
+    """사용자별 대기(held)/실행 중(inflight) 건수"""
+    rows = (
+        Summary.objects.filter(status__in=INFLIGHT_STATUSES)
+        .values("owner_id")
+        .annotate(
+            held=Count("id", filter=Q(dispatched_at__isnull=True)),
+            inflight=Count("id", filter=Q(dispatched_at__isnull=False)),
+        )
+        .order_by("-held")
+    )
+    per_user = {row["owner_id"]: {"held": row["held"], "inflight": row["inflight"]} for row in rows}
+    return {
+        "max_inflight_per_user": settings.SUMMARY_MAX_INFLIGHT_PER_USER,
+        "held": sum(v["held"] for v in per_user.values()),
+        "inflight": sum(v["inflight"] for v in per_user.values()),
+        "users": per_user,
+    }
@@ -0,0 +1,58 @@
+import random
+import time
+from django.core.management.base import BaseCommand, CommandError
+from apps.dotori_summaries.summarizers import get_summarizer
+WORDS = (
+    "도토리 다람쥐 숲속 친구 학교 선생님 학생 수업 공부 책 문장 이야기 가을 나무 열매 "
+    "바람 하늘 마음 생각 질문 대답 그림 노래 시간 오늘 내일 어제 함께 조용히 열심히"
+).split()
+ENDINGS = ["습니다.", "어요.", "다.", "나요?", "군요!"]
+def sample_text(chars: int, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    parts = []
+    size = 0
+    while size < chars:
+        sent = " ".join(rnd.choices(WORDS, k=rnd.randint(5, 14))) + rnd.choice(ENDINGS)
+        if rnd.random() < 0.1:
+            sent += "\n"
+        parts.append(sent)
+        size += len(sent) + 1
+    return " ".join(parts)[:chars]
+class Command(BaseCommand):
+    help = "요약기 처리 시간을 측정합니다. (기본: 10만 자 문서, 1초 예산)"
+    def add_arguments(self, parser):
+        parser.add_argument("--chars", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--summarizer", default=None, help="dotted path (기본: SUMMARY_SUMMARIZER)")
+        parser.add_argument("--budget", type=float, default=1.0, help="최악 실행 시간 허용치(초)")
+        parser.add_argument(
+            "--many", type=int, default=0,
+            help="짧은 글 N개를 summarize_many로 처리하는 처리량 측정 (원격 요약기의 묶음 호출 확인용)",
+        )
+    def handle(self, *args, **opts):
+        summarizer = get_summarizer(opts["summarizer"])
+        if opts["many"]:
+            return self.bench_many(summarizer, opts["many"])
+        text = sample_text(opts["chars"])
+        timings = []
+        for _ in range(opts["repeat"]):
+            t0 = time.perf_counter()
+            summary = summarizer.summarize(text)
+            timings.append(time.perf_counter() - t0)
+        worst = max(timings)
+        self.stdout.write(
+            f"{summarizer.cache_version}: {len(text):,} chars, "
+            f"best {min(timings):.3f}s / worst {worst:.3f}s over {len(timings)} runs"
+        )
+        self.stdout.write(f"summary: {summary}")
+        if worst > opts["budget"]:
+            raise CommandError(f"budget exceeded: {worst:.3f}s > {opts['budget']:.3f}s")
+    def bench_many(self, summarizer, count):
+        texts = [sample_text(400, seed=i) for i in range(count)]
+        t0 = time.perf_counter()
+        results = summarizer.summarize_many(texts)
+        elapsed = time.perf_counter() - t0
+        self.stdout.write(
+            f"{summarizer.cache_version}: {len(results)} short texts in {elapsed:.3f}s "
+            f"({len(results) / elapsed:.1f} texts/s, batch_size={summarizer.batch_size})"
+        )
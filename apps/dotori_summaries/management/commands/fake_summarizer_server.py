@@ -0,0 +1,57 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.core.management.base import BaseCommand
+from apps.dotori_summaries.summarizers import TextRankSummarizer
+def make_handler(latency: float):
+    local = TextRankSummarizer()
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive 재사용을 확인할 수 있도록
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                return self._send(404, {"error": "not found"})
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                payload = json.loads(self.rfile.read(length))
+                content = payload["messages"][-1]["content"]
+            except (ValueError, KeyError, IndexError):
+                return self._send(400, {"error": "bad request"})
+            if latency:
+                time.sleep(latency)
+            try:
+                texts = json.loads(content)["texts"]
+                answer = json.dumps([local.summarize(t) for t in texts], ensure_ascii=False)
+            except (ValueError, KeyError, TypeError):
+                answer = local.summarize(content)
+            self._send(200, {
+                "model": payload.get("model", "fake"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}}],
+            })
+        def _send(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        def log_message(self, fmt, *args):
+            pass
+    return Handler
+class Command(BaseCommand):
+    help = (
+        "OpenAI 호환 chat/completions를 흉내 내는 로컬 요약 서버 (로컬 TextRank 사용). "
+        "SUMMARY_REMOTE_URL=http://127.0.0.1:8765/v1 로 오프라인 테스트/벤치마크에 사용."
+    )
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.0, help="요청마다 지연(초), 원격 API 흉내")
+    def handle(self, *args, **opts):
+        server = ThreadingHTTPServer((opts["host"], opts["port"]), make_handler(opts["latency"]))
+        self.stdout.write(f"fake summarizer on http://{opts['host']}:{opts['port']}/v1")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
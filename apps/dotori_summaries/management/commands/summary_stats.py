@@ -0,0 +1,14 @@
+import json
+from django.core.management.base import BaseCommand
+from apps.dotori_summaries import result_cache, fairshare
+class Command(BaseCommand):
+    help = "요약 결과 캐시 상태(항목 수, 적중/미스)와 사용자별 대기열 깊이를 출력합니다."
+    def add_arguments(self, parser):
+        parser.add_argument("--evict", action="store_true", help="출력 전에 LRU 축출을 실행")
+    def handle(self, *args, **opts):
+        if opts["evict"]:
+            self.stdout.write(f"evicted: {result_cache.evict()}")
+        self.stdout.write(json.dumps(
+            {"cache": result_cache.stats(), "queues": fairshare.queue_depths()},
+            ensure_ascii=False, indent=2,
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_summaries', '0002_summarybatch_summary_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
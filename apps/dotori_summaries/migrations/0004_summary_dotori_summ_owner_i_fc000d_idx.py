@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_summaries', '0003_summary_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='summary',
+            index=models.Index(fields=['owner', 'created_at'], name='dotori_summ_owner_i_fc000d_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_summaries', '0004_summary_dotori_summ_owner_i_fc000d_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='dispatched_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='summary',
+            name='lane',
+            field=models.CharField(default='interactive', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='summary',
+            index=models.Index(fields=['owner', 'status', 'dispatched_at'], name='dotori_summ_owner_i_4ac30d_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_summaries', '0005_summary_dispatched_at_summary_lane_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='summary',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('ERROR', 'Error')], default='PENDING', max_length=20),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_summaries', '0006_summary_attempts_alter_summary_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='ranking',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='summarycache',
+            name='ranking',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
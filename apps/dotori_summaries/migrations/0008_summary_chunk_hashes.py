@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_summaries', '0007_summary_ranking_summarycache_ranking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='chunk_hashes',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_summaries', '0008_summary_chunk_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='reused_from',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='dotori_summaries.summary'),
+        ),
+    ]
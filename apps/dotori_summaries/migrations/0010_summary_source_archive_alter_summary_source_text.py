@@ -0,0 +1,24 @@
+# Generated by Django 5.0.6 on 2026-10-18 05:56
+
+import apps.dotori_common.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_summaries', '0009_summary_reused_from'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='source_archive',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='summary',
+            name='source_text',
+            field=apps.dotori_common.fields.ColdTextField(archive_field='source_archive'),
+        ),
+    ]
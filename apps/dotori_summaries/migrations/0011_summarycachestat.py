@@ -0,0 +1,21 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_summaries', '0010_summary_source_archive_alter_summary_source_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SummaryCacheStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20, unique=True)),
+                ('value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dotori_summaries', '0011_summarycachestat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summary',
+            name='chunks_done',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='summary',
+            name='chunks_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,11 +1,62 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from apps.dotori_common.fields import ColdTextField
 User = get_user_model()
 class Summary(models.Model):
+    # PENDING → RUNNING → DONE/ERROR (전이는 states.py의 조건부 UPDATE로만)
+    class Status(models.TextChoices):
+        PENDING = "PENDING"
+        RUNNING = "RUNNING"
+        DONE = "DONE"
+        ERROR = "ERROR"
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="summaries")
-    source_text = models.TextField()
+    # 오래된 원문은 archive_payloads로 압축 보관 → source_archive가 있으면 접근 시 지연 로딩
+    source_text = ColdTextField(archive_field="source_archive")
+    source_archive = models.JSONField(null=True, blank=True)
     result = models.TextField(blank=True)
+    # 한 번 계산한 문장 순위 [(위치, 점수, 문장), ...] → 길이별 요약을 재계산 없이 잘라서 제공
+    ranking = models.JSONField(default=list, blank=True)
+    # 긴 원문의 청크별 캐시 키(내용 기준 경계) - 수정본은 바뀐 청크만 다시 요약
+    chunk_hashes = models.JSONField(default=list, blank=True)
+    # 청크 map 진행률 (워커들이 F() UPDATE로 올림 - 프로세스별 캐시와 무관)
+    chunks_done = models.PositiveIntegerField(default=0)
+    chunks_total = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
-    status = models.CharField(max_length=20, default="PENDING")
+    updated_at = models.DateTimeField(auto_now=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
     tts_url = models.URLField(blank=True)
+    batch = models.ForeignKey("SummaryBatch", null=True, blank=True, on_delete=models.SET_NULL, related_name="summaries")
+    # 공정 스케줄링: dispatched_at이 비어 있는 PENDING은 사용자별 대기열(backlog)에 있는 작업
+    lane = models.CharField(max_length=20, default="interactive")
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    # 거의 같은 이전 요약(MinHash)의 결과를 재사용한 경우 그 요약
+    reused_from = models.ForeignKey("self", null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    class Meta:
+        indexes = [
+            models.Index(fields=["owner", "created_at"]),
+            models.Index(fields=["owner", "status", "dispatched_at"]),
+        ]
     def __str__(self): return f"Summary {self.id} ({self.status})"
+# 한 번에 올린 학습지 묶음 (진행률은 소속 Summary 상태 집계)
+class SummaryBatch(models.Model):
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="summary_batches")
+    total = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    def __str__(self): return f"SummaryBatch {self.id} ({self.total})"
+# 정규화 텍스트 해시 + 요약기 버전 → 요약 결과 (LRU 축출)
+class SummaryCache(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    version = models.CharField(max_length=40)
+    result = models.TextField()
+    ranking = models.JSONField(default=list, blank=True)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+    def __str__(self): return f"SummaryCache {self.key[:12]} ({self.version})"
+# 결과 캐시 적중/미스 누계: 요청마다는 공유 캐시에서 incr, beat 작업(evict_summary_cache)이 모아서 DB에 더함
+class SummaryCacheStat(models.Model):
+    name = models.CharField(max_length=20, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
+    def __str__(self): return f"{self.name}={self.value}"
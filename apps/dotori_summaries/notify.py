@@ -0,0 +1,16 @@
+import logging
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+logger = logging.getLogger(__name__)
+def user_group(user_id: int) -> str:
+    return f"summaries_user_{user_id}"
+def notify_summary(owner_id: int, summary_id: int, status: str, **extra):
+    """채널 레이어로 상태 전이를 알림. 실패해도 요약 작업은 계속 진행."""
+    layer = get_channel_layer()
+    if layer is None:
+        return
+    payload = {"id": summary_id, "status": status, **extra}
+    try:
+        async_to_sync(layer.group_send)(user_group(owner_id), {"type": "summary.status", "summary": payload})
+    except Exception:
+        logger.warning("summary %s: channel layer notify failed", summary_id, exc_info=True)
@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import threading
+import urllib3
+from django.conf import settings
+from urllib3.util import Retry, Timeout
+from .summarizers import BaseSummarizer, TextRankSummarizer
+logger = logging.getLogger(__name__)
+SYSTEM_PROMPT = (
+    "너는 초등학생과 보호자를 위한 요약 도우미야. 주어진 글을 {sentences}문장 이내, "
+    "{chars}자 이내의 쉬운 한국어로 요약해. 요약문만 답해."
+)
+BATCH_PROMPT = (
+    "입력은 {{\"texts\": [...]}} 형태의 JSON이야. 각 글을 위 규칙대로 요약해서 "
+    "같은 순서의 JSON 문자열 배열로만 답해."
+)
+_local = {"pid": None, "pool": None, "slots": None}
+_lock = threading.Lock()
+def _connection():
+    """워커 프로세스마다 keep-alive 연결 풀 1개 + 동시 호출 제한 세마포어 (fork 이후 재생성)"""
+    pid = os.getpid()
+    if _local["pid"] != pid:
+        with _lock:
+            if _local["pid"] != pid:
+                limit = settings.SUMMARY_REMOTE_MAX_CONCURRENCY
+                retries = Retry(
+                    total=settings.SUMMARY_REMOTE_RETRIES,
+                    backoff_factor=settings.SUMMARY_REMOTE_BACKOFF,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=None,  # POST도 재시도
+                    respect_retry_after_header=True,
+                )
+                _local["pool"] = urllib3.PoolManager(
+                    maxsize=limit,
+                    block=True,
+                    retries=retries,
+                    timeout=Timeout(connect=5.0, read=settings.SUMMARY_REMOTE_TIMEOUT),
+                )
+                _local["slots"] = threading.BoundedSemaphore(limit)
+                _local["pid"] = pid
+    return _local["pool"], _local["slots"]
+class RemoteSummarizerError(RuntimeError):
+    pass
+class RemoteSummarizer(BaseSummarizer):
+    """OpenAI 호환 chat/completions API 요약기.
+
+    짧은 글은 batch_size개씩 한 번의 호출로 묶고, 긴 문서의 map 단계(extract)와 문장 순위(rank)는 로컬 TextRank로 처리.
+    """
+    name = "remote"
+    def __init__(self):
+        self.url = settings.SUMMARY_REMOTE_URL.rstrip("/") + "/chat/completions"
+        self.model = settings.SUMMARY_REMOTE_MODEL
+        self.api_key = settings.OPENAI_API_KEY
+        self.batch_size = settings.SUMMARY_REMOTE_BATCH_SIZE
+        self.batch_max_chars = settings.SUMMARY_REMOTE_SHORT_CHARS
+        self.batch_chars = settings.SUMMARY_REMOTE_BATCH_CHARS
+        self._local = TextRankSummarizer()
+    @property
+    def version(self):
+        return self.model
+    def _system(self, max_sentences=None, max_chars=None) -> str:
+        return SYSTEM_PROMPT.format(
+            sentences=max_sentences or settings.SUMMARY_MAX_SENTENCES,
+            chars=max_chars or settings.SUMMARY_MAX_CHARS,
+        )
+    def _complete(self, messages: list[dict]) -> str:
+        pool, slots = _connection()
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        body = json.dumps({"model": self.model, "messages": messages, "temperature": 0}, ensure_ascii=False)
+        with slots:
+            resp = pool.request("POST", self.url, body=body.encode("utf-8"), headers=headers)
+        if resp.status != 200:
+            raise RemoteSummarizerError(f"요약 API 오류 {resp.status}: {resp.data[:200]!r}")
+        try:
+            return json.loads(resp.data)["choices"][0]["message"]["content"].strip()
+        except (ValueError, KeyError, IndexError) as e:
+            raise RemoteSummarizerError(f"요약 API 응답 형식 오류: {e}")
+    def summarize(self, text, max_sentences=None, max_chars=None):
+        return self._complete([
+            {"role": "system", "content": self._system(max_sentences, max_chars)},
+            {"role": "user", "content": text},
+        ])
+    def summarize_many(self, texts):
+        results = []
+        for group in self._batches(texts):
+            if len(group) == 1:
+                results.append(self.summarize(group[0]))
+                continue
+            content = self._complete([
+                {"role": "system", "content": self._system() + " " + BATCH_PROMPT},
+                {"role": "user", "content": json.dumps({"texts": group}, ensure_ascii=False)},
+            ])
+            try:
+                parsed = json.loads(content)
+            except ValueError:
+                parsed = None
+            if not isinstance(parsed, list) or len(parsed) != len(group):
+                logger.warning("batched summary response malformed; falling back to single calls")
+                parsed = [self.summarize(text) for text in group]
+            results.extend(str(item) for item in parsed)
+        return results
+    def _batches(self, texts):
+        group, size = [], 0
+        for text in texts:
+            if group and (len(group) >= self.batch_size or size + len(text) > self.batch_chars):
+                yield group
+                group, size = [], 0
+            group.append(text)
+            size += len(text)
+        if group:
+            yield group
+    def rank(self, text, limit=None):
+        # 길이별 요약(?sentences=, ?chars=)은 로컬 TextRank 순위로 제공
+        return self._local.rank(text, limit)
+    def summarize_from(self, text, ranking):
+        return self.summarize(text)
+    def extract(self, text, k):
+        return self._local.extract(text, k)
@@ -0,0 +1,138 @@
+import hashlib
+import re
+import unicodedata
+from typing import NamedTuple
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import SummaryCache, SummaryCacheStat
+_WS_RE = re.compile(r"\s+")
+HITS_KEY = "hits"
+MISSES_KEY = "misses"
+COUNTER_PREFIX = "dotori:summary_cache:"
+def normalize_text(text: str) -> str:
+    """NFC 정규화 + 공백 축약 (같은 학습지는 같은 키가 되도록)"""
+    return _WS_RE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+def cache_key(text: str, version: str) -> str:
+    return cache_key_stream([text], version)
+def cache_key_stream(pieces, version: str) -> str:
+    """조각(iterable[str])으로 나뉜 텍스트의 키 - normalize_text(전체)와 같은 결과"""
+    key = StreamKey(version)
+    for piece in pieces:
+        key.update(piece)
+    return key.hexdigest()
+class StreamKey:
+    """cache_key_stream의 점진 버전 - 한 번 훑으면서 여러 키(전체/청크별)를 동시에 계산할 때 사용"""
+    def __init__(self, version: str):
+        self.h = hashlib.sha256(f"{version}\0".encode("utf-8"))
+        self.started = self.need_space = False
+    def update(self, piece: str):
+        piece = unicodedata.normalize("NFC", piece)
+        words = piece.split()
+        if not words:
+            self.need_space = self.need_space or bool(piece)
+            return
+        if piece[0].isspace():
+            self.need_space = True
+        for i, word in enumerate(words):
+            if self.started and (self.need_space or i > 0):
+                self.h.update(b" ")
+            self.h.update(word.encode("utf-8", "surrogatepass"))
+            self.started, self.need_space = True, False
+        if piece[-1].isspace():
+            self.need_space = True
+    def hexdigest(self) -> str:
+        return self.h.hexdigest()
+def _count(name: str, delta: int = 1):
+    # 공유 캐시(Redis)의 원자적 incr - DB 행 하나에 요청이 몰리지 않게, DB 반영은 flush_counters
+    key = COUNTER_PREFIX + name
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key, delta)
+    except ValueError:  # add와 incr 사이에 지워짐
+        cache.set(key, delta, timeout=None)
+def _pending(name: str) -> int:
+    return cache.get(COUNTER_PREFIX + name) or 0
+def _bump(name: str, delta: int):
+    # 조건부 UPDATE(F) - 행이 아직 없을 때만 생성 (동시에 만들면 UPDATE로 재시도)
+    if SummaryCacheStat.objects.filter(name=name).update(value=F("value") + delta):
+        return
+    try:
+        with transaction.atomic():
+            SummaryCacheStat.objects.create(name=name, value=delta)
+    except IntegrityError:
+        SummaryCacheStat.objects.filter(name=name).update(value=F("value") + delta)
+def flush_counters() -> dict:
+    """캐시에 쌓인 적중/미스 수를 SummaryCacheStat에 더하고 그만큼 뺌 (그 사이 들어온 incr은 남음)"""
+    flushed = {}
+    for name in (HITS_KEY, MISSES_KEY):
+        n = _pending(name)
+        if n:
+            cache.decr(COUNTER_PREFIX + name, n)
+            _bump(name, n)
+        flushed[name] = n
+    return flushed
+def _touch(rows):
+    """[(id, last_used_at), ...] 중 SUMMARY_CACHE_TOUCH_INTERVAL보다 오래된 것만 last_used_at 갱신 (hits도 이때만 +1, 근사치)"""
+    now = timezone.now()
+    stale = [row_id for row_id, used in rows if used < now - timedelta(seconds=settings.SUMMARY_CACHE_TOUCH_INTERVAL)]
+    if stale:
+        SummaryCache.objects.filter(id__in=stale).update(hits=F("hits") + 1, last_used_at=now)
+class Cached(NamedTuple):
+    result: str
+    ranking: list
+def get(key: str) -> Cached | None:
+    row = SummaryCache.objects.filter(key=key).values_list("id", "result", "ranking", "last_used_at").first()
+    if row is None:
+        _count(MISSES_KEY)
+        return None
+    _touch([(row[0], row[3])])
+    _count(HITS_KEY)
+    return Cached(row[1], row[2])
+def get_many(keys: list[str]) -> dict[str, Cached]:
+    """여러 키를 한 번의 쿼리로 조회 (배치 생성용)"""
+    found = list(
+        SummaryCache.objects.filter(key__in=set(keys)).values_list("id", "key", "result", "ranking", "last_used_at")
+    )
+    rows = {key: Cached(result, ranking) for _, key, result, ranking, _ in found}
+    _touch([(row_id, used) for row_id, _, _, _, used in found])
+    hits = sum(1 for key in keys if key in rows)
+    if hits:
+        _count(HITS_KEY, hits)
+    if len(keys) - hits:
+        _count(MISSES_KEY, len(keys) - hits)
+    return rows
+def put(key: str, version: str, result: str, ranking: list | None = None):
+    SummaryCache.objects.update_or_create(
+        key=key,
+        defaults={"version": version, "result": result, "ranking": ranking or [], "last_used_at": timezone.now()},
+    )
+def lookup(text: str, version: str) -> Cached | None:
+    return get(cache_key(text, version))
+def store(text: str, version: str, result: str, ranking: list | None = None):
+    put(cache_key(text, version), version, result, ranking)
+def evict() -> int:
+    """최대 개수를 넘으면 가장 오래 사용되지 않은 항목부터 삭제 (저장할 때마다가 아니라 beat 주기 작업으로)"""
+    limit = settings.SUMMARY_CACHE_MAX_ENTRIES
+    excess = SummaryCache.objects.count() - limit
+    if excess <= 0:
+        return 0
+    ids = list(SummaryCache.objects.order_by("last_used_at").values_list("id", flat=True)[:excess])
+    deleted, _ = SummaryCache.objects.filter(id__in=ids).delete()
+    return deleted
+def stats() -> dict:
+    counts = dict(SummaryCacheStat.objects.values_list("name", "value"))
+    # DB 누계 + 아직 옮기지 않은 캐시 카운터
+    hits = counts.get(HITS_KEY, 0) + _pending(HITS_KEY)
+    misses = counts.get(MISSES_KEY, 0) + _pending(MISSES_KEY)
+    total = hits + misses
+    return {
+        "entries": SummaryCache.objects.count(),
+        "max_entries": settings.SUMMARY_CACHE_MAX_ENTRIES,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / total, 4) if total else 0.0,
+    }
@@ -1,10 +1,46 @@
+from django.conf import settings
 from rest_framework import serializers
 from .models import Summary
+from .summarizers import pick
 class SummaryCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Summary
-        fields = ["id", "source_text"]
+        fields = ["id", "source_text", "status", "result", "reused_from"]
+        read_only_fields = ["status", "result", "reused_from"]
 class SummarySerializer(serializers.ModelSerializer):
     class Meta:
         model = Summary
-        fields = ["id", "source_text", "result", "status", "created_at", "tts_url"]
+        fields = ["id", "source_text", "result", "status", "created_at", "tts_url", "reused_from"]
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        length = self.context.get("length")
+        if length and instance.ranking:
+            # ?sentences= / ?chars= 요청: 저장된 순위에서 잘라냄
+            data["result"] = pick(
+                instance.ranking,
+                length.get("sentences", len(instance.ranking)),
+                length.get("chars", sum(len(r[2]) + 1 for r in instance.ranking)),
+            )
+        return data
+class SummaryListSerializer(serializers.ModelSerializer):
+    # 목록에서는 원문 대신 앞부분 미리보기와 길이만 (queryset에서 annotate)
+    preview = serializers.CharField(source="source_preview", read_only=True)
+    source_length = serializers.IntegerField(read_only=True)
+    class Meta:
+        model = Summary
+        fields = ["id", "preview", "source_length", "result", "status", "created_at", "updated_at", "tts_url"]
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if instance.source_archive:
+            data["source_length"] = instance.source_archive["chars"]  # DB에는 앞부분만 남아 있음
+        return data
+class SummaryBatchCreateSerializer(serializers.Serializer):
+    texts = serializers.ListField(
+        child=serializers.CharField(),
+        min_length=1,
+        max_length=settings.SUMMARY_BATCH_MAX_TEXTS,
+    )
+class SummaryBatchItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Summary
+        fields = ["id", "status", "result"]
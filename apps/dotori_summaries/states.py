@@ -0,0 +1,37 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import Summary
+Status = Summary.Status
+FINAL_STATUSES = (Status.DONE, Status.ERROR)
+def claim(summary_id: int) -> int | None:
+    """PENDING(또는 임대가 만료된 RUNNING) → RUNNING. 성공하면 owner_id, 아니면 None.
+
+    조건부 UPDATE 한 번으로 처리하므로 중복 전달된 작업은 여기서 걸러지고,
+    source_text 같은 큰 컬럼은 다시 쓰지 않는다.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.SUMMARY_RUNNING_TIMEOUT)
+    claimed = (
+        Summary.objects.filter(id=summary_id)
+        .filter(Q(status=Status.PENDING) | Q(status=Status.RUNNING, updated_at__lt=stale))
+        .update(status=Status.RUNNING, attempts=F("attempts") + 1, updated_at=now)
+    )
+    if not claimed:
+        return None
+    return Summary.objects.filter(id=summary_id).values_list("owner_id", flat=True).first()
+def chunk_done(summary_id: int) -> int | None:
+    """청크 하나 완료: 진행률 +1과 임대 연장을 UPDATE 한 번으로. RUNNING이 아니면 None, 아니면 완료 수"""
+    if not Summary.objects.filter(id=summary_id, status=Status.RUNNING).update(
+        chunks_done=F("chunks_done") + 1, updated_at=timezone.now()
+    ):
+        return None
+    return Summary.objects.filter(id=summary_id).values_list("chunks_done", flat=True).first()
+def finish(summary_id: int, status: str, result: str, ranking: list | None = None) -> bool:
+    """RUNNING → DONE/ERROR. 이미 끝난 작업이면 아무것도 쓰지 않고 False."""
+    assert status in FINAL_STATUSES
+    fields = {"status": status, "result": result, "updated_at": timezone.now()}
+    if ranking is not None:
+        fields["ranking"] = ranking
+    return bool(Summary.objects.filter(id=summary_id, status=Status.RUNNING).update(**fields))
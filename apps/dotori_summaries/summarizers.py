@@ -0,0 +1,145 @@
+import re
+from functools import lru_cache
+import numpy as np
+from django.conf import settings
+from django.utils.module_loading import import_string
+# 문장 경계: 일반 문장부호 + 공백, 띄어쓰기 없이 붙은 한국어 종결어미(…다.다음), 줄바꿈
+BOUNDARY_RE = re.compile(
+    r"[.!?。！？…]+[\"'”’」』)\]]*(?=\s|$)"
+    r"|(?<=[다요죠까네오])[.!?]+(?=[가-힣])"
+    r"|\n"
+)
+def sentence_spans(text: str) -> list[tuple[int, int]]:
+    """문장 단위 (start, end) 오프셋 목록 (앞뒤 공백 제외)"""
+    spans = []
+    start = 0
+    for m in BOUNDARY_RE.finditer(text):
+        _append_span(text, start, m.end(), spans)
+        start = m.end()
+    _append_span(text, start, len(text), spans)
+    return spans
+def _append_span(text, start, end, spans):
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    if start < end:
+        spans.append((start, end))
+def pick(ranking, max_sentences: int, max_chars: int) -> str:
+    """순위 목록 [(위치, 점수, 문장), ...](점수 내림차순)에서 한도 안의 문장을 원문 순서로 이어 붙임"""
+    picked = []
+    used = 0
+    for pos, _, sentence in ranking:
+        cost = len(sentence) + (1 if picked else 0)
+        if used + cost > max_chars:
+            if not picked:
+                return sentence[:max_chars]
+            continue
+        picked.append((pos, sentence))
+        used += cost
+        if len(picked) >= max_sentences:
+            break
+    picked.sort()
+    return " ".join(sentence for _, sentence in picked)
+class BaseSummarizer:
+    """요약기 인터페이스: score()만 구현하면 rank()/summarize()는 공통 처리"""
+    name = "base"
+    version = "1"
+    # 한 번의 호출로 묶어 처리할 수 있는 짧은 텍스트 수(1이면 묶지 않음)와 묶음 대상 최대 길이
+    batch_size = 1
+    batch_max_chars = 0
+    @property
+    def cache_version(self) -> str:
+        return f"{self.name}-v{self.version}"
+    def score(self, text: str, spans: list[tuple[int, int]]) -> np.ndarray:
+        raise NotImplementedError
+    def rank(self, text: str, limit: int | None = None) -> list[list]:
+        """문장 순위 [(위치, 점수, 문장), ...] 점수 내림차순 (Summary.ranking으로 저장)"""
+        spans = sentence_spans(text)
+        if not spans:
+            return []
+        scores = np.asarray(self.score(text, spans), dtype=np.float64)
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [[int(i), round(float(scores[i]), 6), text[spans[i][0]:spans[i][1]]] for i in order]
+    def summarize_from(self, text: str, ranking) -> str:
+        """이미 계산한 순위로 기본 길이 요약 (원격 요약기는 text를 직접 요약)"""
+        return pick(ranking, settings.SUMMARY_MAX_SENTENCES, settings.SUMMARY_MAX_CHARS)
+    def summarize(self, text: str, max_sentences: int | None = None, max_chars: int | None = None) -> str:
+        return pick(
+            self.rank(text),
+            max_sentences or settings.SUMMARY_MAX_SENTENCES,
+            max_chars or settings.SUMMARY_MAX_CHARS,
+        )
+    def summarize_many(self, texts: list[str]) -> list[str]:
+        return [self.summarize(text) for text in texts]
+    def extract(self, text: str, k: int) -> list[str]:
+        """점수 상위 k개 문장을 원문 순서로 (map-reduce의 map 단계 결과)"""
+        return [sentence for _, _, sentence in sorted(self.rank(text, k))]
+class LeadSummarizer(BaseSummarizer):
+    """앞 문장 우선 (기존 '처음 세 문장' 방식)"""
+    name = "lead"
+    version = "2"
+    def score(self, text, spans):
+        return np.arange(len(spans), 0, -1, dtype=np.float32)
+class TextRankSummarizer(BaseSummarizer):
+    """문자 바이그램 TF-IDF 코사인 유사도 행렬 위의 TextRank (NumPy 일괄 계산)"""
+    name = "textrank"
+    version = "1"
+    dim = 1024
+    damping = 0.85
+    max_iter = 50
+    tol = 1e-5
+    def features(self, text: str, spans) -> np.ndarray:
+        n = len(spans)
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32).astype(np.uint64)
+        if codes.size < 2:
+            return np.zeros((n, self.dim), dtype=np.float32)
+        upper = (codes >= 0x41) & (codes <= 0x5A)
+        codes = np.where(upper, codes + 32, codes)
+        word = (
+            ((codes >= 0xAC00) & (codes <= 0xD7A3))   # 한글 음절
+            | ((codes >= 0x30) & (codes <= 0x39))
+            | ((codes >= 0x61) & (codes <= 0x7A))
+            | ((codes >= 0x4E00) & (codes <= 0x9FFF))  # 한자
+        )
+        starts = np.fromiter((a for a, _ in spans), dtype=np.int64, count=n)
+        ends = np.fromiter((b for _, b in spans), dtype=np.int64, count=n)
+        pos = np.arange(codes.size - 1, dtype=np.int64)
+        sid = np.searchsorted(starts, pos, side="right") - 1
+        valid = (sid >= 0) & word[:-1] & word[1:]
+        valid &= pos + 1 < ends[np.clip(sid, 0, n - 1)]
+        bigram = (codes[:-1] * np.uint64(1000003) ^ codes[1:]) % np.uint64(self.dim)
+        x = np.zeros((n, self.dim), dtype=np.float32)
+        np.add.at(x, (sid[valid], bigram[valid].astype(np.int64)), 1.0)
+        return x
+    def score(self, text, spans):
+        n = len(spans)
+        if n <= 2:
+            return np.arange(n, 0, -1, dtype=np.float32)
+        x = self.features(text, spans)
+        df = np.count_nonzero(x, axis=0)
+        x = np.log1p(x) * (np.log((n + 1) / (df + 1)) + 1).astype(np.float32)
+        norms = np.linalg.norm(x, axis=1, keepdims=True)
+        x /= np.where(norms > 0, norms, 1)
+        # 유사도 행렬 S = X·Xᵀ - diag 를 n×n으로 만들지 않고 인수분해 형태로 반복 (O(n·dim))
+        diag = np.einsum("ij,ij->i", x, x)
+        row = x @ (x.T @ np.ones(n, dtype=np.float32)) - diag
+        linked = row > 1e-6
+        inv_row = np.where(linked, 1.0 / np.where(linked, row, 1), 0).astype(np.float32)
+        rank = np.full(n, 1.0 / n, dtype=np.float32)
+        for _ in range(self.max_iter):
+            v = rank * inv_row
+            spread = x @ (x.T @ v) - diag * v
+            # 다른 문장과 겹치는 어휘가 없는 문장은 균등 분배
+            spread += rank[~linked].sum() / n
+            nxt = (1 - self.damping) / n + self.damping * spread
+            done = np.abs(nxt - rank).sum() < self.tol
+            rank = nxt
+            if done:
+                break
+        return rank
+@lru_cache(maxsize=None)
+def _load(path: str) -> BaseSummarizer:
+    return import_string(path)()
+def get_summarizer(path: str | None = None) -> BaseSummarizer:
+    return _load(path or settings.SUMMARY_SUMMARIZER)
@@ -1,21 +1,186 @@
-from celery import shared_task
+from celery import shared_task, chord, group
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from dotori_core.celery import lane_options
 from .models import Summary
+from .summarizers import get_summarizer
+from .chunking import text_length, read_slice, iter_chunks
+from .notify import notify_summary
+from . import result_cache, fairshare, states, tts
+Status = Summary.Status
+def _finish(summary_id: int, owner_id: int, status: str, result: str, ranking: list | None = None) -> bool:
+    # 실제로 전이된 경우에만 알림/다음 작업 발송 (중복 전달이면 조용히 무시)
+    if not states.finish(summary_id, status, result, ranking):
+        return False
+    notify_summary(owner_id, summary_id, status, result=result)
+    fairshare.release(owner_id)
+    if status == Status.DONE:
+        enqueue_tts(summary_id)
+    return True
+def enqueue_tts(summary_id: int):
+    if settings.SUMMARY_TTS_ENABLED:
+        run_tts.delay(summary_id)
+def _summarize(summarizer, text: str) -> tuple[str, list]:
+    # 순위는 한 번만 계산해 기본 요약과 Summary.ranking(길이별 요약)에 함께 사용
+    ranking = summarizer.rank(text, settings.SUMMARY_RANKING_MAX)
+    return summarizer.summarize_from(text, ranking), ranking
+def summary_signature(summary_id: int, lane: str = "interactive"):
+    # lane별 큐·우선순위가 붙은 시그니처 (fairshare.release가 group으로 발송)
+    return run_summary.s(summary_id, lane=lane).set(**lane_options(lane))
+def summary_signatures(rows) -> list:
+    """(id, lane, 길이) 목록 → 발송 시그니처. 요약기가 묶음 호출을 지원하면 짧은 글끼리 run_summary_many로 묶음"""
+    summarizer = get_summarizer()
+    size = summarizer.batch_size
+    signatures, short = [], {}
+    for summary_id, lane, length in rows:
+        if size > 1 and length <= summarizer.batch_max_chars:
+            short.setdefault(lane, []).append(summary_id)
+        else:
+            signatures.append(summary_signature(summary_id, lane))
+    for lane, ids in short.items():
+        for i in range(0, len(ids), size):
+            part = ids[i:i + size]
+            if len(part) == 1:
+                signatures.append(summary_signature(part[0], lane))
+            else:
+                signatures.append(run_summary_many.s(part, lane=lane).set(**lane_options(lane)))
+    return signatures
 @shared_task
-def run_summary(summary_id: int):
-    obj = Summary.objects.get(id=summary_id)
+def run_summary(summary_id: int, lane: str = "interactive"):
+    owner_id = states.claim(summary_id)
+    if owner_id is None:
+        return  # 이미 끝났거나 다른 워커가 실행 중
+    notify_summary(owner_id, summary_id, Status.RUNNING)
     try:
-        text = obj.source_text.strip()
+        total = text_length(summary_id)
+        if total > settings.SUMMARY_CHUNK_CHARS:
+            return dispatch_chunks(summary_id, owner_id, total, lane)
+        text = read_slice(summary_id, 0, total).strip()
         if not text:
-            obj.status = "ERROR"
-            obj.result = "빈 텍스트"
-            obj.save(); return
-        import re
-        sentences = re.split(r'(?<=[.!?\n])\s+', text)
-        draft = " ".join(sentences[:3])[:300]
-        obj.result = draft if draft else text[:300]
-        obj.status = "DONE"
-        obj.save()
+            return _finish(summary_id, owner_id, Status.ERROR, "빈 텍스트")
+        summarizer = get_summarizer()
+        cached = result_cache.lookup(text, summarizer.cache_version)
+        if cached is None:
+            cached = _summarize(summarizer, text)
+            result_cache.store(text, summarizer.cache_version, *cached)
+        _finish(summary_id, owner_id, Status.DONE, *cached)
     except Exception as e:
-        obj.status = "ERROR"
-        obj.result = str(e)
-        obj.save()
+        _finish(summary_id, owner_id, Status.ERROR, str(e))
+@shared_task
+def run_summary_many(summary_ids: list[int], lane: str = "interactive"):
+    # 짧은 글 여러 개를 요약기 한 번 호출로 (RemoteSummarizer.summarize_many)
+    summarizer = get_summarizer()
+    owners = {}
+    for summary_id in summary_ids:
+        owner_id = states.claim(summary_id)
+        if owner_id is not None:
+            owners[summary_id] = owner_id
+    todo = []
+    for summary_id, source_text in Summary.objects.filter(id__in=owners).values_list("id", "source_text"):
+        text = source_text.strip()
+        owner_id = owners[summary_id]
+        if not text:
+            _finish(summary_id, owner_id, Status.ERROR, "빈 텍스트"); continue
+        cached = result_cache.lookup(text, summarizer.cache_version)
+        if cached is not None:
+            _finish(summary_id, owner_id, Status.DONE, *cached)
+        else:
+            todo.append((summary_id, text))
+    if not todo:
+        return
+    try:
+        results = summarizer.summarize_many([text for _, text in todo])
+    except Exception as e:
+        for summary_id, _ in todo:
+            _finish(summary_id, owners[summary_id], Status.ERROR, str(e))
+        return
+    for (summary_id, text), result in zip(todo, results):
+        ranking = summarizer.rank(text, settings.SUMMARY_RANKING_MAX)
+        result_cache.store(text, summarizer.cache_version, result, ranking)
+        _finish(summary_id, owners[summary_id], Status.DONE, result, ranking)
+def _chunk_version(summarizer) -> str:
+    # 청크 중간 결과(문장 추출)의 캐시 버전 - 추출 개수/요약기가 바뀌면 다른 키
+    return f"chunk{settings.SUMMARY_CHUNK_SENTENCES}-{summarizer.cache_version}"
+def dispatch_chunks(summary_id: int, owner_id: int, total: int, lane: str = "interactive"):
+    # 긴 문서: 청크별 map(병렬) → reduce. 각 작업은 자기 구간만 DB에서 읽는다.
+    # 한 번 훑으며 전체 키와 청크별 키를 같이 계산 → 수정된 재업로드는 바뀐 청크만 다시 요약
+    summarizer = get_summarizer()
+    chunk_version = _chunk_version(summarizer)
+    whole = result_cache.StreamKey(summarizer.cache_version)
+    bounds, keys = [], []
+    def read(start, end): return read_slice(summary_id, start, end)
+    for start, end, pieces in iter_chunks(read, total, settings.SUMMARY_CHUNK_CHARS):
+        for piece in pieces:
+            whole.update(piece)
+        bounds.append((start, end))
+        keys.append(result_cache.cache_key_stream(pieces, chunk_version))
+    key = whole.hexdigest()
+    Summary.objects.filter(id=summary_id).update(chunk_hashes=keys)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return _finish(summary_id, owner_id, Status.DONE, *cached)
+    found = result_cache.get_many(keys)
+    # 캐시된 청크는 추출 문장을 그대로, None 자리는 chord 결과로 채움
+    layout = [[s for s in found[k].result.split("\n") if s] if k in found else None for k in keys]
+    todo = [bound for bound, part in zip(bounds, layout) if part is None]
+    Summary.objects.filter(id=summary_id).update(chunks_done=0, chunks_total=len(todo))
+    if not todo:
+        return reduce_summary([], summary_id, key, layout)
+    notify_summary(owner_id, summary_id, Status.RUNNING,
+                   progress={"done": 0, "total": len(todo), "reused": len(bounds) - len(todo)})
+    # 청크/리듀스도 요청한 lane의 큐·우선순위를 그대로 따름
+    opts = lane_options(lane)
+    header = group(
+        summarize_chunk.s(summary_id, start, end, len(todo), k).set(**opts)
+        for (start, end), k, part in zip(bounds, keys, layout) if part is None
+    )
+    chord(header)(reduce_summary.s(summary_id, key, layout).set(**opts).on_error(summary_failed.s(summary_id)))
+@shared_task
+def summarize_chunk(summary_id: int, start: int, end: int, total_chunks: int = 0, key: str | None = None) -> list[str]:
+    text = read_slice(summary_id, start, end)
+    summarizer = get_summarizer()
+    sentences = summarizer.extract(text, settings.SUMMARY_CHUNK_SENTENCES)
+    if key:
+        result_cache.put(key, _chunk_version(summarizer), "\n".join(sentences))
+    done = states.chunk_done(summary_id) if total_chunks else None
+    if done is not None:
+        owner_id = Summary.objects.filter(id=summary_id).values_list("owner_id", flat=True).get()
+        notify_summary(owner_id, summary_id, Status.RUNNING, progress={"done": done, "total": total_chunks})
+    return sentences
+@shared_task
+def reduce_summary(parts: list[list[str]], summary_id: int, key: str, layout: list | None = None):
+    if layout is not None:
+        fresh = iter(parts)
+        parts = [next(fresh) if part is None else part for part in layout]
+    summarizer = get_summarizer()
+    draft = "\n".join(sentence for part in parts for sentence in part)
+    result, ranking = _summarize(summarizer, draft)
+    result_cache.put(key, summarizer.cache_version, result, ranking)
+    owner_id = Summary.objects.filter(id=summary_id).values_list("owner_id", flat=True).get()
+    _finish(summary_id, owner_id, Status.DONE, result, ranking)
+@shared_task
+def summary_failed(request, exc, traceback, summary_id: int):
+    owner_id = Summary.objects.filter(id=summary_id).values_list("owner_id", flat=True).get()
+    _finish(summary_id, owner_id, Status.ERROR, str(exc))
+@shared_task
+def run_tts(summary_id: int):
+    # 요약 완료 후 단계: 같은 요약문+음성이면 저장된 오디오 하나를 공유
+    row = Summary.objects.filter(id=summary_id).values_list("owner_id", "status", "result", "tts_url").first()
+    if row is None:
+        return
+    owner_id, status, result, tts_url = row
+    if status != Status.DONE or tts_url or not result:
+        return
+    url = default_storage.url(tts.synthesize_to_storage(result))
+    if Summary.objects.filter(id=summary_id, tts_url="").update(tts_url=url, updated_at=timezone.now()):
+        notify_summary(owner_id, summary_id, Status.DONE, tts_url=url)
+@shared_task
+def evict_summary_cache() -> int:
+    # 주기 작업(beat): 적중/미스 카운터를 DB로 옮기고, 결과 캐시를 SUMMARY_CACHE_MAX_ENTRIES 이하로 (LRU)
+    result_cache.flush_counters()
+    return result_cache.evict()
+@shared_task
+def rebalance_summaries():
+    # 주기 작업(beat): 유실된 release 보정 + 사용자 간 round-robin 발송
+    return fairshare.rebalance()
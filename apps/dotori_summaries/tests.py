@@ -0,0 +1,501 @@
+import asyncio
+import threading
+from datetime import timedelta
+from http.server import ThreadingHTTPServer
+from unittest import mock
+import numpy as np
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.test import SimpleTestCase
+from django.test import override_settings
+from django.utils import timezone
+from apps.dotori_common.testing import DotoriTestCase
+from .models import Summary, SummaryBatch, SummaryCache, SummaryCacheStat
+from .management.commands.fake_summarizer_server import make_handler
+from dotori_core.celery import lane_options
+from .consumers import SummaryConsumer
+from .notify import user_group
+from .remote import RemoteSummarizer
+from .summarizers import TextRankSummarizer, pick, sentence_spans
+from . import fairshare, result_cache, states, summarizers, tasks
+class ResultCacheTests(DotoriTestCase):
+    def test_same_text_after_whitespace_normalization_hits(self):
+        self.assertIsNone(result_cache.lookup("도토리는  맛있다.", "v1"))
+        result_cache.store("도토리는 맛있다.", "v1", "요약", [[0, 1.0, "도토리는 맛있다."]])
+        cached = result_cache.lookup(" 도토리는\n맛있다. ", "v1")
+        self.assertEqual(cached.result, "요약")
+        self.assertIsNone(result_cache.lookup("도토리는 맛있다.", "v2"))
+    def test_counters_go_to_shared_cache_and_are_flushed_by_beat_task(self):
+        result_cache.lookup("a", "v1")
+        result_cache.store("a", "v1", "r")
+        result_cache.lookup("a", "v1")
+        result_cache.get_many([result_cache.cache_key("a", "v1"), result_cache.cache_key("b", "v1")])
+        self.assertFalse(SummaryCacheStat.objects.exists())  # 읽을 때마다 DB 행을 쓰지 않음
+        stats = result_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (2, 2, 0.5))
+        tasks.evict_summary_cache()
+        self.assertEqual(dict(SummaryCacheStat.objects.values_list("name", "value")), {"hits": 2, "misses": 2})
+        result_cache.lookup("a", "v1")
+        tasks.evict_summary_cache()
+        self.assertEqual(dict(SummaryCacheStat.objects.values_list("name", "value")), {"hits": 3, "misses": 2})
+        self.assertEqual(result_cache.stats()["hits"], 3)
+    def test_hit_touches_last_used_at_only_when_stale(self):
+        result_cache.store("a", "v1", "r")
+        with self.assertNumQueries(1):
+            result_cache.lookup("a", "v1")
+        old = timezone.now() - timedelta(seconds=settings.SUMMARY_CACHE_TOUCH_INTERVAL + 1)
+        SummaryCache.objects.update(last_used_at=old)
+        result_cache.lookup("a", "v1")
+        self.assertGreater(SummaryCache.objects.get().last_used_at, old)
+    @override_settings(SUMMARY_CACHE_MAX_ENTRIES=2)
+    def test_eviction_runs_on_schedule_not_on_put(self):
+        for i in range(4):
+            result_cache.store(f"text {i}", "v1", f"r{i}")
+        self.assertEqual(SummaryCache.objects.count(), 4)
+        for i, entry in enumerate(SummaryCache.objects.order_by("id")):
+            SummaryCache.objects.filter(id=entry.id).update(last_used_at=timezone.now() - timedelta(hours=1, seconds=-i))
+        result_cache.lookup("text 0", "v1")  # 최근 사용 → 남음
+        self.assertEqual(tasks.evict_summary_cache(), 2)
+        self.assertIsNotNone(result_cache.lookup("text 0", "v1"))
+        self.assertEqual(SummaryCache.objects.count(), 2)
+def long_text(sentences: int, seed: int = 0) -> str:
+    words = "도토리 다람쥐 숲속 학교 선생님 학생 공부 이야기 가을 나무 열매 바람 하늘 마음 질문 그림".split()
+    return " ".join(
+        f"{words[(i + seed) % len(words)]} {words[(i * 7) % len(words)]} {words[(i * 3) % len(words)]} 문장 {i}번입니다."
+        for i in range(sentences)
+    )
+@override_settings(SUMMARY_CHUNK_CHARS=2000, SUMMARY_CHUNK_DIVISOR=8)
+class ChunkedSummaryTests(DotoriTestCase):
+    def create(self, client, text):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/summaries/create/", {"source_text": text}, format="json")
+        self.assertEqual(response.status_code, 201)
+        return Summary.objects.get(id=response.data["id"])
+    def test_chunk_progress_is_kept_on_the_row(self):
+        client, _ = self.login()
+        summary = self.create(client, long_text(400))
+        self.assertEqual(summary.status, Summary.Status.DONE)
+        self.assertGreater(summary.chunks_total, 1)
+        self.assertEqual(summary.chunks_done, summary.chunks_total)
+        self.assertEqual(len(summary.chunk_hashes), summary.chunks_total)
+class ConditionalGetTests(DotoriTestCase):
+    def test_detail_etag_304_and_change(self):
+        client, user = self.login()
+        summary = Summary.objects.create(owner=user, source_text="원문", result="요약", status=Summary.Status.DONE)
+        url = f"/api/summaries/{summary.id}/"
+        first = client.get(url)
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+        again = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(client.get(url + "?length=1", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        Summary.objects.filter(id=summary.id).update(result="새 요약", updated_at=summary.updated_at + timedelta(seconds=1))
+        changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+    def test_other_owner_gets_404_not_304(self):
+        client, user = self.login()
+        other, _ = self.login("u2")
+        summary = Summary.objects.create(owner=user, source_text="원문", status=Summary.Status.DONE)
+        etag = client.get(f"/api/summaries/{summary.id}/")["ETag"]
+        self.assertEqual(other.get(f"/api/summaries/{summary.id}/", HTTP_IF_NONE_MATCH=etag).status_code, 404)
+@override_settings(SUMMARY_MAX_INFLIGHT_PER_USER=2)
+class FairShareTests(DotoriTestCase):
+    def setUp(self):
+        super().setUp()
+        self.api, self.user = self.login()
+        self.ids = [Summary.objects.create(owner=self.user, source_text=f"글 {i}").id for i in range(3)]
+    def dispatched(self):
+        return set(Summary.objects.filter(dispatched_at__isnull=False).values_list("id", flat=True))
+    def test_release_fills_free_slots_oldest_first(self):
+        with mock.patch("apps.dotori_summaries.fairshare.group") as group:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(fairshare.release(self.user.id), self.ids[:2])
+            self.assertEqual(fairshare.release(self.user.id), [])
+            Summary.objects.filter(id=self.ids[0]).update(status=Summary.Status.DONE)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(fairshare.release(self.user.id), [self.ids[2]])
+        self.assertEqual(group.return_value.apply_async.call_count, 2)
+    def test_failed_publish_returns_slots_to_backlog(self):
+        with mock.patch("apps.dotori_summaries.fairshare.group") as group:
+            group.return_value.apply_async.side_effect = ConnectionError("broker down")
+            with self.assertLogs("apps.dotori_summaries.fairshare", "WARNING"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    fairshare.release(self.user.id)
+        self.assertEqual(self.dispatched(), set())
+    def test_rebalance_reclaims_dispatched_but_never_started(self):
+        old = timezone.now() - timedelta(seconds=settings.SUMMARY_DISPATCH_TIMEOUT + 1)
+        Summary.objects.filter(id__in=self.ids[:2]).update(dispatched_at=old)
+        with mock.patch("apps.dotori_summaries.fairshare.group") as group:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(fairshare.rebalance(), 2)
+        self.assertEqual(self.dispatched(), set(self.ids[:2]))
+        self.assertFalse(Summary.objects.filter(dispatched_at__lte=old).exists())
+        self.assertEqual(group.call_count, 2)
+class TtsTests(DotoriTestCase):
+    def create(self, client, text):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/summaries/create/", {"source_text": text}, format="json")
+        return Summary.objects.get(id=response.data["id"])
+    def test_off_by_default(self):
+        client, _ = self.login()
+        with mock.patch("apps.dotori_summaries.tasks.run_tts.delay") as delay:
+            summary = self.create(client, "도토리는 가을에 떨어진다. 다람쥐가 주워 간다.")
+        self.assertEqual(summary.status, Summary.Status.DONE)
+        self.assertEqual(summary.tts_url, "")
+        delay.assert_not_called()
+    @override_settings(SUMMARY_TTS_ENABLED=True)
+    def test_enabled_shares_audio_for_same_result(self):
+        client, _ = self.login()
+        first = self.create(client, "도토리는 가을에 떨어진다. 다람쥐가 주워 간다.")
+        second = self.create(client, "도토리는 가을에 떨어진다.  다람쥐가 주워 간다.")
+        self.assertTrue(first.tts_url)
+        self.assertEqual(first.tts_url, second.tts_url)
+@override_settings(SUMMARY_CHUNK_CHARS=2000, SUMMARY_CHUNK_DIVISOR=8)
+class ChunkInvalidationTests(DotoriTestCase):
+    def create(self, client, text):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/summaries/create/?near_dup=0", {"source_text": text}, format="json")
+        return Summary.objects.get(id=response.data["id"])
+    def test_edit_resummarizes_only_changed_chunks(self):
+        client, _ = self.login()
+        text = long_text(400)
+        chunk = tasks.summarize_chunk
+        with mock.patch.object(chunk, "run", wraps=chunk.run) as run:
+            first = self.create(client, text)
+            self.assertEqual(run.call_count, first.chunks_total)
+            run.reset_mock()
+            middle = len(text) // 2
+            edited = self.create(client, text[:middle] + " 새로 넣은 문장입니다." + text[middle:])
+        self.assertEqual(edited.status, Summary.Status.DONE)
+        changed = [k for k in edited.chunk_hashes if k not in set(first.chunk_hashes)]
+        self.assertTrue(0 < len(changed) <= 2, changed)
+        self.assertEqual(run.call_count, len(changed))
+        self.assertEqual(edited.chunks_total, len(changed))
+        self.assertGreater(len(edited.chunk_hashes), len(changed))
+    def test_same_text_reuses_whole_result_without_chunks(self):
+        client, _ = self.login()
+        text = long_text(400)
+        first = self.create(client, text)
+        with mock.patch.object(tasks.summarize_chunk, "run") as run:
+            again = self.create(client, text)
+        run.assert_not_called()
+        self.assertEqual((again.status, again.result), (Summary.Status.DONE, first.result))
+class NearDuplicateTests(DotoriTestCase):
+    def setUp(self):
+        super().setUp()
+        self.text = long_text(40)
+        # 정확히 같은 글은 결과 캐시가 먼저 받으므로 사용자마다 조금씩 다르게 고친다
+        self.edited = [self.text.replace(f"문장 {i}번입니다.", f"문장 {i}번이에요.") for i in (7, 8)]
+    def post(self, client, text):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/summaries/create/", {"source_text": text}, format="json")
+        self.assertEqual(response.status_code, 201)
+        return Summary.objects.get(id=response.data["id"])
+    def test_reuse_is_limited_to_the_same_owner(self):
+        owner, _ = self.login()
+        other, _ = self.login("u2")
+        first = self.post(owner, self.text)
+        self.assertIsNone(first.reused_from_id)
+        self.assertIsNone(self.post(other, self.edited[0]).reused_from_id)
+        self.assertEqual(self.post(owner, self.edited[1]).reused_from_id, first.id)
+class RemoteSummarizerTests(DotoriTestCase):
+    """fake_summarizer_server(OpenAI 호환 흉내)를 빈 포트에 띄워 RemoteSummarizer를 실제 HTTP로 호출"""
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+        base = make_handler(latency=0)
+        calls = self.calls
+        class Handler(base):
+            def do_POST(inner):
+                calls.append(inner.path)
+                return super().do_POST()
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+        settings_override = override_settings(
+            SUMMARY_SUMMARIZER="apps.dotori_summaries.remote.RemoteSummarizer", SUMMARY_REMOTE_URL=url,
+            SUMMARY_REMOTE_BATCH_SIZE=3, SUMMARY_REMOTE_RETRIES=0,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        summarizers._load.cache_clear()
+        self.addCleanup(summarizers._load.cache_clear)
+    def test_short_texts_are_batched(self):
+        texts = [long_text(6, seed) for seed in range(5)]
+        results = RemoteSummarizer().summarize_many(texts)
+        self.assertEqual(results, [TextRankSummarizer().summarize(t) for t in texts])
+        self.assertEqual(self.calls, ["/v1/chat/completions"] * 2)  # 3개 + 2개
+    def test_summary_is_created_through_the_remote_provider(self):
+        client, _ = self.login()
+        text = long_text(12)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/summaries/create/", {"source_text": text}, format="json")
+        summary = Summary.objects.get(id=response.data["id"])
+        self.assertEqual(summary.status, Summary.Status.DONE)
+        self.assertEqual(summary.result, TextRankSummarizer().summarize(text))
+        self.assertEqual(len(self.calls), 1)
+class SummarizerTests(SimpleTestCase):
+    text = (
+        "도토리는 참나무 열매입니다.다람쥐는 도토리를 좋아해요! 오늘 날씨는 맑음?\n"
+        "가을 숲에서 다람쥐가 도토리를 모읍니다. 컴퓨터 키보드 마우스."
+    )
+    def test_sentence_spans_split_attached_korean_endings(self):
+        self.assertEqual([self.text[a:b] for a, b in sentence_spans(self.text)], [
+            "도토리는 참나무 열매입니다.", "다람쥐는 도토리를 좋아해요!", "오늘 날씨는 맑음?",
+            "가을 숲에서 다람쥐가 도토리를 모읍니다.", "컴퓨터 키보드 마우스.",
+        ])
+    def test_textrank_prefers_central_sentences(self):
+        ranking = TextRankSummarizer().rank(self.text)
+        self.assertEqual([pos for pos, _, _ in ranking[:3]], [3, 1, 0])
+        self.assertEqual(pick(ranking, 2, 300), "다람쥐는 도토리를 좋아해요! 가을 숲에서 다람쥐가 도토리를 모읍니다.")
+        self.assertEqual(pick(ranking, 3, 30), "가을 숲에서 다람쥐가 도토리를 모읍니다.")
+        self.assertEqual(pick(ranking, 3, 5), "가을 숲에")
+    def test_factorized_iteration_matches_dense_pagerank(self):
+        summarizer = TextRankSummarizer()
+        text = long_text(60)
+        spans = sentence_spans(text)
+        n = len(spans)
+        x = summarizer.features(text, spans)
+        df = np.count_nonzero(x, axis=0)
+        x = np.log1p(x) * (np.log((n + 1) / (df + 1)) + 1)
+        x /= np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+        sim = x @ x.T
+        np.fill_diagonal(sim, 0)
+        rows = sim.sum(axis=1)
+        # 행 정규화한 n×n 전이 행렬, 연결이 없는 문장은 균등 분배
+        m = np.where(rows[:, None] > 1e-6, sim / np.where(rows > 1e-6, rows, 1)[:, None], 1.0 / n)
+        rank = np.full(n, 1.0 / n)
+        for _ in range(200):
+            rank = (1 - summarizer.damping) / n + summarizer.damping * (m.T @ rank)
+        np.testing.assert_allclose(summarizer.score(text, spans), rank, atol=1e-4)
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class NotifyTests(DotoriTestCase):
+    def drain(self, channel):
+        async def receive_all():
+            layer, messages = get_channel_layer(), []
+            while True:
+                try:
+                    messages.append(await asyncio.wait_for(layer.receive(channel), 0.2))
+                except asyncio.TimeoutError:
+                    return messages
+        return async_to_sync(receive_all)()
+    def test_status_transitions_are_pushed_to_owner_group(self):
+        client, user = self.login()
+        layer = get_channel_layer()
+        mine = async_to_sync(layer.new_channel)()
+        other = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(user_group(user.id), mine)
+        async_to_sync(layer.group_add)(user_group(user.id + 1000), other)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/summaries/create/", {"source_text": long_text(5)}, format="json")
+        events = [m["summary"] for m in self.drain(mine)]
+        self.assertEqual([e["status"] for e in events], [Summary.Status.RUNNING, Summary.Status.DONE])
+        self.assertTrue(all(e["id"] == response.data["id"] for e in events))
+        self.assertTrue(events[-1]["result"])
+        self.assertEqual(self.drain(other), [])
+    def test_consumer_forwards_group_events_and_rejects_anonymous(self):
+        _, user = self.login()
+        async def scenario():
+            anonymous = WebsocketCommunicator(SummaryConsumer.as_asgi(), "/ws/summaries/")
+            connected, code = await anonymous.connect()
+            self.assertFalse(connected)
+            self.assertEqual(code, 4401)
+            communicator = WebsocketCommunicator(SummaryConsumer.as_asgi(), "/ws/summaries/")
+            communicator.scope["user"] = user
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await get_channel_layer().group_send(user_group(user.id), {
+                "type": "summary.status", "summary": {"id": 7, "status": "DONE", "result": "요약"},
+            })
+            self.assertEqual(await communicator.receive_json_from(), {"id": 7, "status": "DONE", "result": "요약"})
+            await communicator.disconnect()
+        async_to_sync(scenario)()
+class BatchCreateTests(DotoriTestCase):
+    def test_batch_creates_rows_reuses_cache_and_reports_progress(self):
+        client, user = self.login()
+        version = summarizers.get_summarizer().cache_version
+        result_cache.store(long_text(4, seed=1), version, "캐시된 요약", [[0, 1.0, "캐시된 요약"]])
+        texts = [long_text(4, seed=1), long_text(5, seed=2), long_text(6, seed=3)]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/summaries/batch/", {"texts": texts}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["total"], 3)
+        self.assertEqual(response.data["summaries"][0]["status"], Summary.Status.DONE)
+        self.assertEqual(response.data["summaries"][0]["result"], "캐시된 요약")
+        batch = SummaryBatch.objects.get(id=response.data["id"])
+        self.assertEqual(batch.summaries.filter(owner=user, lane="bulk").count(), 3)
+        progress = client.get(f"/api/summaries/batch/{batch.id}/").data
+        self.assertEqual(progress["counts"], {Summary.Status.DONE: 3})
+        self.assertEqual(progress["finished"], 3)
+        self.assertTrue(progress["done"])
+        other, _ = self.login("u2")
+        self.assertEqual(other.get(f"/api/summaries/batch/{batch.id}/").status_code, 404)
+    def test_empty_and_oversized_batches_are_rejected(self):
+        client, _ = self.login()
+        self.assertEqual(client.post("/api/summaries/batch/", {"texts": []}, format="json").status_code, 400)
+        texts = ["도토리"] * (settings.SUMMARY_BATCH_MAX_TEXTS + 1)
+        self.assertEqual(client.post("/api/summaries/batch/", {"texts": texts}, format="json").status_code, 400)
+        self.assertFalse(SummaryBatch.objects.exists())
+class StatusEndpointTests(DotoriTestCase):
+    def test_only_own_summaries_are_reported(self):
+        client, user = self.login()
+        _, other = self.login("u2")
+        mine = Summary.objects.create(owner=user, source_text="원문", status=Summary.Status.DONE, result="요약")
+        pending = Summary.objects.create(owner=user, source_text="원문")
+        theirs = Summary.objects.create(owner=other, source_text="원문", status=Summary.Status.DONE, result="요약")
+        response = client.get(f"/api/summaries/status/?ids={theirs.id},{pending.id},{mine.id},{mine.id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted((row["id"], row["status"]) for row in response.data["summaries"]),
+            [(mine.id, Summary.Status.DONE), (pending.id, Summary.Status.PENDING)],
+        )
+        self.assertNotIn("result", response.data["summaries"][0])
+        self.assertEqual(response.data["missing"], [theirs.id])
+    @override_settings(SUMMARY_STATUS_MAX_IDS=3)
+    def test_id_cap_and_malformed_ids(self):
+        client, _ = self.login()
+        self.assertEqual(client.get("/api/summaries/status/?ids=1,2,3").status_code, 200)
+        self.assertEqual(client.get("/api/summaries/status/?ids=1,2,3,4").status_code, 400)
+        self.assertEqual(client.get("/api/summaries/status/?ids=1&ids=2,3&ids=4").status_code, 400)
+        self.assertEqual(client.get("/api/summaries/status/?ids=1,2,2,2,3").status_code, 200)
+        self.assertEqual(client.get("/api/summaries/status/?ids=1,abc").status_code, 400)
+        self.assertEqual(client.get("/api/summaries/status/").status_code, 400)
+class CursorPaginationTests(DotoriTestCase):
+    def pages(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+        return ids
+    def test_equal_created_at_pages_without_gaps_or_duplicates(self):
+        client, user = self.login()
+        rows = [Summary.objects.create(owner=user, source_text=f"원문 {i}") for i in range(23)]
+        tied = timezone.now() - timedelta(hours=1)
+        Summary.objects.filter(id__in=[row.id for row in rows[3:18]]).update(created_at=tied)
+        expected = list(Summary.objects.filter(owner=user).order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(self.pages(client, "/api/summaries/?page_size=4"), expected)
+        self.assertEqual(self.pages(client, "/api/summaries/?page_size=7"), expected)
+    def test_rows_created_while_paging_do_not_shift_later_pages(self):
+        client, user = self.login()
+        rows = [Summary.objects.create(owner=user, source_text=f"원문 {i}") for i in range(10)]
+        Summary.objects.filter(owner=user).update(created_at=timezone.now() - timedelta(hours=1))
+        first = client.get("/api/summaries/?page_size=4").data
+        Summary.objects.create(owner=user, source_text="새 원문")
+        rest = self.pages(client, first["next"])
+        seen = [row["id"] for row in first["results"]] + rest
+        self.assertEqual(seen, sorted((row.id for row in rows), reverse=True))
+        self.assertEqual(first["results"][0]["preview"], "원문 9")
+    def test_previous_link_and_bad_cursor(self):
+        client, user = self.login()
+        for i in range(9):
+            Summary.objects.create(owner=user, source_text=f"원문 {i}")
+        Summary.objects.filter(owner=user).update(created_at=timezone.now())
+        first = client.get("/api/summaries/?page_size=4").data
+        second = client.get(first["next"]).data
+        back = client.get(second["previous"]).data
+        self.assertEqual([row["id"] for row in back["results"]], [row["id"] for row in first["results"]])
+        self.assertIsNone(back["previous"])
+        self.assertEqual(client.get("/api/summaries/?cursor=cD1ub3BlfDE%3D").status_code, 404)
+class LaneRoutingTests(DotoriTestCase):
+    def create(self, client, query=""):
+        with mock.patch.object(fairshare, "group") as group:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.post(f"/api/summaries/create/{query}", {"source_text": long_text(4)}, format="json")
+        self.assertEqual(response.status_code, 201)
+        (signatures,), _ = group.call_args
+        return Summary.objects.get(id=response.data["id"]), signatures
+    def test_lane_query_selects_queue_and_priority(self):
+        client, _ = self.login()
+        summary, signatures = self.create(client, "?lane=bulk")
+        self.assertEqual(summary.lane, "bulk")
+        self.assertEqual([(s.options["queue"], s.options["priority"]) for s in signatures], [("bulk", 6)])
+        summary, signatures = self.create(client, "?lane=urgent")
+        self.assertEqual(summary.lane, "interactive")
+        self.assertEqual([(s.options["queue"], s.options["priority"]) for s in signatures], [("interactive", 0)])
+    def test_unknown_lane_and_routes_use_declared_queues(self):
+        self.assertEqual(lane_options("nope"), lane_options("interactive"))
+        declared = {queue.name for queue in settings.CELERY_TASK_QUEUES}
+        self.assertIn(settings.CELERY_TASK_DEFAULT_QUEUE, declared)
+        for name, route in settings.CELERY_TASK_ROUTES.items():
+            self.assertIn(route["queue"], declared, name)
+class ClaimLeaseTests(DotoriTestCase):
+    def setUp(self):
+        super().setUp()
+        _, self.user = self.login()
+        self.summary = Summary.objects.create(owner=self.user, source_text="원문")
+    def age(self, seconds):
+        Summary.objects.filter(id=self.summary.id).update(updated_at=timezone.now() - timedelta(seconds=seconds))
+    def test_pending_is_claimed_once(self):
+        self.assertEqual(states.claim(self.summary.id), self.user.id)
+        self.assertIsNone(states.claim(self.summary.id))
+        self.summary.refresh_from_db()
+        self.assertEqual((self.summary.status, self.summary.attempts), (Summary.Status.RUNNING, 1))
+    def test_stale_running_lease_is_reclaimed(self):
+        states.claim(self.summary.id)
+        self.age(settings.SUMMARY_RUNNING_TIMEOUT - 30)
+        self.assertIsNone(states.claim(self.summary.id))
+        self.age(settings.SUMMARY_RUNNING_TIMEOUT + 30)
+        self.assertEqual(states.claim(self.summary.id), self.user.id)
+        self.summary.refresh_from_db()
+        self.assertEqual(self.summary.attempts, 2)
+        self.assertGreater(self.summary.updated_at, timezone.now() - timedelta(seconds=30))
+    def test_chunk_progress_extends_the_lease(self):
+        states.claim(self.summary.id)
+        self.age(settings.SUMMARY_RUNNING_TIMEOUT - 1)
+        self.assertEqual(states.chunk_done(self.summary.id), 1)
+        self.age(0)
+        self.assertIsNone(states.claim(self.summary.id))
+    def test_finish_only_from_running(self):
+        self.assertFalse(states.finish(self.summary.id, Summary.Status.DONE, "요약"))
+        states.claim(self.summary.id)
+        self.assertTrue(states.finish(self.summary.id, Summary.Status.DONE, "요약", [[0, 1.0, "요약"]]))
+        self.assertFalse(states.finish(self.summary.id, Summary.Status.ERROR, "실패"))
+        self.assertIsNone(states.claim(self.summary.id))
+        self.assertIsNone(states.chunk_done(self.summary.id))
+        self.summary.refresh_from_db()
+        self.assertEqual((self.summary.status, self.summary.result), (Summary.Status.DONE, "요약"))
+    def test_duplicate_delivery_runs_the_summary_once(self):
+        with mock.patch.object(tasks, "_summarize", wraps=tasks._summarize) as summarize:
+            tasks.run_summary(self.summary.id)
+            tasks.run_summary(self.summary.id)
+        self.assertEqual(summarize.call_count, 1)
+        self.summary.refresh_from_db()
+        self.assertEqual((self.summary.status, self.summary.attempts), (Summary.Status.DONE, 1))
+class SummaryLengthTests(DotoriTestCase):
+    text = SummarizerTests.text
+    def setUp(self):
+        super().setUp()
+        self.api, user = self.login()
+        ranking = [list(row) for row in TextRankSummarizer().rank(self.text)]
+        self.summary = Summary.objects.create(
+            owner=user, source_text=self.text, status=Summary.Status.DONE, result="기본 요약", ranking=ranking,
+        )
+        self.url = f"/api/summaries/{self.summary.id}/"
+    def test_length_variants_come_from_stored_ranking(self):
+        with mock.patch.object(summarizers.TextRankSummarizer, "score") as score:
+            self.assertEqual(self.api.get(self.url).data["result"], "기본 요약")
+            self.assertEqual(self.api.get(self.url + "?sentences=1").data["result"], "가을 숲에서 다람쥐가 도토리를 모읍니다.")
+            self.assertEqual(
+                self.api.get(self.url + "?sentences=2").data["result"],
+                "다람쥐는 도토리를 좋아해요! 가을 숲에서 다람쥐가 도토리를 모읍니다.",
+            )
+            self.assertEqual(self.api.get(self.url + "?sentences=5&chars=30").data["result"], "가을 숲에서 다람쥐가 도토리를 모읍니다.")
+        score.assert_not_called()
+        self.summary.refresh_from_db()
+        self.assertEqual(self.summary.result, "기본 요약")
+    def test_each_length_has_its_own_etag(self):
+        full = self.api.get(self.url + "?sentences=5")
+        short = self.api.get(self.url + "?sentences=1")
+        self.assertNotEqual(full["ETag"], short["ETag"])
+        self.assertEqual(self.api.get(self.url + "?sentences=1", HTTP_IF_NONE_MATCH=full["ETag"]).status_code, 200)
+    def test_invalid_length_is_rejected(self):
+        for query in ("?sentences=0", "?sentences=abc", "?chars=-5"):
+            self.assertEqual(self.api.get(self.url + query).status_code, 400, query)
@@ -0,0 +1,67 @@
+import hashlib
+import math
+import struct
+import tempfile
+from functools import lru_cache
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils.module_loading import import_string
+class BaseSynthesizer:
+    """TTS 인터페이스: stream()이 오디오 바이트 조각을 차례로 내보낸다 (전체를 메모리에 올리지 않음)"""
+    name = "base"
+    version = "1"
+    extension = "wav"
+    def stream(self, text: str, voice: str):
+        raise NotImplementedError
+class OfflineStubSynthesizer(BaseSynthesizer):
+    """오프라인 개발/테스트용: 글자마다 짧은 톤을 넣은 16kHz 모노 WAV"""
+    name = "stub"
+    rate = 16000
+    per_char = 0.06  # 초
+    chunk_frames = 4096
+    def stream(self, text, voice):
+        chars = [ch for ch in text if not ch.isspace()] or [" "]
+        frames_per_char = int(self.rate * self.per_char)
+        data_size = len(chars) * frames_per_char * 2
+        yield self._header(data_size)
+        buf = bytearray()
+        for ch in chars:
+            freq = 220 + (ord(ch) % 24) * 20
+            for i in range(frames_per_char):
+                fade = min(1.0, (frames_per_char - i) / 200)
+                sample = int(6000 * fade * math.sin(2 * math.pi * freq * i / self.rate))
+                buf += struct.pack("<h", sample)
+            if len(buf) >= self.chunk_frames * 2:
+                yield bytes(buf)
+                buf.clear()
+        if buf:
+            yield bytes(buf)
+    def _header(self, data_size: int) -> bytes:
+        return b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE" + b"fmt " + struct.pack(
+            "<IHHIIHH", 16, 1, 1, self.rate, self.rate * 2, 2, 16
+        ) + b"data" + struct.pack("<I", data_size)
+@lru_cache(maxsize=None)
+def _load(path: str) -> BaseSynthesizer:
+    return import_string(path)()
+def get_synthesizer(path: str | None = None) -> BaseSynthesizer:
+    return _load(path or settings.SUMMARY_TTS_SYNTHESIZER)
+def audio_name(text: str, voice: str, synth: BaseSynthesizer) -> str:
+    digest = hashlib.sha256(f"{synth.name}-v{synth.version}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+    return f"tts/{digest}.{synth.extension}"
+def synthesize_to_storage(text: str, voice: str | None = None) -> str:
+    """텍스트+음성 해시로 캐시된 오디오 파일 이름. 없으면 임시 파일로 스트리밍 합성 후 저장."""
+    voice = voice or settings.SUMMARY_TTS_VOICE
+    synth = get_synthesizer()
+    name = audio_name(text, voice, synth)
+    if default_storage.exists(name):
+        return name
+    with tempfile.TemporaryFile() as tmp:
+        for piece in synth.stream(text, voice):
+            tmp.write(piece)
+        tmp.seek(0)
+        saved = default_storage.save(name, File(tmp))
+    if saved != name:
+        # 다른 워커가 먼저 같은 파일을 만든 경우
+        default_storage.delete(saved)
+    return name
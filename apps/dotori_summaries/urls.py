@@ -1,7 +1,13 @@
 from django.urls import path
-from .views import SummaryCreateView, SummaryDetailView, MySummariesView
+from .views import (
+    SummaryCreateView, SummaryDetailView, MySummariesView,
+    SummaryBatchCreateView, SummaryBatchDetailView, SummaryStatusView,
+)
 urlpatterns = [
     path("", MySummariesView.as_view(), name="my_summaries"),
     path("create/", SummaryCreateView.as_view(), name="create_summary"),
+    path("status/", SummaryStatusView.as_view(), name="summary_status"),
+    path("batch/", SummaryBatchCreateView.as_view(), name="create_summary_batch"),
+    path("batch/<int:pk>/", SummaryBatchDetailView.as_view(), name="summary_batch_detail"),
     path("<int:pk>/", SummaryDetailView.as_view(), name="summary_detail"),
 ]
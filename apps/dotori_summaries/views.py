@@ -1,19 +1,166 @@
-from rest_framework import generics, permissions
-from .models import Summary
-from .serializers import SummaryCreateSerializer, SummarySerializer
-from .tasks import run_summary
-class SummaryCreateView(generics.CreateAPIView):
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Length, Substr
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from apps.dotori_common import minhash
+from apps.dotori_common.conditional import ConditionalRetrieveMixin
+from apps.dotori_common.idempotency import IdempotentCreateMixin
+from apps.dotori_common.pagination import CreatedAtCursorPagination
+from .models import Summary, SummaryBatch
+from .serializers import (
+    SummaryCreateSerializer, SummarySerializer, SummaryListSerializer,
+    SummaryBatchCreateSerializer, SummaryBatchItemSerializer,
+)
+from .summarizers import get_summarizer
+from .tasks import enqueue_tts
+from . import result_cache, fairshare
+class SummaryCreateView(IdempotentCreateMixin, generics.CreateAPIView):
+    """
+    - POST /api/summaries/create/   body: { "source_text": "..." }
+    Idempotency-Key 헤더를 보내면 재시도해도 요약 행/작업은 한 번만 생성
+    기본은 interactive 큐. 급하지 않은 요청은 ?lane=bulk 로 낮은 우선순위 큐에 보낼 수 있음
+    정확히 같은 글이 없으면 본인의 거의 같은 이전 요약(MinHash)을 재사용 (reused_from). ?near_dup=0 이면 새로 요약
+    """
     serializer_class = SummaryCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
+    def near_duplicate(self, sig):
+        found = dict(minhash.query("summary", sig, owner_id=self.request.user.id))
+        done = Summary.objects.filter(id__in=found, status=Summary.Status.DONE).only("id", "result", "ranking")
+        return max(done, key=lambda s: (found[s.id], s.id), default=None)
     def perform_create(self, serializer):
-        obj = serializer.save(owner=self.request.user, status="PENDING")
-        run_summary.delay(obj.id)
-class SummaryDetailView(generics.RetrieveAPIView):
+        user = self.request.user
+        text = serializer.validated_data["source_text"].strip()
+        sig = minhash.signature(text) if text else None
+        cached = result_cache.lookup(text, get_summarizer().cache_version) if text else None
+        near = None
+        if cached is None and sig is not None and self.request.query_params.get("near_dup") != "0":
+            near = self.near_duplicate(sig)
+        if cached is not None or near is not None:
+            # 캐시 적중/거의 같은 요약: Celery 없이 바로 완료 응답
+            source = cached or near
+            obj = serializer.save(
+                owner=user, status=Summary.Status.DONE,
+                result=source.result, ranking=source.ranking, reused_from=near,
+            )
+            enqueue_tts(obj.id)
+        else:
+            lane = "bulk" if self.request.query_params.get("lane") == "bulk" else "interactive"
+            obj = serializer.save(owner=user, status=Summary.Status.PENDING, lane=lane)
+            # 사용자별 동시 실행 한도 안에서만 발송, 나머지는 대기열에서 순서대로
+            fairshare.release(user.id)
+        if sig is not None:
+            minhash.index("summary", obj.id, sig, owner_id=user.id)
+class SummaryStatusView(generics.GenericAPIView):
+    """
+    여러 요약의 상태를 한 번에 조회 (원문/결과는 읽지 않음)
+    - GET /api/summaries/status/?ids=1,2,3
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    def get(self, request, *args, **kwargs):
+        raw = ",".join(request.query_params.getlist("ids"))
+        try:
+            ids = sorted({int(x) for x in raw.split(",") if x.strip()})
+        except ValueError:
+            return Response({"ids": ["정수 id를 쉼표로 구분해 보내주세요."]}, status=status.HTTP_400_BAD_REQUEST)
+        if not ids:
+            return Response({"ids": ["ids is required."]}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > settings.SUMMARY_STATUS_MAX_IDS:
+            return Response(
+                {"ids": [f"한 번에 최대 {settings.SUMMARY_STATUS_MAX_IDS}개까지 조회할 수 있습니다."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        rows = Summary.objects.filter(owner=request.user, id__in=ids).values_list("id", "status", "updated_at")
+        found = [{"id": i, "status": s, "updated_at": u} for i, s, u in rows]
+        missing = sorted(set(ids) - {row["id"] for row in found})
+        return Response({"summaries": found, "missing": missing})
+class SummaryDetailView(ConditionalRetrieveMixin, generics.RetrieveAPIView):
+    """
+    - GET /api/summaries/{id}/
+    - GET /api/summaries/{id}/?sentences=5 또는 ?chars=500 → 저장된 문장 순위를 잘라 다른 길이의 요약 (새 작업 없음)
+    """
     serializer_class = SummarySerializer
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Summary.objects.all()
+    def get_queryset(self):
+        # 검증자(ETag)도 이 queryset에서 읽으므로 본인 요약만 - 남의 요약은 304가 아니라 404
+        return Summary.objects.filter(owner=self.request.user)
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        length = {}
+        for param in ("sentences", "chars"):
+            raw = self.request.query_params.get(param)
+            if raw is None:
+                continue
+            if not raw.isdigit() or int(raw) < 1:
+                raise ValidationError({param: ["1 이상의 정수를 입력해주세요."]})
+            length[param] = int(raw)
+        if length:
+            context["length"] = length
+        return context
 class MySummariesView(generics.ListAPIView):
-    serializer_class = SummarySerializer
+    serializer_class = SummaryListSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    def get_queryset(self):
+        return (
+            Summary.objects.filter(owner=self.request.user)
+            .defer("source_text")
+            .annotate(
+                source_preview=Substr("source_text", 1, settings.LIST_PREVIEW_CHARS),
+                source_length=Length("source_text"),
+            )
+        )
+def batch_progress(batch: SummaryBatch) -> dict:
+    counts = dict(batch.summaries.values_list("status").annotate(n=Count("id")).order_by())
+    finished = counts.get(Summary.Status.DONE, 0) + counts.get(Summary.Status.ERROR, 0)
+    return {
+        "id": batch.id,
+        "total": batch.total,
+        "counts": counts,
+        "finished": finished,
+        "done": finished >= batch.total,
+        "created_at": batch.created_at,
+    }
+class SummaryBatchCreateView(generics.GenericAPIView):
+    """
+    여러 학습지를 한 번에 요약 요청
+    - POST /api/summaries/batch/   body: { "texts": ["...", "..."] }
+    캐시 적중분은 바로 DONE, 나머지는 한 번의 bulk_create 후 사용자 한도 안에서 Celery group으로 발송
+    """
+    serializer_class = SummaryBatchCreateSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        texts = [t.strip() for t in serializer.validated_data["texts"]]
+        version = get_summarizer().cache_version
+        keys = [result_cache.cache_key(t, version) for t in texts]
+        cached = result_cache.get_many(keys)
+        with transaction.atomic():
+            batch = SummaryBatch.objects.create(owner=request.user, total=len(texts))
+            rows = Summary.objects.bulk_create([
+                Summary(
+                    owner=request.user, batch=batch, source_text=text, lane="bulk",
+                    status=Summary.Status.DONE if key in cached else Summary.Status.PENDING,
+                    result=cached[key].result if key in cached else "",
+                    ranking=cached[key].ranking if key in cached else [],
+                )
+                for text, key in zip(texts, keys)
+            ])
+        if any(row.status == Summary.Status.PENDING for row in rows):
+            fairshare.release(request.user.id)
+        for row in rows:
+            if row.status == Summary.Status.DONE:
+                enqueue_tts(row.id)
+        data = batch_progress(batch)
+        data["summaries"] = SummaryBatchItemSerializer(rows, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+class SummaryBatchDetailView(generics.GenericAPIView):
+    # GET /api/summaries/batch/{id}/ → 상태별 개수 집계 (쿼리 1회)
     permission_classes = [permissions.IsAuthenticated]
     def get_queryset(self):
-        return Summary.objects.filter(owner=self.request.user).order_by("-created_at")
+        return SummaryBatch.objects.filter(owner=self.request.user)
+    def get(self, request, *args, **kwargs):
+        return Response(batch_progress(self.get_object()))
@@ -2,11 +2,15 @@ import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
-from .routing import websocket_urlpatterns
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dotori_core.settings')
 django_asgi_app = get_asgi_application()
+
+# 모델을 import하는 모듈은 앱 로딩 이후에
+from apps.dotori_common.channels_auth import JWTQueryAuthMiddleware  # noqa: E402
+from .routing import websocket_urlpatterns  # noqa: E402
+
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
-    "websocket": AuthMiddlewareStack(URLRouter(websocket_urlpatterns)),
+    "websocket": AuthMiddlewareStack(JWTQueryAuthMiddleware(URLRouter(websocket_urlpatterns))),
 })
@@ -4,3 +4,11 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dotori_core.settings')
 app = Celery('dotori_core')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
+# 작업 성격(lane)별 큐와 우선순위 - apply_async(**lane_options(...)) / sig.set(**lane_options(...))
+LANES = {
+    "interactive": {"queue": "interactive", "priority": 0},
+    "bulk": {"queue": "bulk", "priority": 6},
+    "maintenance": {"queue": "maintenance", "priority": 9},
+}
+def lane_options(lane: str) -> dict:
+    return dict(LANES.get(lane, LANES["interactive"]))
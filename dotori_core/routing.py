@@ -1,6 +1,8 @@
 from django.urls import re_path
 from apps.dotori_quizzes.consumers import QuizConsumer
+from apps.dotori_summaries.consumers import SummaryConsumer
 
 websocket_urlpatterns = [
     re_path(r"ws/quiz/(?P<room_name>\w+)/$", QuizConsumer.as_asgi()),
+    re_path(r"ws/summaries/$", SummaryConsumer.as_asgi()),
 ]
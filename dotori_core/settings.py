@@ -3,6 +3,8 @@ from pathlib import Path
 import os
 import importlib
 import environ
+from corsheaders.defaults import default_headers
+from kombu import Exchange, Queue
 
 # ---------------------------------------------------------------------
 # 기본 경로 & 환경 변수
@@ -128,12 +130,16 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
 }
+# 목록 API에서 큰 텍스트 대신 보여줄 미리보기 길이
+LIST_PREVIEW_CHARS = env.int("LIST_PREVIEW_CHARS", default=120)
 
 # ---------------------------------------------------------------------
 # CORS
 # ---------------------------------------------------------------------
 CORS_ALLOWED_ORIGINS = env.list("DJANGO_CORS_ORIGINS", default=[])
 CORS_ALLOW_ALL_ORIGINS = True if not CORS_ALLOWED_ORIGINS else False
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
 
 # ---------------------------------------------------------------------
 # 국제화 / 시간
@@ -171,9 +177,163 @@ else:
         }
     }
 
+# ---------------------------------------------------------------------
+# 캐시: DEBUG면 LocMem(프로세스 단위), 아니면 Redis 공유
+# Idempotency-Key 등은 프로세스 사이 공유가 필요 → 운영에서 LocMem이면 check --deploy 오류
+# ---------------------------------------------------------------------
+if env.bool("USE_INMEMORY_CACHE", default=DEBUG):  # True면 LocMem, False면 Redis(Django cache)
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": env("REDIS_CACHE_URL", default="redis://localhost:6379/1"),
+        }
+    }
+
 # ---------------------------------------------------------------------
 # Celery
 # ---------------------------------------------------------------------
 CELERY_BROKER_URL = env("REDIS_URL", default="redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
 CELERY_TASK_ALWAYS_EAGER = False
+
+# 큐 분리: interactive(아이 한 명의 요청) / bulk(배치·긴 문서 청크) / maintenance(정리 작업)
+# 워커 구성은 docker-compose.yml 참고. Redis 우선순위는 0이 가장 높음.
+CELERY_TASK_QUEUES = tuple(
+    Queue(name, Exchange(name), routing_key=name) for name in ("interactive", "bulk", "maintenance", "extract")
+)
+CELERY_TASK_DEFAULT_QUEUE = "interactive"
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_TASK_ROUTES = {
+    "apps.dotori_summaries.tasks.run_summary": {"queue": "interactive"},
+    "apps.dotori_summaries.tasks.run_summary_many": {"queue": "interactive"},
+    "apps.dotori_summaries.tasks.summarize_chunk": {"queue": "bulk"},
+    "apps.dotori_summaries.tasks.reduce_summary": {"queue": "bulk"},
+    "apps.dotori_summaries.tasks.summary_failed": {"queue": "maintenance"},
+    "apps.dotori_summaries.tasks.rebalance_summaries": {"queue": "maintenance"},
+    "apps.dotori_summaries.tasks.evict_summary_cache": {"queue": "maintenance"},
+    "apps.dotori_summaries.tasks.run_tts": {"queue": "bulk"},
+    "apps.dotori_documents.tasks.expire_upload_sessions": {"queue": "maintenance"},
+    # 문서 추출은 전용 큐 (threads 풀 워커가 프로세스 풀에 파싱을 맡김 - docker-compose worker-extract)
+    "apps.dotori_documents.tasks.extract_document": {"queue": "extract"},
+}
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "priority_steps": list(range(10)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+}
+# 우선순위가 의미 있도록 워커가 미리 많이 가져가지 않게
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_ACKS_LATE = True
+CELERY_BEAT_SCHEDULE = {
+    "rebalance-summaries": {
+        "task": "apps.dotori_summaries.tasks.rebalance_summaries",
+        "schedule": 30.0,
+        "options": {"queue": "maintenance"},
+    },
+    "evict-summary-cache": {
+        "task": "apps.dotori_summaries.tasks.evict_summary_cache",
+        "schedule": 60.0 * 10,
+        "options": {"queue": "maintenance"},
+    },
+    "expire-upload-sessions": {
+        "task": "apps.dotori_documents.tasks.expire_upload_sessions",
+        "schedule": 60.0 * 60,
+        "options": {"queue": "maintenance"},
+    },
+}
+
+# ---------------------------------------------------------------------
+# 요약(Summaries)
+# ---------------------------------------------------------------------
+SUMMARY_CACHE_MAX_ENTRIES = env.int("SUMMARY_CACHE_MAX_ENTRIES", default=10000)
+# 캐시 적중 시 last_used_at(LRU 기준)은 이 간격(초)보다 오래됐을 때만 다시 기록 (읽을 때마다 쓰지 않도록)
+SUMMARY_CACHE_TOUCH_INTERVAL = env.int("SUMMARY_CACHE_TOUCH_INTERVAL", default=5 * 60)
+# 요약기 구현(dotted path)과 결과 길이
+SUMMARY_SUMMARIZER = env(
+    "SUMMARY_SUMMARIZER", default="apps.dotori_summaries.summarizers.TextRankSummarizer"
+)
+SUMMARY_MAX_SENTENCES = env.int("SUMMARY_MAX_SENTENCES", default=3)
+SUMMARY_MAX_CHARS = env.int("SUMMARY_MAX_CHARS", default=300)
+# 이 길이를 넘는 원문은 청크 단위 map-reduce(Celery chord)로 요약
+SUMMARY_CHUNK_CHARS = env.int("SUMMARY_CHUNK_CHARS", default=20000)
+SUMMARY_CHUNK_SENTENCES = env.int("SUMMARY_CHUNK_SENTENCES", default=8)
+# 청크 경계: 최소 길이(SUMMARY_CHUNK_CHARS/4)를 넘긴 뒤 문장 해시 % DIVISOR == 0 인 곳 (평균 청크 크기 조절)
+SUMMARY_CHUNK_DIVISOR = env.int("SUMMARY_CHUNK_DIVISOR", default=128)
+# POST /api/summaries/batch/ 한 번에 받을 수 있는 텍스트 수
+SUMMARY_BATCH_MAX_TEXTS = env.int("SUMMARY_BATCH_MAX_TEXTS", default=200)
+# GET /api/summaries/status/?ids=... 한 번에 조회할 수 있는 id 수
+SUMMARY_STATUS_MAX_IDS = env.int("SUMMARY_STATUS_MAX_IDS", default=500)
+# 사용자 한 명이 동시에 돌릴 수 있는 요약 작업 수 (0이면 제한 없음), 나머지는 사용자별 대기열
+SUMMARY_MAX_INFLIGHT_PER_USER = env.int("SUMMARY_MAX_INFLIGHT_PER_USER", default=4)
+# 발송 후 이 시간(초) 안에 아무 워커도 시작하지 않은 PENDING은 rebalance가 슬롯을 돌려받아 다시 발송
+SUMMARY_DISPATCH_TIMEOUT = env.int("SUMMARY_DISPATCH_TIMEOUT", default=10 * 60)
+# 원격 요약기(RemoteSummarizer): OpenAI 호환 API. 오프라인 벤치/테스트는 fake_summarizer_server로 대체
+OPENAI_API_KEY = env("OPENAI_API_KEY", default="")
+SUMMARY_REMOTE_URL = env("SUMMARY_REMOTE_URL", default="https://api.openai.com/v1")
+SUMMARY_REMOTE_MODEL = env("SUMMARY_REMOTE_MODEL", default="gpt-4o-mini")
+SUMMARY_REMOTE_MAX_CONCURRENCY = env.int("SUMMARY_REMOTE_MAX_CONCURRENCY", default=4)
+SUMMARY_REMOTE_TIMEOUT = env.float("SUMMARY_REMOTE_TIMEOUT", default=30.0)
+SUMMARY_REMOTE_RETRIES = env.int("SUMMARY_REMOTE_RETRIES", default=3)
+SUMMARY_REMOTE_BACKOFF = env.float("SUMMARY_REMOTE_BACKOFF", default=0.5)
+SUMMARY_REMOTE_BATCH_SIZE = env.int("SUMMARY_REMOTE_BATCH_SIZE", default=8)
+SUMMARY_REMOTE_BATCH_CHARS = env.int("SUMMARY_REMOTE_BATCH_CHARS", default=6000)
+SUMMARY_REMOTE_SHORT_CHARS = env.int("SUMMARY_REMOTE_SHORT_CHARS", default=1000)  # 이하 길이는 묶음 호출 대상
+# RUNNING 상태 임대 시간(초): 이보다 오래 갱신이 없으면 재전달된 작업이 다시 가져갈 수 있음
+SUMMARY_RUNNING_TIMEOUT = env.int("SUMMARY_RUNNING_TIMEOUT", default=15 * 60)
+# 요약 완료 후 TTS(음성) 생성 → Summary.tts_url, 오디오는 MEDIA_ROOT/tts/에 텍스트+음성 해시로 캐시
+# 실제 음성 백엔드를 SUMMARY_TTS_SYNTHESIZER에 지정했을 때만 켬 (기본 OfflineStubSynthesizer는 개발용 톤 WAV라
+# 켜 두면 tts_url이 진짜 음성처럼 노출됨)
+SUMMARY_TTS_ENABLED = env.bool("SUMMARY_TTS_ENABLED", default=False)
+SUMMARY_TTS_SYNTHESIZER = env(
+    "SUMMARY_TTS_SYNTHESIZER", default="apps.dotori_summaries.tts.OfflineStubSynthesizer"
+)
+SUMMARY_TTS_VOICE = env("SUMMARY_TTS_VOICE", default="ko-KR-child")
+# Summary.ranking에 저장할 상위 문장 수 (?sentences= 최대치)
+SUMMARY_RANKING_MAX = env.int("SUMMARY_RANKING_MAX", default=30)
+
+# 거의 같은 텍스트 찾기 (apps/dotori_common/minhash.py)
+# 밴드 수 b, 밴드당 행 r = PERMUTATIONS/b → 유사도 (1/b)^(1/r) 부근부터 후보로 잡힘 (128/16 → 약 0.71)
+MINHASH_PERMUTATIONS = env.int("MINHASH_PERMUTATIONS", default=128)
+MINHASH_BANDS = env.int("MINHASH_BANDS", default=16)
+MINHASH_SHINGLE = env.int("MINHASH_SHINGLE", default=5)
+MINHASH_THRESHOLD = env.float("MINHASH_THRESHOLD", default=0.85)
+MINHASH_MAX_CANDIDATES = env.int("MINHASH_MAX_CANDIDATES", default=200)
+
+# 오래된 원문/문서 텍스트 압축 보관 (manage.py archive_payloads, apps/dotori_common/coldstore.py)
+COLD_STORAGE_DAYS = env.int("COLD_STORAGE_DAYS", default=180)
+COLD_STORAGE_LEVEL = env.int("COLD_STORAGE_LEVEL", default=6)  # zlib 압축 수준 1~9
+
+# Idempotency-Key (apps/dotori_common/idempotency.py): 첫 응답 보관 시간 / 처리 중 잠금 시간(초)
+IDEMPOTENCY_TTL = env.int("IDEMPOTENCY_TTL", default=24 * 60 * 60)
+IDEMPOTENCY_LOCK_TIMEOUT = env.int("IDEMPOTENCY_LOCK_TIMEOUT", default=60)
+
+# 이어받기 업로드 (POST /api/documents/uploads/)
+DOCUMENT_UPLOAD_MAX_BYTES = env.int("DOCUMENT_UPLOAD_MAX_BYTES", default=1024 * 1024 * 1024)
+DOCUMENT_UPLOAD_CHUNK_MAX = env.int("DOCUMENT_UPLOAD_CHUNK_MAX", default=16 * 1024 * 1024)  # PUT 한 번의 최대 바이트
+DOCUMENT_UPLOAD_SESSION_TTL = env.int("DOCUMENT_UPLOAD_SESSION_TTL", default=24 * 60 * 60)  # 멈춘 세션 정리(초)
+DOCUMENT_UPLOAD_TEMP_DIR = env("DOCUMENT_UPLOAD_TEMP_DIR", default="")  # 비우면 MEDIA_ROOT/uploads_tmp (웹 프로세스끼리 공유돼야 함)
+# 텍스트 업로드에서 text_cache로 읽는 최대 글자 수 (넘는 뒷부분은 읽지 않음)
+DOCUMENT_TEXT_MAX_CHARS = env.int("DOCUMENT_TEXT_MAX_CHARS", default=5_000_000)
+# PDF/DOCX/HWP 텍스트 추출: 워커당 파싱 프로세스 수, 한 번에 맡기는 단위(PDF 페이지/HWP 구역) 수
+DOCUMENT_EXTRACT_PROCESSES = env.int("DOCUMENT_EXTRACT_PROCESSES", default=2)
+DOCUMENT_EXTRACT_UNITS_PER_JOB = env.int("DOCUMENT_EXTRACT_UNITS_PER_JOB", default=10)
+# 추출 RUNNING 임대 시간(초): 진행률 갱신이 이보다 오래 없으면(워커 종료 등) 재전달/재요청이 다시 가져감
+DOCUMENT_EXTRACT_RUNNING_TIMEOUT = env.int("DOCUMENT_EXTRACT_RUNNING_TIMEOUT", default=15 * 60)
+# GET /api/documents/{id}/text/ 한 번에 돌려주는 최대 글자/문단 수
+DOCUMENT_TEXT_RANGE_MAX_CHARS = env.int("DOCUMENT_TEXT_RANGE_MAX_CHARS", default=20000)
+DOCUMENT_TEXT_RANGE_MAX_PARAS = env.int("DOCUMENT_TEXT_RANGE_MAX_PARAS", default=200)
+# GET /api/documents/{id}/download/ : 값(예: "/protected-media/")이 있으면 X-Accel-Redirect로 nginx가 직접 전송
+# nginx 예) location /protected-media/ { internal; alias /app/media/; }
+DOCUMENT_DOWNLOAD_ACCEL_PREFIX = env("DOCUMENT_DOWNLOAD_ACCEL_PREFIX", default="")
+# 업로드 조각을 받는 대로 sha256 계산 → 같은 파일은 blobs/<sha256>.<ext> 하나만 저장 (dotori_documents.blobs)
+FILE_UPLOAD_HANDLERS = [
+    "apps.dotori_documents.blobs.HashingMemoryFileUploadHandler",
+    "apps.dotori_documents.blobs.HashingTemporaryFileUploadHandler",
+]
+# 문서 파일(blobs/, docs/, texts/)을 이름 해시로 나눠 담는 하위 디렉터리 단계 수 (1 → prefix/ab/이름, 0이면 평평하게)
+# 1단계(256개)면 수백만 개까지 디렉터리당 수천 개 이하. 바꾸면 python manage.py shard_media 로 기존 파일을 옮김
+MEDIA_SHARD_DEPTH = env.int("MEDIA_SHARD_DEPTH", default=1)